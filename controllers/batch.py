@@ -0,0 +1,132 @@
+import json
+import os
+from pathlib import Path
+
+from rich.console import Console
+
+from controllers.blockchain import Blockchain
+from controllers.build import Build
+from controllers.requirements import Requirements
+from helpers.topology import Topology
+from helpers.tracing import tracer
+from models.domain import Domain
+
+console = Console()
+topology = Topology()
+
+
+class Batch:
+    """Builds a whole network from a topology spec file without prompts"""
+
+    def __init__(self, specfile: str) -> None:
+        self.specfile: str = specfile
+
+    @tracer.phase()
+    def run(self) -> int:
+        """Validates the spec, allocates ports and brings the network up.
+        Returns the process exit code"""
+        console.print("[bold orange1]BATCH[/]")
+        console.print("")
+
+        try:
+            spec = topology.load(self.specfile)
+        except (OSError, ValueError) as e:
+            console.print(
+                "[bold red]Cannot read " + self.specfile + ": " + str(e) + "[/]"
+            )
+            return 1
+
+        errors = topology.validate(spec)
+        if errors:
+            console.print("[bold red]Invalid spec " + self.specfile + "[/]")
+            for error in errors:
+                console.print("[red]## " + error + "[/]")
+            return 1
+
+        configfile = (
+            str(Path().absolute()) + "/domains/" + str(spec["domain"]) + "/setup.json"
+        )
+        if os.path.isfile(configfile):
+            return self.update(spec, configfile)
+
+        try:
+            domain = topology.domain(spec)
+        except ValueError as e:
+            console.print("[bold red]" + str(e) + "[/]")
+            return 1
+
+        console.print(
+            "[bold green]Network "
+            + domain.name
+            + ": "
+            + str(domain.qtyorgs)
+            + " organizations, "
+            + str(sum(len(org.peers) for org in domain.organizations))
+            + " peers[/]"
+        )
+        console.print("")
+
+        requirements = Requirements()
+        requirements.check_all()
+
+        build = Build(domain)
+        build.build_all()
+        blockchain = Blockchain(domain)
+        blockchain.build_all()
+
+        for org, specorg in zip(domain.organizations, spec["organizations"]):
+            if specorg.get("users"):
+                secrets = build.register_users(org, specorg["users"])
+                console.print(
+                    "[bold]## "
+                    + str(len(secrets))
+                    + " "
+                    + org.name
+                    + " clients registered, secret is <id>pw[/]"
+                )
+
+        console.print("[bold green]Network " + domain.name + " is up[/]")
+        return 0
+
+    @tracer.phase()
+    def update(self, spec: dict, configfile: str) -> int:
+        """Applies the spec to an existing network: adds the missing
+        organizations and peers, then rebuilds and restarts only what
+        changed. Running the same spec again is a no-op."""
+        with open(configfile, encoding="utf-8") as config_file:
+            domain = Domain(**json.load(config_file))
+
+        try:
+            neworgs, newpeers = topology.extend(domain, spec)
+        except ValueError as e:
+            console.print("[bold red]" + str(e) + "[/]")
+            return 1
+
+        console.print(
+            "[bold green]Network "
+            + domain.name
+            + ": "
+            + str(len(neworgs))
+            + " new organizations, "
+            + str(sum(len(peers) for peers in newpeers.values()))
+            + " new peers[/]"
+        )
+        console.print("")
+
+        build = Build(domain)
+        build.build_incremental()
+
+        blockchain = Blockchain(domain)
+        if neworgs:
+            blockchain.build_new_organizations(neworgs)
+        for org in domain.organizations:
+            if org.name in newpeers:
+                blockchain.join_channel_peers(org, newpeers[org.name])
+
+        specorgs = {specorg["name"]: specorg for specorg in spec["organizations"]}
+        for org in neworgs:
+            if specorgs[org.name].get("users"):
+                build.register_users(org, specorgs[org.name]["users"])
+
+        console.print("[bold green]Network " + domain.name + " is up to date[/]")
+        return 0
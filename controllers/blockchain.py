@@ -1,7 +1,10 @@
+import functools
+import io
 import json
 import os
 import shutil
-import time
+import tarfile
+from typing import Dict, List, Tuple
 
 import docker
 import ruamel.yaml
@@ -9,7 +12,13 @@ from rich.console import Console
 
 from controllers.header import Header
 from helpers.commands import Commands
+from helpers.configtxlator import Configtxlator
+from helpers.digest import Digest
 from helpers.paths import Paths
+from helpers.readiness import Readiness
+from helpers.runner import CommandError
+from helpers.scheduler import Scheduler
+from helpers.tracing import tracer
 from models.domain import Domain
 from models.organization import Organization
 from models.peer import Peer
@@ -21,14 +30,24 @@ console = Console()
 client = docker.from_env()
 header = Header()
 commands = Commands()
+digest = Digest()
 
 
 class Blockchain:
+    # Snapshots only pay off once the channel has some history, and a cached
+    # snapshot is reused until the channel has grown this many blocks past it
+    SNAPSHOTMINHEIGHT = 10
+    SNAPSHOTMAXLAG = 100
+    PEERSNAPSHOTROOT = "/var/hyperledger/production/snapshots/completed/"
+
     def __init__(self, domain: Domain) -> None:
         self.domain: Domain = domain
         self.paths = Paths(domain)
+        self.readiness = Readiness(domain)
+        self.configtxlator = Configtxlator(domain)
         self.configtxyaml = "configtx.yaml"
 
+    @tracer.phase()
     def build_all(self):
         os.system("clear")
         header.header()
@@ -41,6 +60,7 @@ class Blockchain:
         self.join_channel()
         console.print("")
 
+    @tracer.phase()
     def genesis_block(self):
         console.print("[bold white]# Creating genesis block[/]")
         console.print("")
@@ -97,10 +117,9 @@ class Blockchain:
 
         for org in self.domain.organizations:
             for peer in org.peers:
-                self.paths.set_peer_paths(org, peer)
                 if peer.name.split(".")[0] == "peer1":
                     anchorpeer = {
-                        "Host": self.paths.PEERNAME,
+                        "Host": self.paths.peer(org, peer).PEERNAME,
                         "Port": peer.peerlistenport,
                     }
                     datacfg["Organizations"][0]["AnchorPeers"].append(anchorpeer)
@@ -142,8 +161,6 @@ class Blockchain:
         with open(self.paths.DOMAINCONFIGTXFILE, "w", encoding="utf-8") as cftx:
             yaml.dump(datacfg, cftx)
 
-        time.sleep(1)
-
         # Creating gblock
         commands.configtxgen_config_path(
             self.paths.APPPATH,
@@ -153,11 +170,10 @@ class Blockchain:
         )
 
     def organization_yaml(self, org: Organization, peer: Peer) -> dict:
-        self.paths.set_peer_paths(org, peer)
         organization = {
             "Name": peer.CORE_PEER_LOCALMSPID,
             "ID": peer.CORE_PEER_LOCALMSPID,
-            "MSPDir": self.paths.PEERMSPPATH,
+            "MSPDir": self.paths.peer(org, peer).PEERMSPPATH,
             "AnchorPeers": [
                 {
                     "Host": peer.name + "." + self.domain.name,
@@ -200,6 +216,7 @@ class Blockchain:
 
         return organization
 
+    @tracer.phase()
     def create_channel(self):
         console.print("[bold white]# Creating channel[/]")
         console.print("")
@@ -217,38 +234,250 @@ class Blockchain:
         )
 
         console.print("## Waiting Orderer joining channel")
-        time.sleep(2)
+        if not self.readiness.channel():
+            raise RuntimeError("channel " + self.domain.networkname + " not ready")
 
+    @tracer.phase()
     def join_channel(self):
-        for org in self.domain.organizations:
-            self.paths.set_org_paths(org)
-            self.join_channel_org(org)
+        self.join_peers(
+            "Channel join",
+            [(org, peer) for org in self.domain.organizations for peer in org.peers],
+        )
 
+    @tracer.phase()
     def join_channel_org(self, org: Organization):
-        for peer in org.peers:
-            self.paths.set_peer_paths(org, peer)
-            self.join_channel_peer(org, peer)
+        self.join_channel_peers(org, org.peers)
+
+    @tracer.phase()
+    def join_channel_peers(self, org: Organization, peers: List[Peer]):
+        """Joins new peers of an organization, from a ledger snapshot of one of
+        its running peers when the channel is long enough"""
+        sources = [peer for peer in org.peers if peer not in peers]
+        snapshot = self.channel_snapshot(org, sources[0]) if sources else None
+        self.join_peers(
+            "Channel join " + org.name, [(org, peer) for peer in peers], snapshot
+        )
+
+    def join_peers(
+        self,
+        title: str,
+        orgpeers: List[Tuple[Organization, Peer]],
+        snapshot: Tuple[str, int] = None,
+    ):
+        """Joins every peer concurrently, from the genesis block or from a
+        (path, block number) snapshot, then waits until each peer ledger
+        reaches the orderer height. The report shows the join and catch-up
+        time of every peer."""
+        scheduler = Scheduler()
+        for org, peer in orgpeers:
+            if snapshot is None:
+                join = functools.partial(self.join_channel_peer, org, peer)
+            else:
+                join = functools.partial(
+                    self.join_snapshot_peer, org, peer, snapshot[0]
+                )
+            scheduler.add("join:" + peer.name, join)
+            scheduler.add(
+                "sync:" + peer.name,
+                functools.partial(self.sync_channel_peer, org, peer),
+                ["join:" + peer.name],
+            )
+
+        scheduler.run()
+        console.print("")
+        scheduler.report(title)
+        if snapshot is not None:
+            self.snapshot_savings(scheduler, orgpeers, snapshot[1])
+
+        if scheduler.failed:
+            raise next(iter(scheduler.failed.values()))
 
+    @tracer.phase()
     def join_channel_peer(self, org: Organization, peer: Peer):
         console.print("[bold white]# Joinning channel " + peer.name + "[/]")
-        console.print("")
 
+        peerpaths = self.paths.peer(org, peer)
         commands.peer_channel_join(
             org,
             peer,
             self.paths.APPPATH,
             self.paths.BLOCKFILE,
-            self.paths.PEERCFGPATH,
-            self.paths.PEERTLSCAPATH + "tls-cert.pem",
-            self.paths.ORGMSPPATH,
+            peerpaths.PEERCFGPATH,
+            peerpaths.PEERTLSCAPATH + "tls-cert.pem",
+            self.paths.org(org).ORGMSPPATH,
         )
 
+    @tracer.phase()
+    def join_snapshot_peer(self, org: Organization, peer: Peer, snapshotpath: str):
+        console.print(
+            "[bold white]# Joinning channel " + peer.name + " from snapshot[/]"
+        )
+
+        peerpaths = self.paths.peer(org, peer)
+        commands.peer_channel_joinbysnapshot(
+            org,
+            peer,
+            self.paths.APPPATH,
+            snapshotpath,
+            peerpaths.PEERCFGPATH,
+            peerpaths.PEERTLSCAPATH + "tls-cert.pem",
+            self.paths.org(org).ORGMSPPATH,
+        )
+
+    @tracer.phase()
+    def channel_snapshot(self, org: Organization, peer: Peer) -> Tuple[str, int]:
+        """Latest cached ledger snapshot of the channel as (path inside the
+        peers, block number), taken on peer when the cache is missing or
+        too old. None when the channel is too short for a snapshot."""
+        height = self.readiness.channel_info().get("height", 0)
+        if height < self.SNAPSHOTMINHEIGHT:
+            return None
+
+        cached = self.cached_snapshots(height)
+        if not cached or height - 1 - max(cached) > self.SNAPSHOTMAXLAG:
+            cached.append(self.take_snapshot(org, peer))
+
+        blocknumber = max(cached)
+        console.print(
+            "[bold white]# Using ledger snapshot at block " + str(blocknumber) + "[/]"
+        )
+        return self.paths.PEERSNAPSHOTPATH + str(blocknumber), blocknumber
+
+    def cached_snapshots(self, height: int) -> List[int]:
+        """Block numbers of the cached snapshots of the current channel. The
+        cache is dropped when its genesis block digest is not the one of the
+        channel, as after a rebuild, and snapshots past the channel height
+        are removed."""
+        snapshotpath = self.paths.SNAPSHOTPATH
+        if not os.path.isdir(snapshotpath):
+            return []
+
+        genesisfile = snapshotpath + "genesis"
+        genesis = None
+        if os.path.isfile(genesisfile):
+            with open(genesisfile, encoding="utf-8") as genesis_file:
+                genesis = genesis_file.read().strip()
+        if genesis != digest.file(self.paths.BLOCKFILE):
+            console.print("[bold white]# Dropping snapshots of another channel[/]")
+            shutil.rmtree(snapshotpath, ignore_errors=True)
+            return []
+
+        cached = []
+        for name in os.listdir(snapshotpath):
+            if not name.isdigit():
+                continue
+            if int(name) >= height:
+                shutil.rmtree(snapshotpath + name, ignore_errors=True)
+            else:
+                cached.append(int(name))
+        return cached
+
+    @tracer.phase()
+    def take_snapshot(self, org: Organization, peer: Peer) -> int:
+        """Snapshots the ledger of peer at its last block and copies it to
+        the domain snapshot cache. Returns the block number."""
+        console.print("[bold white]# Taking ledger snapshot on " + peer.name + "[/]")
+
+        peerpaths = self.paths.peer(org, peer)
+        args = [
+            org,
+            peer,
+            self.paths.APPPATH,
+            self.domain.networkname,
+            peerpaths.PEERCFGPATH,
+            peerpaths.PEERTLSCAPATH + "tls-cert.pem",
+            self.paths.org(org).ORGMSPPATH,
+        ]
+        commands.peer_snapshot_submitrequest(*args)
+
+        def done() -> bool:
+            output = commands.peer_snapshot_listpending(*args)
+            return json.loads(output[output.index("[") :]) == []
+
+        if not self.readiness.poll("snapshot " + peer.name, done):
+            raise RuntimeError("snapshot on " + peer.name + " did not complete")
+
+        container = client.containers.get(peer.name + "." + self.domain.name)
+        completed = self.PEERSNAPSHOTROOT + self.domain.networkname
+        result = container.exec_run("ls " + completed)
+        blocknumber = max(
+            int(name)
+            for name in result.output.decode("utf-8").split()
+            if name.isdigit()
+        )
+
+        with tracer.span("docker copy snapshot", "docker"):
+            data, _ = container.get_archive(completed + "/" + str(blocknumber))
+            os.makedirs(self.paths.SNAPSHOTPATH, exist_ok=True)
+            with tarfile.open(fileobj=io.BytesIO(b"".join(data))) as tar:
+                tar.extractall(self.paths.SNAPSHOTPATH)
+            with open(
+                self.paths.SNAPSHOTPATH + "genesis", "w", encoding="utf-8"
+            ) as genesis_file:
+                genesis_file.write(digest.file(self.paths.BLOCKFILE))
+
+        return blocknumber
+
+    def snapshot_savings(
+        self,
+        scheduler: Scheduler,
+        orgpeers: List[Tuple[Organization, Peer]],
+        blocknumber: int,
+    ):
+        """Estimates the genesis replay avoided by each snapshot join, from the
+        catch-up rate measured after the snapshot block"""
+        skipped = blocknumber + 1
+        for _, peer in orgpeers:
+            height = scheduler.results.get("sync:" + peer.name)
+            duration = scheduler.durations.get("sync:" + peer.name)
+            if height is None or not duration:
+                continue
+
+            message = (
+                "## "
+                + peer.name
+                + ": joined at block "
+                + str(blocknumber)
+                + ", "
+                + str(skipped)
+                + " blocks not replayed"
+            )
+            caughtup = height - skipped
+            if caughtup > 0:
+                message += ", about %.1fs saved" % (skipped * duration / caughtup)
+            console.print(message)
         console.print("")
-        console.print("## Waiting Peer...")
-        console.print("")
-        time.sleep(1)
 
+    def sync_channel_peer(self, org: Organization, peer: Peer) -> int:
+        """Waits until the peer ledger reaches the orderer height, returned"""
+        peerpaths = self.paths.peer(org, peer)
+
+        def getinfo() -> str:
+            return commands.peer_channel_getinfo(
+                org,
+                peer,
+                self.paths.APPPATH,
+                self.domain.networkname,
+                peerpaths.PEERCFGPATH,
+                peerpaths.PEERTLSCAPATH + "tls-cert.pem",
+                self.paths.org(org).ORGMSPPATH,
+            )
+
+        height = self.readiness.channel_info().get("height", 0)
+        if not self.readiness.height(peer, getinfo, height):
+            raise RuntimeError(
+                peer.name + " did not reach the orderer height " + str(height)
+            )
+        return height
+
+    @tracer.phase()
     def build_new_organization(self, org: Organization):
+        self.build_new_organizations([org])
+
+    @tracer.phase()
+    def build_new_organizations(self, orgs: List[Organization]):
+        """Adds new organizations and their anchor peers to the channel with
+        a single config update transaction"""
         os.system("clear")
         header.header()
         console.print("[bold orange1]BLOCKCHAIN[/]")
@@ -258,23 +487,26 @@ class Blockchain:
 
         datacfg = {"Organizations": []}
 
-        for peer in org.peers:
-            if peer.name.split(".")[0] == "peer1":
-                organization = self.organization_yaml(org, peer)
+        for org in orgs:
+            for peer in org.peers:
+                if peer.name.split(".")[0] == "peer1":
+                    organization = self.organization_yaml(org, peer)
 
-                datacfg["Organizations"].append(organization)
+                    datacfg["Organizations"].append(organization)
 
         with open(
             self.paths.DOMAINCONFIGBUILDPATH + self.configtxyaml, "w", encoding="utf-8"
         ) as cftx:
             yaml.dump(datacfg, cftx)
 
-        self.generate_org_definition(org)
+        for org in orgs:
+            self.generate_org_definition(org)
 
-        self.fetch_channel_config(org)
+        self.fetch_channel_config_orgs(orgs)
 
         self.merge_configtx()
 
+    @tracer.phase()
     def generate_org_definition(self, org: Organization):
         console.print("[bold white]# Generating org definition[/]")
         console.print("")
@@ -306,12 +538,18 @@ class Blockchain:
         ) as f:
             json.dump(configjson, f, indent=2)
 
+    @tracer.phase()
     def fetch_channel_config(self, orgnew: Organization):
+        self.fetch_channel_config_orgs([orgnew])
+
+    @tracer.phase()
+    def fetch_channel_config_orgs(self, orgsnew: List[Organization]):
         console.print("")
         console.print("[bold white]# Fetching channel config[/]")
         console.print("")
 
-        newpeer = orgnew.peers[0]
+        newnames = [org.name for org in orgsnew]
+        updatename = newnames[0] if len(newnames) == 1 else "neworgs"
 
         CLIORDERER_CA = self.paths.CLIEXTPATH + self.paths.CLIROOTCA
 
@@ -337,92 +575,45 @@ class Blockchain:
 
         clidocker = client.containers.get(self.paths.CLIHOSTNAME)
         envvar = self.env_variables()
-        clidocker.exec_run(command, environment=envvar)
+        with tracer.span("docker exec " + " ".join(command.split(" ")[:3]), "docker"):
+            clidocker.exec_run(command, environment=envvar)
 
         console.print("## Waiting Peer...")
         console.print("")
-        time.sleep(1)
-
-        commands.configtxlator_proto_decode(
-            self.paths.APPPATH, self.paths.DOMAINCONFIGBUILDPATH, "config_block"
-        )
-        time.sleep(1)
-
-        commands.jq_export_config(self.paths.DOMAINCONFIGBUILDPATH)
-        time.sleep(1)
-
-        commands.jq_export_modified_config(orgnew, self.paths.DOMAINCONFIGBUILDPATH)
-        time.sleep(1)
-
-        commands.configtxlator_proto_encode(
-            self.paths.APPPATH, self.paths.DOMAINCONFIGBUILDPATH, "config"
-        )
-        time.sleep(1)
-
-        commands.configtxlator_proto_encode(
-            self.paths.APPPATH, self.paths.DOMAINCONFIGBUILDPATH, "modified_config"
-        )
-        time.sleep(1)
-
-        commands.configtxlator_compute_update(
-            self.paths.APPPATH,
-            self.domain.networkname,
-            self.paths.DOMAINCONFIGBUILDPATH,
+        if not self.readiness.file(
+            self.paths.DOMAINCONFIGBUILDPATH + "config_block.pb"
+        ):
+            raise RuntimeError("config_block.pb not fetched")
+
+        with open(self.paths.DOMAINCONFIGBUILDPATH + "config_block.pb", "rb") as f:
+            block = f.read()
+
+        orgdefinitions = {}
+        for orgnew in orgsnew:
+            with open(
+                self.paths.DOMAINCONFIGBUILDPATH + orgnew.name + ".json",
+                encoding="utf-8",
+            ) as f:
+                orgdefinitions[orgnew.name + "MSP"] = json.load(f)
+
+        envelope = self.configtxlator.orgs_update_envelope(
+            self.domain.networkname, block, orgdefinitions
         )
-        time.sleep(1)
 
-        commands.configtxlator_proto_decode(
-            self.paths.APPPATH, self.paths.DOMAINCONFIGBUILDPATH, "config_update", True
+        # The update is submitted, and so signed, by the first org admin
+        signers = [org for org in self.domain.organizations if org.name not in newnames]
+        envelope = self.collect_signatures(
+            updatename,
+            envelope,
+            signers[1:],
+            self.configtxlator.admins_quorum(block) - 1,
         )
-        time.sleep(1)
 
         with open(
-            self.paths.DOMAINCONFIGBUILDPATH + "config_update.json", encoding="utf-8"
+            self.paths.DOMAINCONFIGBUILDPATH + updatename + "_update_in_envelope.pb",
+            "wb",
         ) as f:
-            config_update = f.read()
-        time.sleep(1)
-
-        commands.echo_payload(
-            self.domain.networkname,
-            config_update,
-            self.paths.DOMAINCONFIGBUILDPATH,
-            orgnew,
-        )
-        time.sleep(1)
-
-        commands.configtxlator_proto_encode(
-            self.paths.APPPATH,
-            self.paths.DOMAINCONFIGBUILDPATH,
-            orgnew.name + "_update_in_envelope",
-            True,
-        )
-        time.sleep(1)
-
-        for org in self.domain.organizations:
-            if org.name != orgnew.name:
-                for peer in org.peers:
-                    if peer.name.split(".")[0] == "peer1":
-                        ### SIGN AS OTHER ORG ADMINS
-                        console.print(
-                            "[bold white]# Signing config transaction by org "
-                            + org.name
-                            + "[/]"
-                        )
-                        console.print("")
-                        command = (
-                            "peer channel signconfigtx -f "
-                            + self.paths.EXTCONFIGTX
-                            + orgnew.name
-                            + "_update_in_envelope.pb"
-                        )
-
-                        clidocker = client.containers.get(self.paths.CLIHOSTNAME)
-                        envvar = self.env_variables(org)
-                        clidocker.exec_run(command, environment=envvar)
-
-                        console.print("# Waiting Peer...")
-                        console.print("")
-                        time.sleep(1)
+            f.write(envelope)
 
         console.print("[bold white]# Updating channel[/]")
         console.print("")
@@ -430,7 +621,7 @@ class Blockchain:
         command = (
             "peer channel update -f "
             + self.paths.EXTCONFIGTX
-            + orgnew.name
+            + updatename
             + "_update_in_envelope.pb -c "
             + self.domain.networkname
             + " -o "
@@ -443,45 +634,113 @@ class Blockchain:
 
         clidocker = client.containers.get(self.paths.CLIHOSTNAME)
         envvar = self.env_variables()
-        clidocker.exec_run(command, environment=envvar)
+        with tracer.span("docker exec " + " ".join(command.split(" ")[:3]), "docker"):
+            clidocker.exec_run(command, environment=envvar)
+
+        for orgnew in orgsnew:
+            newpeer = orgnew.peers[0]
+
+            console.print(
+                "[bold white]# Fetching channel config block from orderer to org "
+                + orgnew.name
+                + "[/]"
+            )
+            console.print("")
+
+            command = (
+                "peer channel fetch 0 "
+                + self.paths.CLIBLOCKPATH
+                + self.domain.networkname
+                + ".block"
+                + " -o "
+                + self.paths.ORDERERNAME
+                + ":"
+                + str(self.domain.orderer.generallistenport)
+                + " --ordererTLSHostnameOverride "
+                + self.paths.ORDERERNAME
+                + " -c "
+                + self.domain.networkname
+                + " --tls --cafile "
+                + ORDERER_CA
+            )
+
+            clidocker = client.containers.get(newpeer.name + "." + self.domain.name)
+            envvar = self.env_variables(orgnew, newpeer)
+            with tracer.span(
+                "docker exec " + " ".join(command.split(" ")[:3]), "docker"
+            ):
+                clidocker.exec_run(command, environment=envvar)
 
-        console.print("# Waiting Peers...")
+        console.print("# Waiting Peer...")
         console.print("")
-        time.sleep(1)
+        if not self.readiness.peers(
+            [peer for orgnew in orgsnew for peer in orgnew.peers]
+        ):
+            raise RuntimeError("new peers not ready")
+
+        self.join_peers(
+            "Channel join",
+            [(orgnew, peer) for orgnew in orgsnew for peer in orgnew.peers],
+        )
 
+    @tracer.phase()
+    def collect_signatures(
+        self, updatename: str, envelope: bytes, orgs: List[Organization], needed: int
+    ) -> bytes:
+        """Signs copies of the config update envelope as several org admins in
+        parallel and merges the signatures back into the envelope. Only as
+        many orgs as the Admins policy still needs are asked, others step in
+        when a signature fails."""
+        signed = []
+        candidates = list(orgs)
+        while len(signed) < needed and candidates:
+            batch = candidates[: needed - len(signed)]
+            candidates = candidates[len(batch) :]
+
+            scheduler = Scheduler()
+            for org in batch:
+                scheduler.add(
+                    "sign:" + org.name,
+                    functools.partial(self.sign_envelope, updatename, envelope, org),
+                )
+            results = scheduler.run()
+            signed += list(results.values())
+
+        if len(signed) < needed:
+            raise RuntimeError(
+                "config update needs "
+                + str(needed)
+                + " more admin signatures, got "
+                + str(len(signed))
+            )
+
+        if not signed:
+            return envelope
+        return self.configtxlator.merge_signatures(envelope, signed)
+
+    def sign_envelope(self, updatename: str, envelope: bytes, org: Organization):
+        """Signs a private copy of the envelope as the org admin and returns it"""
         console.print(
-            "[bold white]# Fetching channel config block from orderer to org "
-            + orgnew.name
-            + "[/]"
+            "[bold white]# Signing config transaction by org " + org.name + "[/]"
         )
-        console.print("")
 
-        command = (
-            "peer channel fetch 0 "
-            + self.paths.CLIBLOCKPATH
-            + self.domain.networkname
-            + ".block"
-            + " -o "
-            + self.paths.ORDERERNAME
-            + ":"
-            + str(self.domain.orderer.generallistenport)
-            + " --ordererTLSHostnameOverride "
-            + self.paths.ORDERERNAME
-            + " -c "
-            + self.domain.networkname
-            + " --tls --cafile "
-            + ORDERER_CA
-        )
+        filename = updatename + "_update_in_envelope_" + org.name + ".pb"
+        with open(self.paths.DOMAINCONFIGBUILDPATH + filename, "wb") as f:
+            f.write(envelope)
 
-        clidocker = client.containers.get(newpeer.name + "." + self.domain.name)
-        envvar = self.env_variables(orgnew, newpeer)
-        clidocker.exec_run(command, environment=envvar)
+        command = "peer channel signconfigtx -f " + self.paths.EXTCONFIGTX + filename
 
-        console.print("# Waiting Peer...")
-        console.print("")
-        time.sleep(1)
+        clidocker = client.containers.get(self.paths.CLIHOSTNAME)
+        envvar = self.env_variables(org)
+        with tracer.span("docker exec " + " ".join(command.split(" ")[:3]), "docker"):
+            result = clidocker.exec_run(command, environment=envvar)
+        if result.exit_code != 0:
+            raise RuntimeError(
+                "signconfigtx failed: " + result.output.decode("utf-8").strip()
+            )
 
-        self.join_channel_org(orgnew)
+        with open(self.paths.DOMAINCONFIGBUILDPATH + filename, "rb") as f:
+            return f.read()
 
     def env_variables(
         self, org: Organization = None, peer: Peer = None, ord: bool = None
@@ -539,6 +798,7 @@ class Blockchain:
 
         return envvar
 
+    @tracer.phase()
     def merge_configtx(self):
         with open(
             self.paths.DOMAINCONFIGPATH + self.configtxyaml, encoding="utf-8"
@@ -550,18 +810,17 @@ class Blockchain:
         ) as bcftx:
             databuild = yaml.load(bcftx)
 
-        neworg = databuild["Organizations"][0]
+        for neworg in databuild["Organizations"]:
+            datacfg["Organizations"].append(neworg)
+            anchorpeer = neworg["AnchorPeers"][0]
+            datacfg["Application"]["Organizations"].append(neworg)
+            datacfg["Profiles"]["SampleAppChannelEtcdRaft"]["Application"][
+                "Organizations"
+            ].append(neworg)
 
-        datacfg["Organizations"].append(neworg)
-        anchorpeer = neworg["AnchorPeers"][0]
-        datacfg["Application"]["Organizations"].append(neworg)
-        datacfg["Profiles"]["SampleAppChannelEtcdRaft"]["Application"][
-            "Organizations"
-        ].append(neworg)
-
-        datacfg["Organizations"][0]["AnchorPeers"].append(
-            {"Host": anchorpeer["Host"], "Port": anchorpeer["Port"]}
-        )
+            datacfg["Organizations"][0]["AnchorPeers"].append(
+                {"Host": anchorpeer["Host"], "Port": anchorpeer["Port"]}
+            )
 
         with open(
             self.paths.DOMAINCONFIGPATH + self.configtxyaml, "w", encoding="utf-8"
@@ -585,6 +844,7 @@ class Blockchain:
             except Exception as e:
                 print("Failed to delete %s. Reason: %s" % (file_path, e))
 
+    @tracer.phase()
     def rebuild(self):
         os.system("clear")
         header.header()
@@ -594,3 +854,61 @@ class Blockchain:
         console.print("")
         self.join_channel()
         console.print("")
+
+    @tracer.phase()
+    def resume(self, ledgers: Dict[str, bool]):
+        """Brings back the channel of a restarted network. ledgers tells, by
+        orderer and peer service, whether its ledger volume survived. The
+        channel is only rebuilt when the orderer lost it; peers that lost
+        their membership join again and intact ledgers are left alone."""
+        console.print(
+            "[bold white]# Checking channel " + self.domain.networkname + "[/]"
+        )
+        ordererservice = self.domain.orderer.name + "." + self.domain.name
+        if not ledgers.get(ordererservice) or not self.channel_exists():
+            self.rebuild()
+            return
+
+        scheduler = Scheduler()
+        orgpeers = {}
+        for org in self.domain.organizations:
+            for peer in org.peers:
+                orgpeers[peer.name] = (org, peer)
+                if ledgers.get(peer.name + "." + self.domain.name):
+                    scheduler.add(
+                        peer.name, functools.partial(self.peer_joined, org, peer)
+                    )
+
+        results = scheduler.run()
+        unjoined = [
+            orgpeer for name, orgpeer in orgpeers.items() if not results.get(name)
+        ]
+        if not unjoined:
+            console.print(
+                "[bold green]Channel " + self.domain.networkname + " intact[/]"
+            )
+            console.print("")
+            return
+
+        self.join_peers("Channel join", unjoined)
+        console.print("")
+
+    def channel_exists(self) -> bool:
+        """The orderer lists the channel through osnadmin channel list"""
+        try:
+            return "status" in self.readiness.channel_info()
+        except (CommandError, ValueError):
+            return False
+
+    def peer_joined(self, org: Organization, peer: Peer) -> bool:
+        """The peer lists the channel through peer channel list"""
+        peerpaths = self.paths.peer(org, peer)
+        output = commands.peer_channel_list(
+            org,
+            peer,
+            self.paths.APPPATH,
+            peerpaths.PEERCFGPATH,
+            peerpaths.PEERTLSCAPATH + "tls-cert.pem",
+            self.paths.org(org).ORGMSPPATH,
+        )
+        return self.domain.networkname in output.split()
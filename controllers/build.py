@@ -1,16 +1,25 @@
+import io
 import json
 import os
-import shutil
 from pathlib import Path
+from typing import Dict, List, Tuple
 
 import ruamel.yaml
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
 from rich.console import Console
 from ruamel.yaml.scalarstring import DoubleQuotedScalarString
 
 from controllers.header import Header
 from controllers.run import Run
+from helpers.caclient import CaClient
 from helpers.commands import Commands
+from helpers.cryptogen import Cryptogen
+from helpers.cryptostore import CryptoStore
+from helpers.manifest import Manifest
 from helpers.paths import Paths
+from helpers.scheduler import Scheduler
+from helpers.tracing import tracer
 from config.versions import FABRIC_VERSION, FABRIC_CA_VERSION
 from models.ca import Ca
 from models.domain import Domain
@@ -29,9 +38,12 @@ class Build:
     def __init__(self, domain: Domain) -> None:
         self.domain: Domain = domain
         self.paths = Paths(domain)
+        self.store = CryptoStore(self.paths.CRYPTOSTOREPATH)
         self.configyaml = "config.yaml"
         self.composecayaml = "compose-ca.yaml"
+        self.manifestjson = "manifest.json"
 
+    @tracer.phase()
     def build_all(self):
         """Build all config files for hosts and identities to start a Hyperledger Fabric network"""
         os.system("clear")
@@ -46,8 +58,182 @@ class Build:
         self.prepare_firefly()
         self.build_config()
         self.starting_opd()
+        manifest = Manifest(self.paths.DOMAINPATH + self.manifestjson)
+        self.check_artifacts(manifest)
+        manifest.save()
         console.print("")
 
+    @tracer.phase()
+    def build_incremental(self) -> List[str]:
+        """Rebuilds only the artifacts whose inputs changed since the last
+        build: identities are enrolled again, compose files and setup.json
+        rewritten, and only the affected containers recreated. Returns the
+        restarted services, empty when nothing changed."""
+        console.print("[bold orange1]BUILD[/]")
+        console.print("")
+
+        manifest = Manifest(self.paths.DOMAINPATH + self.manifestjson)
+        orderer, orgs, peers, composes, services, config = self.check_artifacts(
+            manifest
+        )
+
+        if not (orderer or orgs or peers or composes or services or config):
+            console.print("[bold green]Nothing changed[/]")
+            console.print("")
+            manifest.save()
+            return []
+
+        console.print(
+            "[bold white]# Rebuilding "
+            + str(int(orderer) + len(orgs) + len(peers))
+            + " identities, "
+            + str(len(composes))
+            + " compose files, "
+            + str(len(services))
+            + " services[/]"
+        )
+        self.paths.build_folders(False)
+
+        if self.composecayaml in composes:
+            self.write_yaml(self.composecayaml, composes.pop(self.composecayaml))
+
+        if orderer or orgs or peers:
+            if self.domain.cryptogen:
+                self.generate_identities(orgs, peers, orderer)
+            else:
+                run = Run(self.domain)
+                run.start_ca()
+
+                scheduler = Scheduler()
+                scheduler.add("tlsadmin", self.enroll_tls_admin)
+                if orderer:
+                    scheduler.add("orderer", self.enroll_orderer, ["tlsadmin"])
+                for org in orgs:
+                    self.schedule_identities_org(scheduler, org)
+                for org in {
+                    org.name: org for org, _ in peers if org not in orgs
+                }.values():
+                    self.schedule_identities_peers(
+                        scheduler,
+                        org,
+                        [peer for peerorg, peer in peers if peerorg is org],
+                    )
+                self.run_identities(scheduler)
+            self.prepare_firefly()
+
+        for filename, data in composes.items():
+            self.write_yaml(filename, data)
+        if config:
+            self.build_config()
+
+        if orderer:
+            services.append(self.domain.orderer.name + "." + self.domain.name)
+        for _, peer in peers:
+            services.append(peer.name + "." + self.domain.name)
+        services = list(dict.fromkeys(services))
+
+        if services:
+            run = Run(self.domain)
+            run.restart_services(services)
+
+        manifest.save()
+        return services
+
+    def check_artifacts(self, manifest: Manifest) -> tuple:
+        """Checks every artifact against the manifest. Returns whether the
+        orderer identities changed, the changed organizations, the changed
+        (organization, peer) identities, the compose files to rewrite, the
+        changed services and whether setup.json changed."""
+        paths = self.paths
+        domain = self.domain
+
+        tlsca = [domain.name, domain.ca.name, domain.ca.serverport, domain.cryptogen]
+        orderer = manifest.changed(
+            "identities:orderer",
+            {
+                "tlsca": tlsca,
+                "ca": [domain.caorderer.name, domain.caorderer.serverport],
+                "orderer": domain.orderer.name,
+            },
+            [paths.ORDKEYSTOREPATH + "key.pem", paths.ORDSIGNCERTPATH + "cert.crt"],
+        )
+
+        orgs = []
+        peers = []
+        for org in domain.organizations:
+            orgpaths = paths.org(org)
+            orginputs = {"tlsca": tlsca, "org": org.name, "ca": org.ca}
+            if manifest.changed(
+                "identities:org:" + org.name,
+                orginputs,
+                [
+                    orgpaths.ORGADMINKEYPATH + "key.pem",
+                    orgpaths.ORGMSPPATH + self.configyaml,
+                ],
+            ):
+                orgs.append(org)
+
+            for peer in org.peers:
+                peerpaths = paths.peer(org, peer)
+                if manifest.changed(
+                    "identities:peer:" + org.name + ":" + peer.name,
+                    {
+                        "tlsca": tlsca,
+                        "org": manifest.digest(orginputs),
+                        "peer": peer.name,
+                    },
+                    [
+                        peerpaths.PEERSERVERKEY,
+                        peerpaths.PEERSERVERCRT,
+                        peerpaths.PEERKEYSTOREMSPPATH + "key.pem",
+                    ],
+                ):
+                    peers.append((org, peer))
+
+        composes = {}
+        services = []
+        for filename, data in (
+            (self.composecayaml, self.ca_compose()),
+            ("compose-orderer.yaml", self.orderer_compose()),
+            ("compose-net.yaml", self.net_compose()),
+        ):
+            ondisk = {}
+            if os.path.isfile(paths.COMPOSEPATH + filename):
+                with open(paths.COMPOSEPATH + filename, encoding="utf-8") as f:
+                    ondisk = yaml.load(f)
+
+            for service, definition in data["services"].items():
+                if manifest.changed(
+                    "service:" + service,
+                    definition,
+                    adopt=ondisk["services"].get(service, {}) if ondisk else {},
+                ):
+                    services.append(service)
+
+            if manifest.digest(data) != manifest.digest(ondisk):
+                composes[filename] = data
+
+        if domain.cryptogen:
+            services = [
+                service
+                for service in services
+                if service not in self.ca_compose()["services"]
+            ]
+
+        configfile = paths.DOMAINPATH + "setup.json"
+        config = not os.path.isfile(configfile)
+        if not config:
+            with open(configfile, encoding="utf-8") as config_file:
+                config = config_file.read() != self.config_json()
+
+        return orderer, orgs, peers, composes, services, config
+
+    def write_yaml(self, filename: str, data: dict):
+        """_summary_"""
+        with open(self.paths.COMPOSEPATH + filename, "w", encoding="utf-8") as f:
+            yaml.dump(data, f)
+
+    @tracer.phase()
     def build_new_organization(self, org: Organization):
         """Build all config files for hosts and identities of a new organization added in a running Hyperledger Fabric network"""
         self.paths.build_folders_org(org)
@@ -58,19 +244,79 @@ class Build:
         self.build_config()
         self.starting_pd_org(org)
 
+    @tracer.phase()
     def build_new_peer(self, org: Organization, peer: Peer):
         """Build all config files and identities for a new peer added in a organization added in a running Hyperledger Fabric network"""
-        self.paths.set_org_paths(org)
         self.paths.build_folder_peer(org, peer)
         self.build_identities_peer(org, peer)
         self.build_peer(peer)
         self.build_config()
         self.starting_new_peer(peer)
 
+    @tracer.phase()
+    def build_new_organizations(self, orgs: List[Organization]):
+        """Build several new organizations at once: one CA overlay, one
+        concurrent enrollment pass and one peers overlay"""
+        for org in orgs:
+            self.paths.build_folders_org(org)
+        self.build_new_orgs_ca(orgs, "compose-ca-new.yaml")
+
+        if self.domain.cryptogen:
+            self.generate_identities(
+                orgs, [(org, peer) for org in orgs for peer in org.peers]
+            )
+        else:
+            scheduler = Scheduler()
+            scheduler.add("tlsadmin", self.enroll_tls_admin)
+            for org in orgs:
+                self.schedule_identities_org(scheduler, org)
+            self.run_identities(scheduler)
+
+        peers = [peer for org in orgs for peer in org.peers]
+        console.print("[bold white]# Building new peers and databases[/]")
+        self.build_peers_overlay(peers, "compose-net-new.yaml")
+        self.build_config()
+
+        console.print("[bold white]# Starting new peers and databases[/]")
+        run = Run(self.domain)
+        run.start_overlay("compose-net-new.yaml", peers, "Organizations start")
+
+    @tracer.phase()
+    def build_new_peers(self, org: Organization, peers: List[Peer]):
+        """Build several new peers of an organization at once: one concurrent
+        enrollment pass and one peers overlay"""
+        for peer in peers:
+            self.paths.build_folder_peer(org, peer)
+        self.build_identities_peers(org, peers)
+
+        console.print("[bold white]# Building new " + org.name + " peers[/]")
+        self.build_peers_overlay(peers, "compose-net-new.yaml")
+        self.build_config()
+
+        console.print("[bold white]# Starting new " + org.name + " peers[/]")
+        run = Run(self.domain)
+        run.start_overlay("compose-net-new.yaml", peers, "Peers start")
+
+    @tracer.phase()
     def build_ca(self):
         """_summary_"""
         console.print("[bold white]# Building and starting CAs[/]")
 
+        cafile = self.ca_compose()
+
+        with open(
+            self.paths.COMPOSEPATH + self.composecayaml, "w", encoding="utf-8"
+        ) as yaml_file:
+            yaml.dump(cafile, yaml_file)
+
+        if self.domain.cryptogen:
+            return
+
+        run = Run(self.domain)
+        run.start_ca()
+
+    def ca_compose(self) -> dict:
+        """compose-ca.yaml content"""
         cafile = {
             "version": "3.7",
             "networks": {self.domain.networkname: {"name": self.domain.networkname}},
@@ -90,18 +336,17 @@ class Build:
             caorg = self.ca_org_yaml(org.ca)
             cafile["services"][org.ca.name + "." + self.domain.name] = caorg
 
-        with open(
-            self.paths.COMPOSEPATH + self.composecayaml, "w", encoding="utf-8"
-        ) as yaml_file:
-            yaml.dump(cafile, yaml_file)
-
-        run = Run(self.domain)
-        run.start_ca()
+        return cafile
 
+    @tracer.phase()
     def build_new_org_ca(self, org: Organization):
         """_summary_"""
         console.print("[bold white]# Building and starting " + org.name + " CA[/]")
+        self.build_new_orgs_ca([org], "compose-ca-" + org.name + ".yaml")
 
+    def build_new_orgs_ca(self, orgs: List[Organization], overlay: str):
+        """Adds the CAs of new organizations to compose-ca.yaml and starts
+        them from a temporary overlay holding only those services"""
         with open(
             self.paths.COMPOSEPATH + self.composecayaml, encoding="utf-8"
         ) as yamlca_file:
@@ -113,26 +358,30 @@ class Build:
             "services": {},
         }
 
-        self.paths.set_org_paths(org)
-        caorg = self.ca_org_yaml(org.ca)
+        for org in orgs:
+            caorg = self.ca_org_yaml(org.ca)
+
+            cafile["services"][org.ca.name + "." + self.domain.name] = caorg
+            cadata["services"][org.ca.name + "." + self.domain.name] = caorg
+
+        with open(
+            self.paths.COMPOSEPATH + self.composecayaml, "w", encoding="utf-8"
+        ) as cayaml_file:
+            yaml.dump(cadata, cayaml_file)
 
-        cafile["services"][org.ca.name + "." + self.domain.name] = caorg
-        cadata["services"][org.ca.name + "." + self.domain.name] = caorg
+        # Cryptogen networks do not start the CAs, so no overlay is needed
+        if self.domain.cryptogen:
+            return
 
         with open(
-            self.paths.COMPOSEPATH + "compose-ca-" + org.name + ".yaml",
+            self.paths.COMPOSEPATH + overlay,
             "w",
             encoding="utf-8",
         ) as yaml_file:
             yaml.dump(cafile, yaml_file)
 
-        with open(
-            self.paths.COMPOSEPATH + self.composecayaml, "w", encoding="utf-8"
-        ) as cayaml_file:
-            yaml.dump(cadata, cayaml_file)
-
         run = Run(self.domain)
-        run.start_ca_new(org.name)
+        run.start_ca_overlay(overlay, orgs)
 
     def ca_org_yaml(self, ca: Ca) -> dict:
         """_summary_"""
@@ -165,6 +414,13 @@ class Build:
             "volumes": [ca.volumes],
             "container_name": ca.name + "." + self.domain.name,
             "networks": [self.domain.networkname],
+            "healthcheck": self.healthcheck(
+                "wget --no-check-certificate -q -O - "
+                + ("https" if ca.FABRIC_CA_SERVER_TLS_ENABLED else "http")
+                + "://localhost:"
+                + str(ca.FABRIC_CA_SERVER_PORT)
+                + "/cainfo"
+            ),
         }
 
         caorg["ports"][0] = DoubleQuotedScalarString(
@@ -176,6 +432,32 @@ class Build:
 
         return caorg
 
+    def healthcheck(self, test: str) -> dict:
+        """Compose healthcheck running test in the container shell"""
+        return {
+            "test": ["CMD-SHELL", test],
+            "interval": "2s",
+            "timeout": "3s",
+            "retries": 30,
+            "start_period": "5s",
+        }
+
+    def operations_healthcheck(self, listenaddress: str) -> dict:
+        """Healthcheck on the /healthz endpoint of a peer or orderer
+        operations service. The Fabric images ship neither wget nor curl, so
+        the request goes through the /dev/tcp device of bash."""
+        host, port = listenaddress.rsplit(":", 1)
+        return self.healthcheck(
+            "bash -c 'exec 3<>/dev/tcp/"
+            + host
+            + "/"
+            + port
+            + ' && printf "GET /healthz HTTP/1.0\\r\\nHost: '
+            + host
+            + '\\r\\n\\r\\n" >&3'
+            + ' && head -n 1 <&3 | grep -q " 200 "\''
+        )
+
     def config_yaml(self, serverport: int, servername: str, path: str):
         CACERTPEMFILE = (
             "cacerts/localhost-"
@@ -208,8 +490,10 @@ class Build:
             }
         }
 
-        with open(path + self.configyaml, "w", encoding="utf-8") as yaml_file:
-            yaml.dump(configfile, yaml_file)
+        # config.yaml is copied through the store to the other MSP folders
+        data = io.StringIO()
+        yaml.dump(configfile, data)
+        self.store.write(path + self.configyaml, data.getvalue().encode("utf-8"))
 
     def peer_yaml(self, peer: Peer) -> dict:
         peerdata = {
@@ -260,10 +544,16 @@ class Build:
             "command": "peer node start",
             "volumes": peer.volumes,
             "networks": [self.domain.networkname],
-            "depends_on": [
-                peer.database.name + "." + self.domain.name,
+            "depends_on": {
                 # self.domain.orderer.name + "." + self.domain.name,
-            ],
+            },
+            "healthcheck": self.operations_healthcheck(
+                peer.CORE_OPERATIONS_LISTENADDRESS
+            ),
+        }
+
+        peerdata["depends_on"][peer.database.name + "." + self.domain.name] = {
+            "condition": "service_healthy"
         }
 
         peerdata["ports"][0] = DoubleQuotedScalarString(
@@ -289,6 +579,7 @@ class Build:
             "ports": ["0"],
             "container_name": peer.database.name + "." + self.domain.name,
             "networks": [self.domain.networkname],
+            "healthcheck": self.healthcheck("curl -fsS http://localhost:5984/_up"),
         }
 
         databasedata["ports"][0] = DoubleQuotedScalarString(
@@ -297,112 +588,263 @@ class Build:
 
         return databasedata
 
+    @tracer.phase()
     def build_config(self):
         """_summary_"""
         console.print("[bold white]# Creating domain config file[/]")
 
-        json_object = json.dumps(self.domain, default=lambda x: x.__dict__, indent=4)
         with open(
             self.paths.DOMAINPATH + "setup.json", "w", encoding="utf-8"
         ) as outfile:
-            outfile.write(json_object)
+            outfile.write(self.config_json())
+
+    def config_json(self) -> str:
+        """setup.json content"""
+        return json.dumps(self.domain, default=lambda x: x.__dict__, indent=4)
 
+    @tracer.phase()
     def build_identities(self):
         """_summary_"""
+        if self.domain.cryptogen:
+            self.generate_identities(
+                self.domain.organizations,
+                [
+                    (org, peer)
+                    for org in self.domain.organizations
+                    for peer in org.peers
+                ],
+                True,
+            )
+            return
+
         console.print("[bold white]# Creating and registering identities[/]")
 
+        scheduler = Scheduler()
+        scheduler.add("tlsadmin", self.enroll_tls_admin)
+        scheduler.add("orderer", self.enroll_orderer, ["tlsadmin"])
+        for org in self.domain.organizations:
+            self.schedule_identities_org(scheduler, org)
+
+        self.run_identities(scheduler)
+
+    @tracer.phase()
+    def build_identities_org(self, org: Organization):
+        """_summary_"""
+        if self.domain.cryptogen:
+            self.generate_identities([org], [(org, peer) for peer in org.peers])
+            return
+
+        scheduler = Scheduler()
+        scheduler.add("tlsadmin", self.enroll_tls_admin)
+        self.schedule_identities_org(scheduler, org)
+
+        self.run_identities(scheduler)
+
+    @tracer.phase()
+    def build_identities_peer(self, org: Organization, peer: Peer):
+        """_summary_"""
+        self.build_identities_peers(org, [peer])
+
+    @tracer.phase()
+    def build_identities_peers(self, org: Organization, peers: List[Peer]):
+        """_summary_"""
+        if self.domain.cryptogen:
+            self.generate_identities([], [(org, peer) for peer in peers])
+            return
+
+        scheduler = Scheduler()
+        scheduler.add("tlsadmin", self.enroll_tls_admin)
+        self.schedule_identities_peers(scheduler, org, peers)
+
+        self.run_identities(scheduler)
+
+    def schedule_identities_peers(
+        self, scheduler: Scheduler, org: Organization, peers: List[Peer]
+    ):
+        """Adds the enrollment tasks of some peers of an organization whose
+        own identities are already enrolled"""
+        scheduler.add("orgadmin:" + org.name, lambda: self.enroll_org_admin(org))
+        for peer in peers:
+            scheduler.add(
+                "peer:" + org.name + ":" + peer.name,
+                lambda peer=peer: self.enroll_peer(org, peer),
+                ["tlsadmin", "orgadmin:" + org.name],
+            )
+
+    def schedule_identities_org(self, scheduler: Scheduler, org: Organization):
+        """Adds the enrollment tasks of an organization and its peers. Peers
+        only wait for the TLS CA admin and their own organization."""
+        scheduler.add("orgadmin:" + org.name, lambda: self.enroll_org_admin(org))
+        scheduler.add(
+            "org:" + org.name,
+            lambda: self.enroll_org(org),
+            ["orgadmin:" + org.name],
+        )
+        for peer in org.peers:
+            scheduler.add(
+                "peer:" + org.name + ":" + peer.name,
+                lambda peer=peer: self.enroll_peer(org, peer),
+                ["tlsadmin", "org:" + org.name],
+            )
+
+    def run_identities(self, scheduler: Scheduler):
+        """_summary_"""
+        scheduler.run()
+        if scheduler.failed:
+            raise next(iter(scheduler.failed.values()))
+
+    @tracer.phase()
+    def generate_identities(
+        self,
+        orgs: List[Organization],
+        peers: List[Tuple[Organization, Peer]],
+        orderer: bool = False,
+    ):
+        """Cryptogen mode: signs the identities offline instead of enrolling
+        them on the CAs, then lays the files out as after an enrollment"""
+        paths = self.paths
+        console.print("[bold white]# Generating identities offline[/]")
+
+        cryptogen = Cryptogen(self.domain)
+        count = cryptogen.generate(orgs, peers, orderer)
+
+        if orderer:
+            self.config_yaml(
+                self.domain.ca.serverport,
+                self.domain.ca.name,
+                paths.CACLIENTDOMAINMSPPATH,
+            )
+            self.config_yaml(
+                self.domain.caorderer.serverport,
+                self.domain.caorderer.name,
+                paths.CAORDERERCACLIENTMSPPATH,
+            )
+            self.store.copy(
+                paths.TLSCERTDOMAINFILE,
+                paths.ORDERERORGTLSCAMSPPATH + "tls-cert.pem",
+            )
+            self.layout_orderer()
+
+        for org in orgs:
+            self.config_yaml(
+                org.ca.serverport,
+                org.ca.name,
+                paths.org(org).CAORGCACLIENTMSPPATH,
+            )
+            self.layout_org(org)
+
+        for org, peer in peers:
+            self.layout_peer(org, peer)
+
+        console.print("[bold]## " + str(count) + " certificates issued[/]")
+
+    @tracer.phase()
+    def enroll_tls_admin(self):
+        """_summary_"""
+        paths = self.paths
+
         console.print("[bold]## Enroll TLS CA Admin[/]")
 
         self.config_yaml(
             self.domain.ca.serverport,
             self.domain.ca.name,
-            self.paths.CACLIENTDOMAINMSPPATH,
+            paths.CACLIENTDOMAINMSPPATH,
         )
 
         self.config_yaml(
             self.domain.caorderer.serverport,
             self.domain.caorderer.name,
-            self.paths.CAORDERERCACLIENTMSPPATH,
+            paths.CAORDERERCACLIENTMSPPATH,
         )
 
         commands.enroll(
-            self.paths.APPPATH,
-            self.paths.CACLIENTDOMAINPATH,
+            paths.APPPATH,
+            paths.CACLIENTDOMAINPATH,
             "admin",
             "adminpw",
             self.domain.ca.serverport,
-            self.paths.CACERTDOMAINFILE,
+            paths.CACERTDOMAINFILE,
+        )
+
+        self.store.copy(
+            paths.TLSCERTDOMAINFILE,
+            paths.ORDERERORGTLSCAMSPPATH + "tls-cert.pem",
         )
 
+    @tracer.phase()
+    def enroll_orderer(self):
+        """_summary_"""
+        paths = self.paths
+
         console.print("[bold]## Registering TLS CA Admin Orderer[/]")
         commands.register_orderer(
-            self.paths.APPPATH,
-            self.paths.CACLIENTDOMAINPATH,
+            paths.APPPATH,
+            paths.CACLIENTDOMAINPATH,
             "orderer",
             "ordererpw",
             self.domain.ca.serverport,
-            self.paths.TLSCERTDOMAINFILE,
+            paths.TLSCERTDOMAINFILE,
         )
 
         console.print("[bold]## Enroll Orderer Org CA Admin [/]")
         commands.enroll(
-            self.paths.APPPATH,
-            self.paths.CAORDERERCACLIENTPATH,
+            paths.APPPATH,
+            paths.CAORDERERCACLIENTPATH,
             "admin",
             "adminpw",
             self.domain.caorderer.serverport,
-            self.paths.CACERTORDERERFILE,
+            paths.CACERTORDERERFILE,
         )
 
         console.print("[bold]## Registering Orderer Org CA Admin :: Orderer[/]")
         commands.register_orderer(
-            self.paths.APPPATH,
-            self.paths.CAORDERERCACLIENTPATH,
+            paths.APPPATH,
+            paths.CAORDERERCACLIENTPATH,
             "orderer",
             "ordererpw",
             self.domain.caorderer.serverport,
-            self.paths.CACERTORDERERFILE,
+            paths.CACERTORDERERFILE,
         )
 
         console.print("[bold]## Registering Orderer Org CA Admin :: Admin[/]")
         commands.register_orderer_admin(
-            self.paths.APPPATH,
-            self.paths.CAORDERERCACLIENTPATH,
+            paths.APPPATH,
+            paths.CAORDERERCACLIENTPATH,
             "ordereradmin",
             "ordereradminpw",
             self.domain.caorderer.serverport,
-            self.paths.CACERTORDERERFILE,
+            paths.CACERTORDERERFILE,
         )
 
         console.print("[bold]## Enroll Orderer Org Admin MSP[/]")
         commands.enroll_msp(
-            self.paths.APPPATH,
-            self.paths.ORDERERORGADMINPATH,
+            paths.APPPATH,
+            paths.ORDERERORGADMINPATH,
             "admin",
             "adminpw",
             self.domain.caorderer.serverport,
-            self.paths.CACERTORDERERFILE,
+            paths.CACERTORDERERFILE,
         )
 
         commands.enroll_tls(
-            self.paths.APPPATH,
-            self.paths.ORDERERORGADMINPATH,
+            paths.APPPATH,
+            paths.ORDERERORGADMINPATH,
             "admin",
             "adminpw",
             self.domain.caorderer.serverport,
             ["localhost"],
             "localhost",
-            self.paths.TLSCERTORDERERFILE,
+            paths.TLSCERTORDERERFILE,
         )
 
         console.print("[bold]## Enroll Orderer[/]")
         commands.enroll_msp(
-            self.paths.APPPATH,
-            self.paths.ORDDOMAINPATH,
+            paths.APPPATH,
+            paths.ORDDOMAINPATH,
             "orderer",
             "ordererpw",
             self.domain.caorderer.serverport,
-            self.paths.CACERTORDERERFILE,
+            paths.CACERTORDERERFILE,
         )
 
         console.print("[bold]## Enroll Orderer TLS[/]")
@@ -412,296 +854,305 @@ class Build:
             "localhost",
         ]
         commands.enroll_tls(
-            self.paths.APPPATH,
-            self.paths.ORDDOMAINPATH,
+            paths.APPPATH,
+            paths.ORDDOMAINPATH,
             "admin",
             "adminpw",
             self.domain.ca.serverport,
             hosts,
             self.domain.orderer.name + "." + self.domain.name,
-            self.paths.TLSCERTDOMAINFILE,
+            paths.TLSCERTDOMAINFILE,
         )
 
-        shutil.copy(
-            self.paths.CAORDERERCACLIENTMSPPATH + self.configyaml,
-            self.paths.ORDDOMAINMSPPATH + self.configyaml,
+        self.layout_orderer()
+
+    def layout_orderer(self):
+        """Copies the orderer enrollment files to the names Fabric reads"""
+        paths = self.paths
+
+        self.store.copy(
+            paths.CAORDERERCACLIENTMSPPATH + self.configyaml,
+            paths.ORDDOMAINMSPPATH + self.configyaml,
         )
 
-        shutil.copy(
-            self.paths.CAORDERERCACLIENTMSPPATH + self.configyaml,
-            self.paths.ORDERERORGMSPPATH + self.configyaml,
+        self.store.copy(
+            paths.CAORDERERCACLIENTMSPPATH + self.configyaml,
+            paths.ORDERERORGMSPPATH + self.configyaml,
         )
 
-        shutil.copy(
-            self.paths.ORDERERORGSIGNCERTPATH + "cert.pem",
-            self.paths.ORDDOMAINADMINCERTPATH + "cert.pem",
+        self.store.copy(
+            paths.ORDERERORGSIGNCERTPATH + "cert.pem",
+            paths.ORDDOMAINADMINCERTPATH + "cert.pem",
         )
-        shutil.copy(
-            self.paths.ORDSIGNCERTPATH + "cert.pem",
-            self.paths.ORDSIGNCERTPATH + "cert.crt",
+        self.store.copy(
+            paths.ORDSIGNCERTPATH + "cert.pem",
+            paths.ORDSIGNCERTPATH + "cert.crt",
         )
 
-        for file_name in os.listdir(self.paths.ORDKEYSTOREPATH):
-            shutil.copy(
-                self.paths.ORDKEYSTOREPATH + file_name,
-                self.paths.ORDKEYSTOREPATH + "key.pem",
-            )
+        self.layout_key(paths.ORDKEYSTOREPATH)
 
-        for file_name in os.listdir(self.paths.ORDTLSCAPATH):
-            shutil.copy(
-                self.paths.ORDTLSCAPATH + file_name,
-                self.paths.ORDTLSCAPATH + "tls-cert.pem",
+        for file_name in os.listdir(paths.ORDTLSCAPATH):
+            self.store.copy(
+                paths.ORDTLSCAPATH + file_name,
+                paths.ORDTLSCAPATH + "tls-cert.pem",
             )
-            shutil.copy(
-                self.paths.ORDTLSCAPATH + file_name,
-                self.paths.ORDTLSCAMSPPATH + "tlsca-cert.pem",
+            self.store.copy(
+                paths.ORDTLSCAPATH + file_name,
+                paths.ORDTLSCAMSPPATH + "tlsca-cert.pem",
             )
 
-        for org in self.domain.organizations:
-            self.build_identities_org(org)
-
-    def build_identities_org(self, org: Organization):
+    def layout_key(self, keystore: str):
+        """Copies the key of the enrolled certificate, signcerts/cert.pem
+        next to keystore, to keystore/key.pem. Keys of earlier enrollments
+        are removed, so a re-enrollment cannot pair key.pem with another
+        certificate."""
+        certfile = keystore[: -len("keystore/")] + "signcerts/cert.pem"
+        with open(certfile, "rb") as cert_file:
+            cert = x509.load_pem_x509_certificate(cert_file.read())
+        public = cert.public_key().public_numbers()
+
+        found = False
+        for file_name in os.listdir(keystore):
+            if file_name == "key.pem":
+                continue
+            with open(keystore + file_name, "rb") as key_file:
+                key = serialization.load_pem_private_key(key_file.read(), None)
+            if key.public_key().public_numbers() == public:
+                self.store.copy(keystore + file_name, keystore + "key.pem")
+                found = True
+            else:
+                os.remove(keystore + file_name)
+
+        if not found:
+            raise RuntimeError("no key in " + keystore + " matches " + certfile)
+
+    @tracer.phase()
+    def enroll_org_admin(self, org: Organization):
         """_summary_"""
-
-        self.paths.set_org_paths(org)
+        paths = self.paths
+        orgpaths = paths.org(org)
 
         self.config_yaml(
             org.ca.serverport,
             org.ca.name,
-            self.paths.CAORGCACLIENTMSPPATH,
+            orgpaths.CAORGCACLIENTMSPPATH,
         )
 
-        console.print("[bold]## Enroll Org CA Admin[/]")
+        console.print("[bold]## Enroll " + org.name + " CA Admin[/]")
         commands.enroll(
-            self.paths.APPPATH,
-            self.paths.CAORGCACLIENTPATH,
+            paths.APPPATH,
+            orgpaths.CAORGCACLIENTPATH,
             "admin",
             "adminpw",
             org.ca.serverport,
-            self.paths.CACERTORGFILE,
+            orgpaths.CACERTORGFILE,
         )
 
-        console.print("[bold]## Enroll Org CA Admin MSP[/]")
+    @tracer.phase()
+    def enroll_org(self, org: Organization):
+        """_summary_"""
+        paths = self.paths
+        orgpaths = paths.org(org)
+
+        console.print("[bold]## Enroll " + org.name + " CA Admin MSP[/]")
         commands.enroll_msp(
-            self.paths.APPPATH,
-            self.paths.CAORGCACLIENTPATH,
+            paths.APPPATH,
+            orgpaths.CAORGCACLIENTPATH,
             "admin",
             "adminpw",
             org.ca.serverport,
-            self.paths.CACERTORGFILE,
+            orgpaths.CACERTORGFILE,
         )
 
-        console.print("[bold]## Register Org CA Admin :: Admin[/]")
-        commands.register_admin(
-            self.paths.APPPATH,
-            self.paths.CAORGCACLIENTPATH,
-            org.name + "admin",
-            org.name + "adminpw",
-            org.ca.serverport,
-            self.paths.CACERTORGFILE,
-        )
+        console.print("[bold]## Register " + org.name + " CA Admin :: Admin[/]")
+        caclient = CaClient(org.ca.serverport, orgpaths.CACERTORGFILE)
+        caclient.register(org.name + "admin", org.name + "adminpw", "admin")
 
-        console.print("[bold]## Register Org CA Admin :: User[/]")
-        commands.register_user(
-            self.paths.APPPATH,
-            self.paths.CAORGCACLIENTPATH,
-            "user",
-            "userpw",
-            org.ca.serverport,
-            self.paths.CACERTORGFILE,
-        )
+        console.print("[bold]## Register " + org.name + " CA Admin :: User[/]")
+        caclient.register("user", "userpw", "user")
 
-        console.print("[bold]## Enroll Org Admin[/]")
+        console.print("[bold]## Enroll " + org.name + " Admin[/]")
         commands.enroll_msp(
-            self.paths.APPPATH,
-            self.paths.ORGCACLIENTPATH,
+            paths.APPPATH,
+            orgpaths.ORGCACLIENTPATH,
             "admin",
             "adminpw",
             org.ca.serverport,
-            self.paths.CACERTORGFILE,
+            orgpaths.CACERTORGFILE,
         )
 
-        console.print("[bold]## Enroll Org MSP[/]")
+        console.print("[bold]## Enroll " + org.name + " MSP[/]")
         commands.enroll_msp(
-            self.paths.APPPATH,
-            self.paths.ORGPATH,
+            paths.APPPATH,
+            orgpaths.ORGPATH,
             "admin",
             "adminpw",
             org.ca.serverport,
-            self.paths.CACERTORGFILE,
+            orgpaths.CACERTORGFILE,
         )
 
         commands.enroll_tls(
-            self.paths.APPPATH,
-            self.paths.ORGCACLIENTPATH,
+            paths.APPPATH,
+            orgpaths.ORGCACLIENTPATH,
             "admin",
             "adminpw",
             org.ca.serverport,
             ["localhost"],
             "localhost",
-            self.paths.TLSCERTORGFILE,
+            orgpaths.TLSCERTORGFILE,
         )
 
         commands.enroll_tls(
-            self.paths.APPPATH,
-            self.paths.ORGPATH,
+            paths.APPPATH,
+            orgpaths.ORGPATH,
             "admin",
             "adminpw",
             org.ca.serverport,
             ["localhost"],
             "localhost",
-            self.paths.TLSCERTORGFILE,
+            orgpaths.TLSCERTORGFILE,
         )
 
-        shutil.copy(
-            self.paths.CAORGCACLIENTMSPPATH + self.configyaml,
-            self.paths.ORGMSPPATH + self.configyaml,
+        self.layout_org(org)
+
+    def layout_org(self, org: Organization):
+        """Copies the organization enrollment files to the names Fabric
+        reads"""
+        orgpaths = self.paths.org(org)
+
+        self.store.copy(
+            orgpaths.CAORGCACLIENTMSPPATH + self.configyaml,
+            orgpaths.ORGMSPPATH + self.configyaml,
         )
 
-        for file_name in os.listdir(self.paths.ORGADMINKEYPATH):
-            shutil.copy(
-                self.paths.ORGADMINKEYPATH + file_name,
-                self.paths.ORGADMINKEYPATH + "key.pem",
-            )
+        self.layout_key(orgpaths.ORGADMINKEYPATH)
 
-        for file_name in os.listdir(self.paths.ORGADMINTLSKEYPATH):
-            shutil.copy(
-                self.paths.ORGADMINTLSKEYPATH + file_name,
-                self.paths.ORGADMINTLSKEYPATH + "key.pem",
-            )
+        self.layout_key(orgpaths.ORGADMINTLSKEYPATH)
 
-        for file_name in os.listdir(self.paths.MSPORGCACERTPATH):
-            shutil.copy(
-                self.paths.MSPORGCACERTPATH + file_name,
-                self.paths.MSPORGCACERTPATH + "ca-cert.pem",
+        for file_name in os.listdir(orgpaths.MSPORGCACERTPATH):
+            self.store.copy(
+                orgpaths.MSPORGCACERTPATH + file_name,
+                orgpaths.MSPORGCACERTPATH + "ca-cert.pem",
             )
 
-        shutil.copytree(
-            self.paths.TLSORGTLSCAPATH,
-            self.paths.MSPORGPATH + "/tlscacerts",
+        self.store.copytree(
+            orgpaths.TLSORGTLSCAPATH,
+            orgpaths.MSPORGPATH + "/tlscacerts",
         )
 
-        shutil.copy(
-            self.paths.CAORGCRYPTOPATH + "tls-cert.pem",
-            self.paths.MSPORGPATH + "/tlscacerts",
+        self.store.copy(
+            orgpaths.CAORGCRYPTOPATH + "tls-cert.pem",
+            orgpaths.MSPORGPATH + "/tlscacerts",
         )
 
-        for peer in org.peers:
-            self.build_identities_peer(org, peer)
-
-    def build_identities_peer(self, org: Organization, peer: Peer):
+    @tracer.phase()
+    def enroll_peer(self, org: Organization, peer: Peer):
         """_summary_"""
-
-        self.paths.set_peer_paths(org, peer)
+        paths = self.paths
+        orgpaths = paths.org(org)
+        peerpaths = paths.peer(org, peer)
         peername = peer.name.replace(".", "")
 
-        console.print("[bold]## Registering TLS CA Admin Peer[/]")
-        commands.enroll(
-            self.paths.APPPATH,
-            self.paths.CACLIENTDOMAINPATH,
-            "admin",
-            "adminpw",
-            self.domain.ca.serverport,
-            self.paths.CACERTDOMAINFILE,
-        )
-        commands.register_peer(
-            self.paths.APPPATH,
-            self.paths.CACLIENTDOMAINPATH,
-            peername,
-            peername + "pw",
-            self.domain.ca.serverport,
-            self.paths.TLSCERTDOMAINFILE,
-        )
+        console.print("[bold]## Registering TLS CA Admin :: " + peer.name + "[/]")
+        tlsclient = CaClient(self.domain.ca.serverport, paths.TLSCERTDOMAINFILE)
+        tlsclient.register(peername, peername + "pw", "peer")
 
-        console.print("[bold]## Register Org CA Admin :: Peer[/]")
-        commands.enroll(
-            self.paths.APPPATH,
-            self.paths.CAORGCACLIENTPATH,
-            "admin",
-            "adminpw",
-            org.ca.serverport,
-            self.paths.CACERTORGFILE,
-        )
-        commands.register_peer(
-            self.paths.APPPATH,
-            self.paths.CAORGCACLIENTPATH,
-            peername,
-            peername + "pw",
-            org.ca.serverport,
-            self.paths.CACERTORGFILE,
+        console.print(
+            "[bold]## Register " + org.name + " CA Admin :: " + peer.name + "[/]"
         )
+        caclient = CaClient(org.ca.serverport, orgpaths.CACERTORGFILE)
+        caclient.register(peername, peername + "pw", "peer")
 
-        console.print("[bold]## Enroll Peer MSP[/]")
+        console.print("[bold]## Enroll " + peer.name + " MSP[/]")
         commands.enroll_msp(
-            self.paths.APPPATH,
-            self.paths.PEERPATH,
+            paths.APPPATH,
+            peerpaths.PEERPATH,
             peername,
             peername + "pw",
             org.ca.serverport,
-            self.paths.CACERTORGFILE,
+            orgpaths.CACERTORGFILE,
         )
 
-        console.print("[bold]## Enroll Peer TLS[/]")
+        console.print("[bold]## Enroll " + peer.name + " TLS[/]")
         hosts = [peer.name + "." + self.domain.name, peer.name, "localhost"]
         commands.enroll_tls(
-            self.paths.APPPATH,
-            self.paths.PEERPATH,
+            paths.APPPATH,
+            peerpaths.PEERPATH,
             "admin",
             "adminpw",
             self.domain.ca.serverport,
             hosts,
             peer.name + "." + self.domain.name,
-            self.paths.TLSCERTDOMAINFILE,
+            paths.TLSCERTDOMAINFILE,
         )
 
-        shutil.copy(
-            self.paths.CAORGCACLIENTMSPPATH + self.configyaml,
-            self.paths.PEERMSPPATH + self.configyaml,
+        self.layout_peer(org, peer)
+
+    def layout_peer(self, org: Organization, peer: Peer):
+        """Copies the peer enrollment files to the names Fabric reads"""
+        orgpaths = self.paths.org(org)
+        peerpaths = self.paths.peer(org, peer)
+
+        self.store.copy(
+            orgpaths.CAORGCACLIENTMSPPATH + self.configyaml,
+            peerpaths.PEERMSPPATH + self.configyaml,
         )
 
-        shutil.copy(
-            self.paths.ORGSIGNCERTPATH + "cert.pem",
-            self.paths.PEERADMINCERTPATH + "cert.pem",
+        self.store.copy(
+            orgpaths.ORGSIGNCERTPATH + "cert.pem",
+            peerpaths.PEERADMINCERTPATH + "cert.pem",
         )
 
-        shutil.copy(
-            self.paths.PEERSIGNCERTPATH + "cert.pem",
-            self.paths.PEERSIGNCERTPATH + "cert.crt",
+        self.store.copy(
+            peerpaths.PEERSIGNCERTPATH + "cert.pem",
+            peerpaths.PEERSIGNCERTPATH + "cert.crt",
         )
 
-        for file_name in os.listdir(self.paths.PEERKEYSTOREPATH):
-            shutil.copy(
-                self.paths.PEERKEYSTOREPATH + file_name,
-                self.paths.PEERKEYSTOREPATH + "key.pem",
-            )
+        self.layout_key(peerpaths.PEERKEYSTOREPATH)
 
-        for file_name in os.listdir(self.paths.PEERKEYSTOREMSPPATH):
-            shutil.copy(
-                self.paths.PEERKEYSTOREMSPPATH + file_name,
-                self.paths.PEERKEYSTOREMSPPATH + "key.pem",
-            )
+        self.layout_key(peerpaths.PEERKEYSTOREMSPPATH)
 
-        for file_name in os.listdir(self.paths.PEERTLSCAPATH):
-            shutil.copy(
-                self.paths.PEERTLSCAPATH + file_name,
-                self.paths.PEERTLSCAPATH + "tls-cert.pem",
+        for file_name in os.listdir(peerpaths.PEERTLSCAPATH):
+            self.store.copy(
+                peerpaths.PEERTLSCAPATH + file_name,
+                peerpaths.PEERTLSCAPATH + "tls-cert.pem",
             )
-            shutil.copy(
-                self.paths.PEERTLSCAPATH + file_name,
-                self.paths.PEERTLSCAMSPPATH + "tlsca-cert.pem",
+            self.store.copy(
+                peerpaths.PEERTLSCAPATH + file_name,
+                peerpaths.PEERTLSCAMSPPATH + "tlsca-cert.pem",
             )
 
-        shutil.copy(
-            self.paths.TLSCERTDOMAINFILE,
-            self.paths.ORDERERORGTLSCAMSPPATH + "tls-cert.pem",
+    @tracer.phase()
+    def register_users(self, org: Organization, count: int) -> Dict[str, str]:
+        """Registers count client identities (<org>client1, ...) on the org CA
+        for load tests. Returns their secrets."""
+        console.print(
+            "[bold white]# Registering "
+            + str(count)
+            + " "
+            + org.name
+            + " client identities[/]"
         )
 
+        caclient = CaClient(org.ca.serverport, self.paths.org(org).CACERTORGFILE)
+        return caclient.register_users(
+            [org.name + "client" + str(i) for i in range(1, count + 1)]
+        )
+
+    @tracer.phase()
     def build_orderer(self):
         """_summary_"""
         console.print("[bold white]# Building " + self.domain.name + " orderer[/]")
 
         pathorderer = "domains/" + self.domain.name + "/compose/"
 
+        with open(
+            pathorderer + "compose-orderer.yaml", "w", encoding="utf-8"
+        ) as yaml_file:
+            yaml.dump(self.orderer_compose(), yaml_file)
+
+    def orderer_compose(self) -> dict:
+        """compose-orderer.yaml content"""
         ordfile = {
             "version": "3.7",
             "networks": {self.domain.networkname: {"name": self.domain.networkname}},
@@ -755,6 +1206,9 @@ class Build:
             "volumes": self.domain.orderer.volumes,
             "container_name": self.domain.orderer.name + "." + self.domain.name,
             "networks": [self.domain.networkname],
+            "healthcheck": self.operations_healthcheck(
+                self.domain.orderer.ORDERER_OPERATIONS_LISTENADDRESS
+            ),
         }
 
         orderer["ports"][0] = DoubleQuotedScalarString(
@@ -769,18 +1223,21 @@ class Build:
 
         ordfile["services"][self.domain.orderer.name + "." + self.domain.name] = orderer
 
-        with open(
-            pathorderer + "compose-orderer.yaml", "w", encoding="utf-8"
-        ) as yaml_file:
-            yaml.dump(ordfile, yaml_file)
+        return ordfile
 
+    @tracer.phase()
     def build_peers_databases(self):
         """_summary_"""
         console.print("[bold white]# Building peers and databases[/]")
 
-        pathdomains = str(Path().absolute()) + "/domains/" + self.domain.name
+        pathpeer = str(Path().absolute()) + "/domains/" + self.domain.name + "/compose/"
+
+        with open(pathpeer + "compose-net.yaml", "w", encoding="utf-8") as yaml_file:
+            yaml.dump(self.net_compose(), yaml_file)
 
-        pathpeer = pathdomains + "/compose/"
+    def net_compose(self) -> dict:
+        """compose-net.yaml content: CLI, peers and databases"""
+        pathdomains = str(Path().absolute()) + "/domains/" + self.domain.name
 
         cliorg = self.domain.organizations[0]
         clipeer = self.domain.organizations[0].peers[0]
@@ -844,7 +1301,7 @@ class Build:
                 + ":/opt/gopath/src/github.com/hyperledger/fabric/peer/organizations",
                 str(Path().absolute()) + "/config:/etc/hyperledger/peercfg",
             ],
-            "depends_on": [],
+            "depends_on": {},
             "networks": [self.domain.networkname],
         }
 
@@ -854,7 +1311,9 @@ class Build:
             for peer in org.peers:
                 peerdata = self.peer_yaml(peer)
 
-                clidata["depends_on"].append(peer.name + "." + self.domain.name)
+                clidata["depends_on"][peer.name + "." + self.domain.name] = {
+                    "condition": "service_healthy"
+                }
 
                 peerfile["volumes"][peer.name + "." + self.domain.name] = {}
 
@@ -866,16 +1325,26 @@ class Build:
                     peer.database.name + "." + self.domain.name
                 ] = databasedata
 
-        with open(pathpeer + "compose-net.yaml", "w", encoding="utf-8") as yaml_file:
-            yaml.dump(peerfile, yaml_file)
+        return peerfile
 
+    @tracer.phase()
     def build_peers_databases_org(self, org: Organization):
         """_summary_"""
         console.print("[bold white]# Building " + org.name + " peers and databases[/]")
+        self.build_peers_overlay(org.peers, "compose-net-" + org.name + ".yaml")
 
-        pathpeer = "domains/" + self.domain.name + "/compose/"
+    @tracer.phase()
+    def build_peer(self, peer: Peer):
+        """_summary_"""
+        console.print("[bold white]# Building " + peer.name + " and database[/]")
+        self.build_peers_overlay([peer], "compose-net-" + peer.name + ".yaml")
 
-        with open(pathpeer + "compose-net.yaml", encoding="utf-8") as yamlpeer_file:
+    def build_peers_overlay(self, peers: List[Peer], overlay: str):
+        """Adds new peers and their databases to compose-net.yaml and writes
+        a temporary overlay holding only those services"""
+        with open(
+            self.paths.COMPOSEPATH + "compose-net.yaml", encoding="utf-8"
+        ) as yamlpeer_file:
             datapeer = yaml.load(yamlpeer_file)
 
         peerfile = {
@@ -885,7 +1354,7 @@ class Build:
             "services": {},
         }
 
-        for peer in org.peers:
+        for peer in peers:
             peerdata = self.peer_yaml(peer)
 
             peerfile["volumes"][peer.name + "." + self.domain.name] = {}
@@ -903,48 +1372,7 @@ class Build:
                 peer.database.name + "." + self.domain.name
             ] = databasedata
 
-        with open(pathpeer + "compose-net-" + org.name + ".yaml", "w") as yaml_file:
-            yaml.dump(peerfile, yaml_file)
-
-        with open(
-            pathpeer + "compose-net.yaml", "w", encoding="utf-8"
-        ) as yamlpeer_file:
-            yaml.dump(datapeer, yamlpeer_file)
-
-    def build_peer(self, peer: Peer):
-        """_summary_"""
-        console.print("[bold white]# Building " + peer.name + " and database[/]")
-
-        with open(
-            self.paths.COMPOSEPATH + "compose-net.yaml", encoding="utf-8"
-        ) as yamlpeer_file:
-            datapeer = yaml.load(yamlpeer_file)
-
-        peerfile = {
-            "version": "3.7",
-            "networks": {self.domain.networkname: {"name": self.domain.networkname}},
-            "volumes": {},
-            "services": {},
-        }
-
-        peerdata = self.peer_yaml(peer)
-
-        peerfile["volumes"][peer.name + "." + self.domain.name] = {}
-        datapeer["volumes"][peer.name + "." + self.domain.name] = {}
-
-        peerfile["services"][peer.name + "." + self.domain.name] = peerdata
-        datapeer["services"][peer.name + "." + self.domain.name] = peerdata
-
-        databasedata = self.database_yaml(peer)
-
-        peerfile["services"][peer.database.name + "." + self.domain.name] = databasedata
-        datapeer["services"][peer.database.name + "." + self.domain.name] = databasedata
-
-        with open(
-            self.paths.COMPOSEPATH + "compose-net-" + peer.name + ".yaml",
-            "w",
-            encoding="utf-8",
-        ) as yaml_file:
+        with open(self.paths.COMPOSEPATH + overlay, "w", encoding="utf-8") as yaml_file:
             yaml.dump(peerfile, yaml_file)
 
         with open(
@@ -952,29 +1380,31 @@ class Build:
         ) as yamlpeer_file:
             yaml.dump(datapeer, yamlpeer_file)
 
+    @tracer.phase()
     def prepare_firefly(self):
         """_summary_"""
         for org in self.domain.organizations:
-            self.paths.set_org_paths(org)
+            orgpaths = self.paths.org(org)
             for peer in org.peers:
-                self.paths.set_peer_paths(org, peer)
+                peerpaths = self.paths.peer(org, peer)
                 if peer.name.split(".")[0] == "peer1":
-                    # shutil.copytree(self.paths.PEERMSPPATH, self.paths.ORGPATH + "msp")
+                    # self.store.copytree(peerpaths.PEERMSPPATH, orgpaths.ORGPATH + "msp")
                     ## Copy Orderer
-                    shutil.copytree(
+                    self.store.copytree(
                         self.paths.ORDDOMAINPATH,
-                        self.paths.ORGPATH + "msp/orderer",
+                        orgpaths.ORGPATH + "msp/orderer",
                     )
 
-                    shutil.copytree(
-                        self.paths.ORGCACLIENTPATH,
-                        self.paths.ORGPATH + "msp/user/admin",
+                    self.store.copytree(
+                        orgpaths.ORGCACLIENTPATH,
+                        orgpaths.ORGPATH + "msp/user/admin",
                     )
 
-                shutil.copytree(
-                    self.paths.PEERPATH, self.paths.ORGPATH + "msp/" + peer.name
+                self.store.copytree(
+                    peerpaths.PEERPATH, orgpaths.ORGPATH + "msp/" + peer.name
                 )
 
+    @tracer.phase()
     def starting_opd(self):
         """_summary_"""
         console.print("[bold white]# Starting orderer, peers and databases[/]")
@@ -982,6 +1412,7 @@ class Build:
         run = Run(self.domain)
         run.starting_opd()
 
+    @tracer.phase()
     def starting_pd_org(self, org: Organization):
         """_summary_"""
         console.print("[bold white]# Starting " + org.name + " peers and databases[/]")
@@ -989,6 +1420,7 @@ class Build:
         run = Run(self.domain)
         run.starting_pd_org(org)
 
+    @tracer.phase()
     def starting_new_peer(self, peer: Peer):
         """_summary_"""
         console.print("[bold white]# Starting new peer " + peer.name + "[/]")
@@ -1,9 +1,8 @@
-import json
 import os
 import shutil
-import tarfile
 import time
 from pathlib import Path
+from typing import Callable
 
 import docker
 import ruamel.yaml
@@ -12,7 +11,14 @@ from rich.console import Console
 from controllers.build import Build
 from controllers.header import Header
 from helpers.commands import Commands
+from helpers.cryptogen import Cryptogen
+from helpers.cryptostore import CryptoStore
+from helpers.digest import Digest
+from helpers.package import Package
 from helpers.paths import Paths
+from helpers.readiness import Readiness
+from helpers.scheduler import Scheduler
+from helpers.tracing import tracer
 from models.chaincode import Chaincode
 from models.domain import Domain
 from models.organization import Organization
@@ -31,18 +37,23 @@ client = docker.DockerClient()
 
 header = Header()
 commands = Commands()
+package = Package()
+digest = Digest()
 
 
 class ChaincodeDeploy:
     def __init__(self, domain: Domain, chaincode: Chaincode) -> None:
         self.domain: Domain = domain
         self.paths = Paths(domain)
+        self.store = CryptoStore(self.paths.CRYPTOSTOREPATH)
+        self.readiness = Readiness(domain)
         self.chaincode = chaincode
         self.pathccsrc = self.paths.CHAINCODEPATH + chaincode.name
         self.chaincodename = chaincode.name
         self.chaincodeversion = 0
         self.packageid = None
 
+    @tracer.phase()
     def build_all(self):
         os.system("clear")
         header.header()
@@ -56,22 +67,9 @@ class ChaincodeDeploy:
         console.print("")
 
         if self.build_docker_image():
-            for org in self.domain.organizations:
-                for peer in org.peers:
-                    self.chaincode_crypto(org, peer, self.chaincode)
-                    console.print("")
-
-            for org in self.domain.organizations:
-                for peer in org.peers:
-                    self.install_chaincode(org, peer)
-                    console.print("")
-
-            for org in self.domain.organizations:
-                for peer in org.peers:
-                    self.approve_org(org, peer)
-                    console.print("")
+            self.lifecycle(self.install_chaincode, True)
 
-            self.commit_chaincode_definition()
+            committed = self.commit_chaincode_definition()
             console.print("")
 
             for org in self.domain.organizations:
@@ -79,58 +77,84 @@ class ChaincodeDeploy:
                     self.start_docker_container(org, peer)
                     console.print("")
 
-            self.chaincode_invoke_init()
-            console.print("")
+            if committed:
+                self.chaincode_invoke_init()
+                console.print("")
 
         shutil.rmtree(self.paths.CHAINCODEBUILDPATH)
 
+    @tracer.phase()
     def build_firefly(self):
         orgpkg = self.domain.organizations[0]
         peerpkg = orgpkg.peers[0]
         self.chaincode = self.package_chaincode_firefly(orgpkg, peerpkg)
         console.print("")
 
-        for org in self.domain.organizations:
-            for peer in org.peers:
-                self.install_chaincode_firefly(org, peer)
-                console.print("")
-
-        for org in self.domain.organizations:
-            for peer in org.peers:
-                self.approve_org(org, peer)
-                console.print("")
+        self.lifecycle(self.install_chaincode_firefly)
 
         self.commit_chaincode_definition()
         console.print("")
         shutil.rmtree(self.paths.CHAINCODEBUILDPATH)
         return self.chaincode
 
-    def build_docker_image(self) -> bool:
-        console.print("[bold white]# Building Docker Image[/]")
-        console.print("")
+    @tracer.phase()
+    def lifecycle(
+        self, install: Callable[[Organization, Peer], None], crypto: bool = None
+    ):
+        """Fans out chaincode crypto, install and approval per peer and org on a
+        bounded pool, reports the per-peer results and joins before commit"""
+        scheduler = Scheduler()
 
-        builded = False
-        for cc in self.domain.chaincodes:
-            if cc.name == self.chaincodename:
-                builded = True
+        # Cryptogen networks have no CA running, identities are issued offline
+        if crypto and self.domain.cryptogen:
+            scheduler.add("cryptogen", self.chaincode_cryptogen)
+        elif crypto:
+            scheduler.add("register:tlsca", self.chaincode_register_tls)
 
-        if builded:
-            for org in self.domain.organizations:
-                for peer in org.peers:
-                    self.paths.set_chaincode_paths(org, peer, self.chaincode)
-                    container = whales.container.exists(self.paths.CCNAME)
-                    if container:
-                        whales.container.stop(
-                            whales.container.inspect(self.paths.CCNAME)
-                        )
-
-            imagename = self.chaincodename + "_ccaas_image:latest"
-            image = whales.image.exists(imagename)
-            if image:
-                whales.image.remove(
-                    whales.image.inspect(imagename),
-                    True,
+        for org in self.domain.organizations:
+            installs = []
+            cryptodeps = ["cryptogen"]
+            if crypto and not self.domain.cryptogen:
+                scheduler.add(
+                    "register:" + org.name,
+                    lambda org=org: self.chaincode_register_org(org),
+                )
+                cryptodeps = ["register:tlsca", "register:" + org.name]
+            for peer in org.peers:
+                if crypto:
+                    scheduler.add(
+                        "crypto:" + peer.name,
+                        lambda org=org, peer=peer: self.chaincode_crypto(
+                            org, peer, self.chaincode
+                        ),
+                        cryptodeps,
+                    )
+                scheduler.add(
+                    "install:" + peer.name,
+                    lambda org=org, peer=peer: install(org, peer),
                 )
+                installs.append("install:" + peer.name)
+
+            for peer in org.peers:
+                if peer.name.split(".")[0] == "peer1":
+                    scheduler.add(
+                        "approve:" + org.name,
+                        lambda org=org, peer=peer: self.approve_org(org, peer),
+                        installs,
+                    )
+
+        scheduler.run()
+        console.print("")
+        scheduler.report("Chaincode " + self.chaincodename)
+        console.print("")
+
+        if scheduler.failed:
+            raise next(iter(scheduler.failed.values()))
+
+    @tracer.phase()
+    def build_docker_image(self) -> bool:
+        console.print("[bold white]# Building Docker Image[/]")
+        console.print("")
 
         success = False
 
@@ -143,29 +167,65 @@ class ChaincodeDeploy:
                 console.input("Press ENTER to exit.")
                 break
         else:
-            whales.buildx.build(
-                context_path=self.pathccsrc,
-                file=dockerfile,
-                tags=[tag],
-                build_args={"CC_SERVER_PORT": self.chaincode.ccport},
+            buildargs = {"CC_SERVER_PORT": str(self.chaincode.ccport)}
+            sourcehash = digest.tree(self.pathccsrc, buildargs)
+            hashtag = self.chaincodename + "_ccaas_image:" + sourcehash[:16]
+            previous = (
+                whales.image.inspect(tag).id if whales.image.exists(tag) else None
             )
+
+            if whales.image.exists(hashtag):
+                console.print("## Source unchanged, reusing image " + hashtag)
+                whales.image.tag(hashtag, tag)
+            else:
+                cachepath = (
+                    self.paths.CHAINCODEPATH + ".buildcache/" + self.chaincodename
+                )
+                cache = {}
+                if whales.buildx.inspect().driver != "docker":
+                    # local layer cache needs a BuildKit container driver
+                    cache = {
+                        "cache_from": {"type": "local", "src": cachepath},
+                        "cache_to": {"type": "local", "dest": cachepath, "mode": "max"},
+                        "load": True,
+                    }
+                    if not os.path.isdir(cachepath):
+                        del cache["cache_from"]
+
+                with tracer.span("buildx build", "docker"):
+                    whales.buildx.build(
+                        context_path=self.pathccsrc,
+                        file=dockerfile,
+                        tags=[hashtag, tag],
+                        build_args=buildargs,
+                        labels={"sourcehash": sourcehash},
+                        **cache,
+                    )
+
+            # Unchanged chaincode keeps serving until its container is swapped
+            if whales.image.inspect(tag).id != previous:
+                for org in self.domain.organizations:
+                    for peer in org.peers:
+                        self.remove_docker_container(org, peer)
             success = True
 
         return success
 
+    def remove_docker_container(self, org: Organization, peer: Peer):
+        """Removes the CCAAS container of peer, when running"""
+        ccpaths = self.paths.chaincode(org, peer, self.chaincode)
+        if whales.container.exists(ccpaths.CCNAME):
+            with tracer.span("container remove", "docker"):
+                whales.container.remove(ccpaths.CCNAME, force=True)
+
+    @tracer.phase()
     def package_chaincode(self, org: Organization, peer: Peer):
         console.print("[bold white]# Packaging chaincode[/]")
-        self.paths.set_org_paths(org)
-        self.paths.set_peer_paths(org, peer)
+        peerpaths = self.paths.peer(org, peer)
 
-        pathsrc = Path(self.paths.CHAINCODESRC)
-        pathsrc.mkdir(parents=True, exist_ok=True)
+        pathbuild = Path(self.paths.CHAINCODEBUILDPATH)
+        pathbuild.mkdir(parents=True, exist_ok=True)
 
-        pathpkg = Path(self.paths.CHAINCODEPKG)
-        pathpkg.mkdir(parents=True, exist_ok=True)
-
-        connectionfile = self.paths.CHAINCODESRC + "/connection.json"
-        metadatafile = self.paths.CHAINCODEPKG + "/metadata.json"
         ccversion = 1
         ccindex = None
 
@@ -174,13 +234,13 @@ class ChaincodeDeploy:
                 ccindex = i
                 ccversion = cc.version + 1
 
-        with open(self.paths.PEERSERVERCRT) as cert:
+        with open(peerpaths.PEERSERVERCRT) as cert:
             certdata = cert.read()
 
-        with open(self.paths.PEERSERVERKEY) as key:
+        with open(peerpaths.PEERSERVERKEY) as key:
             keydata = key.read()
 
-        with open(self.paths.PEERCAROOT) as cacert:
+        with open(peerpaths.PEERCAROOT) as cacert:
             carootdata = cacert.read()
 
         peername = "{{{{{peername}}}}}".format(peername=".peername")
@@ -201,49 +261,25 @@ class ChaincodeDeploy:
             # "root_cert": carootdata,
         }
 
-        metadata = {
-            "path": "",
-            "type": "ccaas",
-            "label": self.chaincodename + "_" + str(ccversion),
-        }
-
-        tarcode = self.paths.CHAINCODEPKG + "code.tar.gz"
+        if ccindex is not None:
+            # an unchanged package keeps its sequence, so the lifecycle steps
+            # already done on the network are skipped
+            current = self.domain.chaincodes[ccindex]
+            label = self.chaincodename + "_" + str(current.version)
+            if (
+                package.package_id(label, package.ccaas(label, connectiondata))
+                == current.packageid
+            ):
+                ccversion = current.version
+
+        label = self.chaincodename + "_" + str(ccversion)
         tarchaincode = self.paths.CHAINCODEBUILDPATH + self.chaincodename + ".tar.gz"
 
-        with open(connectionfile, "w", encoding="UTF-8") as connfile:
-            json.dump(connectiondata, connfile, indent=2)
-
-        with open(metadatafile, "w", encoding="UTF-8") as metafile:
-            json.dump(metadata, metafile, indent=2)
-
-        old_dir = os.getcwd()
-        os.chdir(self.paths.CHAINCODESRC)
-        filessrc = sorted(os.listdir())
-        with tarfile.open(tarcode, "w:gz") as tar:
-            for filename in filessrc:
-                tar.add(filename)
-
-        os.chdir(self.paths.CHAINCODEPKG)
-        filespkg = sorted(os.listdir())
-        with tarfile.open(tarchaincode, "w:gz") as tar:
-            for filename in filespkg:
-                tar.add(filename)
-
-        os.chdir(old_dir)
-
-        self.peer_env_variables(org, peer)
+        chaincodepkg = package.ccaas(label, connectiondata)
+        with open(tarchaincode, "wb") as tar:
+            tar.write(chaincodepkg)
 
-        commands.peer_lifecycle_chaincode_calculatepackageid(
-            self.paths.APPPATH, tarchaincode, self.paths.CHAINCODEBUILDPATH
-        )
-
-        console.print("## Waiting Peer...")
-        time.sleep(1)
-
-        with open(
-            self.paths.CHAINCODEBUILDPATH + "PACKAGEID.txt", encoding="utf-8"
-        ) as f:
-            packageid = f.read().strip()
+        packageid = package.package_id(label, chaincodepkg)
 
         self.chaincode.version = ccversion
         self.chaincode.servicename = self.chaincodename + "_ccaas"
@@ -263,64 +299,38 @@ class ChaincodeDeploy:
         build.build_config()
 
     def install_chaincode(self, org: Organization, peer: Peer):
-        console.print("[bold white]# Installing chaincode[/]")
-
-        self.paths.set_org_paths(org)
-        self.paths.set_peer_paths(org, peer)
-
         chaincodepkg = self.paths.CHAINCODEBUILDPATH + self.chaincodename + ".tar.gz"
 
-        console.print("[bold]# Installing chaincode on " + peer.name + "[/]")
-        self.peer_env_variables(org, peer, True)
-
-        commands.peer_lifecycle_chaincode_install(self.paths.APPPATH, chaincodepkg)
-
-        console.print("# Waiting Peer...")
-        time.sleep(1)
-
-        console.print("[bold]# Result chaincode installation on " + peer.name + "[/]")
-
-        commands.peer_lifecycle_chaincode_queryinstalled(
-            self.paths.APPPATH, self.packageid
-        )
-
-        console.print("# Waiting Peer...")
-        time.sleep(1)
+        self.install_package(org, peer, chaincodepkg)
 
+    @tracer.phase()
     def package_chaincode_firefly(self, org: Organization, peer: Peer) -> Chaincode:
         console.print("[bold white]# Packaging chaincode[/]")
 
-        self.paths.set_org_paths(org)
-        self.paths.set_peer_paths(org, peer)
-
         pathpkg = Path(self.paths.CHAINCODEPKG)
         pathpkg.mkdir(parents=True, exist_ok=True)
 
-        old_dir = os.getcwd()
-        os.chdir(self.paths.FIREFLYCCPATH)
-        os.system("go mod vendor")
-        os.chdir(self.paths.CHAINCODEPKG)
+        commands.run(["go", "mod", "vendor"], cwd=self.paths.FIREFLYCCPATH)
 
         console.print(
             "[bold]# Generating and registering chaincode package on "
             + org.name
             + "[/]"
         )
-        self.peer_env_variables(org, peer)
+        env = self.peer_env_variables(org, peer)
         commands.peer_lifecycle_chaincode_package(
-            self.paths.APPPATH, self.paths.FIREFLYCCPATH, self.chaincode
+            self.paths.APPPATH,
+            self.paths.FIREFLYCCPATH,
+            self.chaincode,
+            env,
+            self.paths.CHAINCODEPKG,
         )
-        os.chdir(old_dir)
-
-        self.peer_env_variables(org, peer)
 
         tarchaincode = self.paths.CHAINCODEPKG + self.chaincodename + ".tar.gz"
-        commands.peer_lifecycle_chaincode_calculatepackageid(
-            self.paths.APPPATH, tarchaincode, self.paths.CHAINCODEPKG
-        )
-
-        with open(self.paths.CHAINCODEPKG + "PACKAGEID.txt", encoding="utf-8") as f:
-            packageid = f.read().strip()
+        with open(tarchaincode, "rb") as tar:
+            packageid = package.package_id(
+                self.chaincode.name + "_" + str(self.chaincode.version), tar.read()
+            )
 
         ccversion = 1
         ccindex = None
@@ -339,49 +349,85 @@ class ChaincodeDeploy:
         build = Build(self.domain)
         build.build_config()
 
-        console.print("# Waiting Peer...")
-        time.sleep(1)
         return self.chaincode
 
     def install_chaincode_firefly(self, org: Organization, peer: Peer):
-        console.print("[bold white]# Installing chaincode[/]")
+        chaincodepkg = self.paths.CHAINCODEPKG + self.chaincodename + ".tar.gz"
 
-        self.paths.set_org_paths(org)
-        self.paths.set_peer_paths(org, peer)
+        self.install_package(org, peer, chaincodepkg)
 
-        chaincodepkg = self.paths.CHAINCODEPKG + self.chaincodename + ".tar.gz"
+    @tracer.phase()
+    def install_package(self, org: Organization, peer: Peer, chaincodepkg: str):
+        env = self.peer_env_variables(org, peer, True)
 
-        console.print("[bold]# Installing chaincode on " + peer.name + "[/]")
-        self.peer_env_variables(org, peer, True)
+        if self.installed(org, peer):
+            console.print(
+                "[bold]# Chaincode already installed on " + peer.name + ", skipping[/]"
+            )
+            return
 
-        commands.peer_lifecycle_chaincode_install(self.paths.APPPATH, chaincodepkg)
+        console.print("[bold]# Installing chaincode on " + peer.name + "[/]")
+        commands.peer_lifecycle_chaincode_install(self.paths.APPPATH, chaincodepkg, env)
 
-        console.print("# Waiting Peer...")
-        time.sleep(1)
+        if not self.readiness.poll(
+            "install " + peer.name, lambda: self.installed(org, peer)
+        ):
+            raise RuntimeError("chaincode not installed on " + peer.name)
 
-        console.print("[bold]# Result chaincode installation on " + peer.name + "[/]")
+    def installed(self, org: Organization, peer: Peer) -> bool:
+        """The peer already holds the package"""
+        return commands.peer_lifecycle_chaincode_queryinstalled(
+            self.paths.APPPATH, self.packageid, self.peer_env_variables(org, peer, True)
+        )
 
-        commands.peer_lifecycle_chaincode_queryinstalled(
-            self.paths.APPPATH, self.packageid
+    def approved(self, org: Organization, peer: Peer) -> bool:
+        """The org already approved this sequence for this package"""
+        approval = commands.peer_lifecycle_chaincode_queryapproved(
+            self.paths.APPPATH,
+            self.domain.networkname,
+            self.chaincodename,
+            self.chaincodeversion,
+            self.peer_env_variables(org, peer, True),
+        )
+        packageid = (
+            approval.get("source", {})
+            .get("Type", {})
+            .get("LocalPackage", {})
+            .get("package_id")
+        )
+        return (
+            approval.get("sequence") == self.chaincodeversion
+            and packageid == self.packageid
         )
 
-        console.print("# Waiting Peer...")
-        time.sleep(1)
+    def committed(self) -> bool:
+        """The channel already committed this sequence"""
+        org = self.domain.organizations[0]
+        peer = org.peers[0]
+        definition = commands.peer_lifecycle_chaincode_querycommitted(
+            self.paths.APPPATH,
+            self.domain.networkname,
+            self.chaincodename,
+            self.peer_env_variables(org, peer, True),
+        )
+        return definition.get("sequence") == self.chaincodeversion
 
+    @tracer.phase()
     def approve_org(self, org: Organization, peer: Peer):
-        self.paths.set_org_paths(org)
-        self.paths.set_peer_paths(org, peer)
-
         if peer.name.split(".")[0] == "peer1":
+            if self.approved(org, peer):
+                console.print(
+                    "[bold]# Chaincode definition already approved by "
+                    + org.name
+                    + ", skipping[/]"
+                )
+                return
+
             console.print(
                 "[bold]# Approving chaincode definition for " + org.name + "[/]"
             )
-            self.peer_env_variables(org, peer, True)
-
             self.check_commit(org, peer)
 
-            self.peer_env_variables(org, peer, True)
-
             commands.peer_lifecycle_chaincode_approveformyorg(
                 self.paths.APPPATH,
                 self.chaincode.invoke,
@@ -392,19 +438,19 @@ class ChaincodeDeploy:
                 self.chaincodename,
                 self.chaincodeversion,
                 self.packageid,
+                self.peer_env_variables(org, peer, True),
             )
 
             console.print("# Waiting Peer...")
-            time.sleep(1)
-            self.peer_env_variables(org, peer, True)
-            self.check_commit(org, peer)
+            if not self.readiness.approval(
+                org.name + "MSP", lambda: self.check_commit(org, peer)
+            ):
+                raise RuntimeError("approval of " + org.name + "MSP not visible")
 
-    def check_commit(self, org: Organization, peer: Peer):
+    def check_commit(self, org: Organization, peer: Peer) -> str:
         console.print("[bold]# Checking commit[/]")
 
-        self.peer_env_variables(org, peer, True)
-
-        commands.peer_lifecycle_chaincode_checkcommitreadiness(
+        return commands.peer_lifecycle_chaincode_checkcommitreadiness(
             self.paths.APPPATH,
             self.chaincode.invoke,
             self.domain.orderer,
@@ -413,16 +459,19 @@ class ChaincodeDeploy:
             self.domain.networkname,
             self.chaincodename,
             self.chaincodeversion,
+            self.peer_env_variables(org, peer, True),
         )
-        time.sleep(1)
 
-    def commit_chaincode_definition(self):
+    @tracer.phase()
+    def commit_chaincode_definition(self) -> bool:
         org = self.domain.organizations[0]
         peer = org.peers[0]
 
-        console.print("[bold]# Commiting chaincode definition[/]")
-        self.peer_env_variables(org, peer, True)
+        if self.committed():
+            console.print("[bold]# Chaincode definition already committed, skipping[/]")
+            return False
 
+        console.print("[bold]# Commiting chaincode definition[/]")
         commands.peer_lifecycle_chaincode_commit(
             self.paths.APPPATH,
             self.chaincode.invoke,
@@ -433,17 +482,21 @@ class ChaincodeDeploy:
             self.chaincodename,
             self.domain,
             self.chaincodeversion,
+            self.peer_env_variables(org, peer, True),
         )
 
         console.print("# Waiting Peer...")
-        time.sleep(1)
+        if not self.readiness.poll("commit " + self.chaincodename, self.committed):
+            raise RuntimeError("commit of " + self.chaincodename + " not visible")
+        return True
 
+    @tracer.phase()
     def start_docker_container(self, org: Organization, peer: Peer):
         console.print("[bold]# Starting the CCAAS container[/]")
-        self.paths.set_chaincode_paths(org, peer, self.chaincode)
+        ccpaths = self.paths.chaincode(org, peer, self.chaincode)
 
         volumes = [
-            (self.paths.CCPATH, "/etc/hyperledger/chaincode/"),
+            (ccpaths.CCPATH, "/etc/hyperledger/chaincode/"),
         ]
 
         envs = {
@@ -490,31 +543,34 @@ class ChaincodeDeploy:
         clientconfig = DockerClient(compose_files=[pathnet]).client_config
         network = Network(clientconfig, self.domain.networkname)
 
+        self.remove_docker_container(org, peer)
+
         # Waiting Chaincode Container
-        container = whales.run(
-            image=self.chaincodename + "_ccaas_image:latest",
-            name=peer.name.replace(".", "")
-            + "."
-            + self.chaincodename
-            + ".ccaas."
-            + self.domain.name,
-            hostname=peer.name.replace(".", "")
-            + "."
-            + self.chaincodename
-            + ".ccaas."
-            + self.domain.name,
-            networks=[network],
-            envs=envs,
-            # expose=[self.chaincode.ccport],
-            # publish=[(self.chaincode.ccport, self.chaincode.ccport)],
-            remove=True,
-            detach=True,
-            init=True,
-            tty=True,
-            volumes=volumes,
-            user="root:root",
-            log_driver="syslog",
-        )
+        with tracer.span("container run", "docker"):
+            container = whales.run(
+                image=self.chaincodename + "_ccaas_image:latest",
+                name=peer.name.replace(".", "")
+                + "."
+                + self.chaincodename
+                + ".ccaas."
+                + self.domain.name,
+                hostname=peer.name.replace(".", "")
+                + "."
+                + self.chaincodename
+                + ".ccaas."
+                + self.domain.name,
+                networks=[network],
+                envs=envs,
+                # expose=[self.chaincode.ccport],
+                # publish=[(self.chaincode.ccport, self.chaincode.ccport)],
+                remove=True,
+                detach=True,
+                init=True,
+                tty=True,
+                volumes=volumes,
+                user="root:root",
+                log_driver="syslog",
+            )
 
         console.print("# Waiting Chaincode Container...")
         time.sleep(2)
@@ -525,13 +581,12 @@ class ChaincodeDeploy:
         # whales.container.restart(peercontainer)
         # time.sleep(1)
 
+    @tracer.phase()
     def chaincode_invoke_init(self):
         org = self.domain.organizations[0]
         peer = org.peers[0]
 
         console.print("[bold]# Invoking chaincode[/]")
-        self.peer_env_variables(org, peer, True)
-
         commands.peer_chaincode_invoke(
             self.paths.APPPATH,
             self.chaincode.invoke,
@@ -541,37 +596,16 @@ class ChaincodeDeploy:
             self.domain.networkname,
             self.chaincodename,
             self.domain,
+            self.peer_env_variables(org, peer, True),
         )
 
         console.print("# Waiting Peer...")
         time.sleep(1)
 
-    def chaincode_crypto(self, org: Organization, peer: Peer, chaincode: Chaincode):
-        console.print("[bold]## Registering chaincode " + chaincode.name + " crypto[/]")
-
-        self.paths.set_org_paths(org)
-        self.paths.set_peer_paths(org, peer)
-        self.paths.set_chaincode_paths(org, peer, self.chaincode)
-        self.peer_env_variables(org, peer)
-
-        pathcc = Path(self.paths.PEERPATH + chaincode.name)
+    @tracer.phase()
+    def chaincode_register_tls(self):
+        console.print("[bold]## Registering TLS CA Admin :: Chaincode[/]")
 
-        if pathcc.is_dir():
-            shutil.rmtree(str(pathcc))
-
-        if not pathcc.is_dir():
-            pathcc.mkdir(parents=True, exist_ok=True)
-
-        console.print("[bold]## Registering TLS CA Admin Chaincode[/]")
-
-        commands.enroll(
-            self.paths.APPPATH,
-            self.paths.CACLIENTDOMAINPATH,
-            "admin",
-            "adminpw",
-            self.domain.ca.serverport,
-            self.paths.CACERTDOMAINFILE,
-        )
         commands.register_peer(
             self.paths.APPPATH,
             self.paths.CACLIENTDOMAINPATH,
@@ -581,108 +615,162 @@ class ChaincodeDeploy:
             self.paths.TLSCERTDOMAINFILE,
         )
 
-        console.print("[bold]## Register Org CA Admin :: Chaincode[/]")
-        commands.enroll(
-            self.paths.APPPATH,
-            self.paths.CAORGCACLIENTPATH,
-            "admin",
-            "adminpw",
-            org.ca.serverport,
-            self.paths.CACERTORGFILE,
-        )
+    @tracer.phase()
+    def chaincode_register_org(self, org: Organization):
+        console.print("[bold]## Register " + org.name + " CA Admin :: Chaincode[/]")
+
+        orgpaths = self.paths.org(org)
 
         commands.register_peer(
             self.paths.APPPATH,
-            self.paths.CAORGCACLIENTPATH,
+            orgpaths.CAORGCACLIENTPATH,
             self.chaincode.name,
             self.chaincode.name + "pw",
             org.ca.serverport,
-            self.paths.CACERTORGFILE,
+            orgpaths.CACERTORGFILE,
         )
 
-        msppath = str(pathcc) + "/msp/"
-        tlspath = str(pathcc) + "/tls/"
+    @tracer.phase()
+    def chaincode_cryptogen(self):
+        """Issues the chaincode identities of every peer offline, with the CA
+        keys the network was built with"""
+        console.print(
+            "[bold]## Generating chaincode " + self.chaincode.name + " crypto[/]"
+        )
 
-        console.print("[bold]## Generating the chaincode-msp certificates[/]")
+        cryptogen = Cryptogen(self.domain)
+        for org in self.domain.organizations:
+            for peer in org.peers:
+                self.chaincode_folder(org, peer, self.chaincode)
+                cryptogen.add_chaincode(org, peer, self.chaincode)
+        cryptogen.generate([], [])
+
+    def chaincode_folder(self, org: Organization, peer: Peer, chaincode: Chaincode):
+        """Empties the chaincode crypto folder of peer"""
+        pathcc = Path(self.paths.peer(org, peer).PEERPATH + chaincode.name)
+
+        if pathcc.is_dir():
+            shutil.rmtree(str(pathcc))
+
+        if not pathcc.is_dir():
+            pathcc.mkdir(parents=True, exist_ok=True)
+
+    def chaincode_enroll(self, org: Organization, peer: Peer, chaincode: Chaincode):
+        """Enrolls the chaincode MSP and TLS identities of peer on the CAs"""
+        paths = self.paths
+        orgpaths = paths.org(org)
+        peerpaths = paths.peer(org, peer)
+        ccpaths = paths.chaincode(org, peer, self.chaincode)
+
+        console.print(
+            "[bold]## Generating the chaincode-msp certificates for "
+            + peer.name
+            + "[/]"
+        )
 
         commands.enroll_msp(
-            self.paths.APPPATH,
-            self.paths.PEERPATH + chaincode.name,
+            paths.APPPATH,
+            peerpaths.PEERPATH + chaincode.name,
             self.chaincode.name,
             self.chaincode.name + "pw",
             org.ca.serverport,
-            self.paths.CACERTORGFILE,
+            orgpaths.CACERTORGFILE,
         )
 
-        console.print("[bold]## Generating the chaincode-tls certificates[/]")
+        console.print(
+            "[bold]## Generating the chaincode-tls certificates for "
+            + peer.name
+            + "[/]"
+        )
 
         commands.enroll_tls(
-            self.paths.APPPATH,
-            self.paths.PEERPATH + chaincode.name,
+            paths.APPPATH,
+            peerpaths.PEERPATH + chaincode.name,
             "admin",
             "adminpw",
             self.domain.ca.serverport,
-            [self.paths.CCNAME, self.paths.CCSMALLNAME, "localhost"],
+            [ccpaths.CCNAME, ccpaths.CCSMALLNAME, "localhost"],
             peer.name + "." + self.domain.name,
-            self.paths.TLSCERTDOMAINFILE,
+            paths.TLSCERTDOMAINFILE,
         )
 
+    @tracer.phase()
+    def chaincode_crypto(self, org: Organization, peer: Peer, chaincode: Chaincode):
+        console.print(
+            "[bold]## Generating chaincode "
+            + chaincode.name
+            + " crypto for "
+            + peer.name
+            + "[/]"
+        )
+
+        paths = self.paths
+        orgpaths = paths.org(org)
+        peerpaths = paths.peer(org, peer)
+
+        pathcc = Path(peerpaths.PEERPATH + chaincode.name)
+        msppath = str(pathcc) + "/msp/"
+        tlspath = str(pathcc) + "/tls/"
+
+        if not self.domain.cryptogen:
+            self.chaincode_folder(org, peer, chaincode)
+            self.chaincode_enroll(org, peer, chaincode)
+
         admincerts = Path(msppath + "admincerts")
         admincerts.mkdir(parents=True, exist_ok=True)
         tlscacerts = Path(msppath + "tlscacerts")
         tlscacerts.mkdir(parents=True, exist_ok=True)
 
         # TLS
-        shutil.copy(
+        self.store.copy(
             tlspath + "signcerts/cert.pem",
             tlspath + "signcerts/cert.crt",
         )
 
         for file_name in os.listdir(tlspath + "tlscacerts/"):
-            shutil.copy(
+            self.store.copy(
                 tlspath + "tlscacerts/" + file_name,
                 tlspath + "tlscacerts/tlsca-cert.pem",
             )
 
-            shutil.copy(
+            self.store.copy(
                 tlspath + "tlscacerts/" + file_name,
                 msppath + "tlscacerts/tlsca-cert.pem",
             )
 
         for file_name in os.listdir(tlspath + "keystore/"):
-            shutil.copy(
+            self.store.copy(
                 tlspath + "keystore/" + file_name,
                 tlspath + "keystore/key.pem",
             )
 
         # MSP
-        shutil.copy(
-            self.paths.ORGSIGNCERTPATH + "cert.pem",
+        self.store.copy(
+            orgpaths.ORGSIGNCERTPATH + "cert.pem",
             msppath + "admincerts/cert.pem",
         )
 
     def peer_env_variables(
         self, org: Organization, peer: Peer, orgadm: bool = None, ord: bool = None
-    ):
-        self.paths.set_org_paths(org)
-        self.paths.set_peer_paths(org, peer)
-
-        os.environ["FABRIC_CFG_PATH"] = self.paths.PEERCFGPATH
-        os.environ["CORE_PEER_TLS_ENABLED"] = "true"
-        os.environ["CORE_PEER_LOCALMSPID"] = "OrdererMSP" if ord else org.name + "MSP"
-        os.environ["CORE_PEER_TLS_ROOTCERT_FILE"] = self.paths.PEERCAROOT
-        os.environ["CORE_PEER_MSPCONFIGPATH"] = (
-            self.paths.ORGMSPPATH
-            if orgadm
-            else self.paths.ORDERERORGMSPPATH
-            if ord
-            else self.paths.PEERMSPPATH  # ORGMSPPATH
-        )
-        os.environ["CORE_PEER_ADDRESS"] = "localhost:" + str(peer.peerlistenport)
-        os.environ["ORDERER_CA"] = self.paths.ORDTLSCAPATH + "tls-cert.pem"
-        os.environ["ORDERER_ADMIN_TLS_SIGN_CERT"] = (
-            self.paths.ORDSIGNCERTPATH + "cert.crt"
-        )
-        os.environ["ORDERER_ADMIN_TLS_PRIVATE_KEY"] = (
-            self.paths.ORDKEYSTOREPATH + "key.pem"
-        )
+    ) -> dict:
+        paths = self.paths
+        orgpaths = paths.org(org)
+        peerpaths = paths.peer(org, peer)
+
+        return {
+            "FABRIC_CFG_PATH": peerpaths.PEERCFGPATH,
+            "CORE_PEER_TLS_ENABLED": "true",
+            "CORE_PEER_LOCALMSPID": "OrdererMSP" if ord else org.name + "MSP",
+            "CORE_PEER_TLS_ROOTCERT_FILE": peerpaths.PEERCAROOT,
+            "CORE_PEER_MSPCONFIGPATH": (
+                orgpaths.ORGMSPPATH
+                if orgadm
+                else paths.ORDERERORGMSPPATH
+                if ord
+                else peerpaths.PEERMSPPATH  # ORGMSPPATH
+            ),
+            "CORE_PEER_ADDRESS": "localhost:" + str(peer.peerlistenport),
+            "ORDERER_CA": paths.ORDTLSCAPATH + "tls-cert.pem",
+            "ORDERER_ADMIN_TLS_SIGN_CERT": paths.ORDSIGNCERTPATH + "cert.crt",
+            "ORDERER_ADMIN_TLS_PRIVATE_KEY": paths.ORDKEYSTOREPATH + "key.pem",
+        }
@@ -1,7 +1,6 @@
 import json
 import os
 from pathlib import Path
-from typing import List
 
 import validators
 from python_on_whales import DockerClient
@@ -12,19 +11,19 @@ from controllers.build import Build
 from controllers.chaincode import ChaincodeDeploy
 from controllers.firefly import Firefly
 from controllers.header import Header
+from controllers.reconcile import Reconcile
 from controllers.requirements import Requirements
-from controllers.run import Run
 from helpers.paths import Paths
-from models.ca import Ca
+from helpers.ports import Ports
+from helpers.topology import Topology
 from models.chaincode import Chaincode
-from models.database import Database
 from models.domain import Domain
-from models.orderer import Orderer
 from models.organization import Organization
 from models.peer import Peer
 
 console = Console()
 header = Header()
+topology = Topology()
 
 
 class ConsoleOutput:
@@ -40,7 +39,7 @@ class ConsoleOutput:
     def questions(self):
         os.system("clear")
         header.header()
-        portlist: List[int] = []
+        ports = Ports()
 
         console.print("[bold orange1]NEW NETWORK[/]")
         console.print("")
@@ -57,94 +56,14 @@ class ConsoleOutput:
             )
             if domainname.lower() == "q":
                 self.main_menu()
-        self.domain.name = domainname
-        self.domain.networkname = domainname.split(".")[0]
-
-        ordererdomain = Orderer()
-        ordererdomain.name = "orderer"
-        ordererdomain.generallistenport = 7050
-        portlist.append(ordererdomain.generallistenport)
-        ordererdomain.operationslistenport = 9443
-        portlist.append(ordererdomain.operationslistenport)
-        ordererdomain.adminlistenport = 7053
-        portlist.append(ordererdomain.adminlistenport)
-        ordererdomain.ORDERER_GENERAL_LISTENPORT = ordererdomain.generallistenport
-        ordererdomain.ORDERER_OPERATIONS_LISTENADDRESS = (
-            ordererdomain.name
-            + "."
-            + domainname
-            + ":"
-            + str(ordererdomain.operationslistenport)
-        )
-        ordererdomain.ORDERER_ADMIN_LISTENADDRESS = "0.0.0.0:" + str(
-            ordererdomain.adminlistenport
-        )
-        ordererdomain.volumes = [
-            str(Path().absolute())
-            + "/domains/"
-            + self.domain.name
-            + "/ordererOrganizations/"
-            + ordererdomain.name
-            + "/msp:/var/hyperledger/orderer/msp",
-            str(Path().absolute())
-            + "/domains/"
-            + self.domain.name
-            + "/ordererOrganizations/admin/msp:/var/hyperledger/admin/msp",
-            str(Path().absolute())
-            + "/domains/"
-            + self.domain.name
-            + "/ordererOrganizations/"
-            + ordererdomain.name
-            + "/tls/:/var/hyperledger/orderer/tls",
-            ordererdomain.name
-            + "."
-            + domainname
-            + ":/var/hyperledger/production/orderer",
-        ]
-        self.domain.orderer = ordererdomain
-
-        cadomain = Ca()
-        cadomain.name = "ca"
-        cadomain.FABRIC_CA_SERVER_CA_NAME = cadomain.name
-        cadomain.volumes = "".join(
-            [
-                str(Path().absolute()),
-                "/domains/",
-                self.domain.name,
-                "/fabricca/",
-                cadomain.name,
-                ":/etc/hyperledger/fabric-ca-server",
-            ]
-        )
-        self.domain.ca = cadomain
-        portlist.append(self.domain.ca.serverport)
-        portlist.append(self.domain.ca.operationslistenport)
-
-        caordererserverport = self.domain.ca.serverport + 100
-        caordereroplstport = self.domain.ca.operationslistenport + 100
-
-        caorderer = Ca()
-        caorderer.name = "ca.orderer"
-        caorderer.FABRIC_CA_SERVER_CA_NAME = caorderer.name
-        caorderer.FABRIC_CA_SERVER_OPERATIONS_LISTENADDRESS = "0.0.0.0:" + str(
-            caordereroplstport
-        )
-        caorderer.FABRIC_CA_SERVER_PORT = caordererserverport
-        caorderer.volumes = "".join(
-            [
-                str(Path().absolute()),
-                "/domains/",
-                self.domain.name,
-                "/fabricca/",
-                caorderer.name,
-                ":/etc/hyperledger/fabric-ca-server",
-            ]
-        )
-        self.domain.caorderer = caorderer
-        portlist.append(self.domain.caorderer.serverport)
-        portlist.append(self.domain.caorderer.operationslistenport)
-        self.domain.caorderer.serverport = caordererserverport
-        self.domain.caorderer.operationslistenport = caordereroplstport
+        self.domain = topology.new_domain(domainname)
+        ports.reserve(self.domain.orderer.generallistenport)
+        ports.reserve(self.domain.orderer.operationslistenport)
+        ports.reserve(self.domain.orderer.adminlistenport)
+        ports.reserve(self.domain.ca.serverport)
+        ports.reserve(self.domain.ca.operationslistenport)
+        ports.reserve(self.domain.caorderer.serverport)
+        ports.reserve(self.domain.caorderer.operationslistenport)
 
         qtyorgs = console.input("[bold]Number of Organizations:[/] ")
         if qtyorgs.lower() == "q":
@@ -180,7 +99,6 @@ class ConsoleOutput:
         caorgoplstport = self.domain.caorderer.operationslistenport + 100
 
         while iorgs <= self.domain.qtyorgs:
-            org = Organization()
             orgname = console.input("[bold]Organization #" + str(iorgs) + " name:[/] ")
             if orgname.lower() == "q":
                 self.main_menu()
@@ -192,30 +110,11 @@ class ConsoleOutput:
                 )
                 if orgname.lower() == "q":
                     self.main_menu()
-            org.name = orgname
-
-            caorg = Ca()
-            caorg.name = "ca." + org.name
-            caorg.FABRIC_CA_SERVER_CA_NAME = caorg.name
-            caorg.FABRIC_CA_SERVER_OPERATIONS_LISTENADDRESS = "0.0.0.0:" + str(
-                caorgoplstport
+            caorgserverport = ports.allocate(caorgserverport, 100)
+            caorgoplstport = ports.allocate(caorgoplstport, 100)
+            org = topology.new_organization(
+                self.domain, orgname, caorgserverport, caorgoplstport
             )
-            caorg.FABRIC_CA_SERVER_PORT = caorgserverport
-            caorg.volumes = "".join(
-                [
-                    str(Path().absolute()),
-                    "/domains/",
-                    self.domain.name,
-                    "/fabricca/",
-                    caorg.name,
-                    ":/etc/hyperledger/fabric-ca-server",
-                ]
-            )
-            caorg.serverport = caorgserverport
-            caorg.operationslistenport = caorgoplstport
-            portlist.append(caorgserverport)
-            portlist.append(caorgoplstport)
-            org.ca = caorg
 
             qtypeers = console.input("[bold]Number of Peers:[/] ")
             if qtypeers.lower() == "q":
@@ -246,6 +145,7 @@ class ConsoleOutput:
             while ipeers <= org.qtypeers:
                 peer = Peer()
                 peer.name = "peer" + str(ipeers) + "." + org.name
+                portpeer = ports.find(portpeer, 1000)
                 peerport = console.input(
                     "[bold]Peer "
                     + peer.name
@@ -268,7 +168,7 @@ class ConsoleOutput:
 
                 validport = True
                 while validport:
-                    if valueport in portlist:
+                    if not ports.free(valueport):
                         validport = True
                         peerport = console.input(
                             "[bold red]Peer "
@@ -295,82 +195,23 @@ class ConsoleOutput:
                         valueport = 0
                     valueport = int(peerport)
 
-                peer.volumes = [
-                    str(Path().absolute())
-                    + "/domains/"
-                    + self.domain.name
-                    + "/peerOrganizations/"
-                    + org.name
-                    + "/"
-                    + peer.name
-                    + ":/etc/hyperledger/fabric",
-                    peer.name + "." + self.domain.name + ":/var/hyperledger/production",
-                    str(Path().absolute())
-                    + "/domains/"
-                    + self.domain.name
-                    + "/peerOrganizations/"
-                    + org.name
-                    + "/"
-                    + peer.name
-                    + "/peercfg"
-                    + ":/etc/hyperledger/peercfg",
-                    str(Path().absolute())
-                    + "/domains/"
-                    + self.domain.name
-                    + ":/etc/hyperledger/organizations",
-                    "/var/run/docker.sock:/host/var/run/docker.sock",
-                ]
-
-                database = Database()
-                database.port = portcouchdb
-                database.name = "db.peer" + str(ipeers) + "." + org.name
-                database.COUCHDB_USER = "admin"
-                database.COUCHDB_PASSWORD = "adminpw"
-
-                peer.CORE_LEDGER_STATE_COUCHDBCONFIG_USERNAME = database.COUCHDB_USER
-                peer.CORE_LEDGER_STATE_COUCHDBCONFIG_PASSWORD = (
-                    database.COUCHDB_PASSWORD
-                )
-                peer.CORE_LEDGER_STATE_COUCHDBCONFIG_COUCHDBADDRESS = (
-                    database.name + "." + self.domain.name + ":5984"
-                )
-                peer.CORE_VM_DOCKER_HOSTCONFIG_NETWORKMODE = self.domain.networkname
-                peer.CHAINCODE_AS_A_SERVICE_BUILDER_CONFIG = (
-                    '{"peername":"' + "peer" + str(ipeers) + org.name + '"}'
-                )
-                peer.CORE_PEER_LISTENADDRESS = "0.0.0.0:" + str(valueport)
-                peer.CORE_OPERATIONS_LISTENADDRESS = (
-                    peer.name + "." + self.domain.name + ":" + str(peeroperationlisten)
-                )
-                peer.peerlistenport = valueport
-                peer.operationslistenport = peeroperationlisten
-                portlist.append(peeroperationlisten)
-                peer.CORE_PEER_ADDRESS = (
-                    peer.name + "." + self.domain.name + ":" + str(valueport)
-                )
-                peer.CORE_PEER_CHAINCODEADDRESS = (
-                    peer.name
-                    + "."
-                    + self.domain.name
-                    + ":"
-                    + str(peerchaincodelistenport)
-                )
-                peer.chaincodelistenport = peerchaincodelistenport
-                peer.CORE_PEER_CHAINCODELISTENADDRESS = "0.0.0.0:" + str(
-                    peerchaincodelistenport
+                ports.reserve(valueport)
+                peeroperationlisten = ports.allocate(peeroperationlisten, 1000)
+                peerchaincodelistenport = ports.allocate(peerchaincodelistenport, 1000)
+                portcouchdb = ports.allocate(portcouchdb, 1000)
+
+                peer = topology.new_peer(
+                    self.domain,
+                    org,
+                    ipeers,
+                    valueport,
+                    peeroperationlisten,
+                    peerchaincodelistenport,
+                    portcouchdb,
                 )
-                portlist.append(peerchaincodelistenport)
-                peer.CORE_PEER_GOSSIP_EXTERNALENDPOINT = peer.CORE_PEER_ADDRESS
-                peer.CORE_PEER_GOSSIP_BOOTSTRAP = peer.CORE_PEER_ADDRESS
-                peer.CORE_PEER_LOCALMSPID = org.name + "MSP"
-                peer.CORE_PEER_ID = peer.name + "." + self.domain.name
-
-                peer.database = database
 
                 org.peers.append(peer)
 
-                portlist.append(valueport)
-
                 ipeers += 1
                 portpeer += 1000
                 portcouchdb += 1000
@@ -385,6 +226,8 @@ class ConsoleOutput:
             caorgoplstport += 100
             console.print("")
 
+        self.domain.ports = ports.intervals()
+
         build = Build(self.domain)
         build.build_all()
         blockchain = Blockchain(self.domain)
@@ -394,7 +237,8 @@ class ConsoleOutput:
     def create_organization(self, domain: Domain):
         os.system("clear")
         header.header()
-        portlist: List[int] = []
+        ports = Ports(domain.ports)
+        ports.reserve_domain(domain)
 
         console.print("[bold orange1]NEW ORGANIZATION[/]")
         console.print("")
@@ -408,29 +252,16 @@ class ConsoleOutput:
         portcouchdb = 0
         caorgserverport = 0
         caorgoplstport = 0
-
-        portlist.append(domain.ca.serverport)
-        portlist.append(domain.ca.operationslistenport)
-        portlist.append(domain.orderer.adminlistenport)
-        portlist.append(domain.orderer.generallistenport)
-        portlist.append(domain.orderer.operationslistenport)
         for org in domain.organizations:
-            portlist.append(org.ca.serverport)
-            portlist.append(org.ca.operationslistenport)
             for peer in org.peers:
-                portlist.append(peer.operationslistenport)
                 peeroperationlisten = peer.operationslistenport + 1000
-                portlist.append(peer.chaincodelistenport)
                 peerchaincodelistenport = peer.chaincodelistenport + 1000
-                portlist.append(peer.peerlistenport)
                 portpeer = peer.peerlistenport + 1000
-                portlist.append(peer.database.port)
                 portcouchdb = peer.database.port + 1000
 
             caorgserverport = org.ca.serverport + 100
             caorgoplstport = org.ca.operationslistenport + 100
 
-        org = Organization()
         orgname = console.input("[bold]Organization #" + str(iorgs) + " name:[/] ")
         if orgname.lower() == "q":
             self.network_selected(domain.name)
@@ -442,30 +273,11 @@ class ConsoleOutput:
             )
             if orgname.lower() == "q":
                 self.network_selected(domain.name)
-        org.name = orgname
-
-        caorg = Ca()
-        caorg.name = "ca." + org.name
-        caorg.FABRIC_CA_SERVER_CA_NAME = caorg.name
-        caorg.FABRIC_CA_SERVER_OPERATIONS_LISTENADDRESS = "0.0.0.0:" + str(
-            caorgoplstport
-        )
-        caorg.FABRIC_CA_SERVER_PORT = caorgserverport
-        caorg.volumes = "".join(
-            [
-                str(Path().absolute()),
-                "/domains/",
-                domain.name,
-                "/fabricca/",
-                caorg.name,
-                ":/etc/hyperledger/fabric-ca-server",
-            ]
+        caorgserverport = ports.allocate(caorgserverport, 100)
+        caorgoplstport = ports.allocate(caorgoplstport, 100)
+        org = topology.new_organization(
+            domain, orgname, caorgserverport, caorgoplstport
         )
-        caorg.serverport = caorgserverport
-        caorg.operationslistenport = caorgoplstport
-        portlist.append(caorgserverport)
-        portlist.append(caorgoplstport)
-        org.ca = caorg
 
         qtypeers = console.input("[bold]Number of Peers:[/] ")
         if qtypeers.lower() == "q":
@@ -496,6 +308,7 @@ class ConsoleOutput:
         while ipeers <= org.qtypeers:
             peer = Peer()
             peer.name = "peer" + str(ipeers) + "." + org.name
+            portpeer = ports.find(portpeer, 1000)
             peerport = console.input(
                 "[bold]Peer "
                 + peer.name
@@ -518,7 +331,7 @@ class ConsoleOutput:
 
             validport = True
             while validport:
-                if valueport in portlist:
+                if not ports.free(valueport):
                     validport = True
                     peerport = console.input(
                         "[bold red]Peer "
@@ -545,76 +358,23 @@ class ConsoleOutput:
                     valueport = 0
                 valueport = int(peerport)
 
-            peer.volumes = [
-                str(Path().absolute())
-                + "/domains/"
-                + domain.name
-                + "/peerOrganizations/"
-                + org.name
-                + "/"
-                + peer.name
-                + ":/etc/hyperledger/fabric",
-                peer.name + "." + domain.name + ":/var/hyperledger/production",
-                str(Path().absolute())
-                + "/domains/"
-                + domain.name
-                + "/peerOrganizations/"
-                + org.name
-                + "/"
-                + peer.name
-                + "/peercfg"
-                + ":/etc/hyperledger/peercfg",
-                str(Path().absolute())
-                + "/domains/"
-                + domain.name
-                + ":/etc/hyperledger/organizations",
-                "/var/run/docker.sock:/host/var/run/docker.sock",
-            ]
-
-            database = Database()
-            database.port = portcouchdb
-            database.name = "db.peer" + str(ipeers) + "." + org.name
-            database.COUCHDB_USER = "admin"
-            database.COUCHDB_PASSWORD = "adminpw"
-
-            peer.CORE_LEDGER_STATE_COUCHDBCONFIG_USERNAME = database.COUCHDB_USER
-            peer.CORE_LEDGER_STATE_COUCHDBCONFIG_PASSWORD = database.COUCHDB_PASSWORD
-            peer.CORE_LEDGER_STATE_COUCHDBCONFIG_COUCHDBADDRESS = (
-                database.name + "." + domain.name + ":5984"
-            )
-            peer.CORE_VM_DOCKER_HOSTCONFIG_NETWORKMODE = domain.networkname
-            peer.CHAINCODE_AS_A_SERVICE_BUILDER_CONFIG = (
-                '{"peername":"' + "peer" + str(ipeers) + org.name + '"}'
-            )
-            peer.CORE_PEER_LISTENADDRESS = "0.0.0.0:" + str(valueport)
-            peer.CORE_OPERATIONS_LISTENADDRESS = (
-                peer.name + "." + domain.name + ":" + str(peeroperationlisten)
-            )
-            peer.peerlistenport = valueport
-            peer.operationslistenport = peeroperationlisten
-            portlist.append(peeroperationlisten)
-            peer.CORE_PEER_ADDRESS = (
-                peer.name + "." + domain.name + ":" + str(valueport)
+            ports.reserve(valueport)
+            peeroperationlisten = ports.allocate(peeroperationlisten, 1000)
+            peerchaincodelistenport = ports.allocate(peerchaincodelistenport, 1000)
+            portcouchdb = ports.allocate(portcouchdb, 1000)
+
+            peer = topology.new_peer(
+                domain,
+                org,
+                ipeers,
+                valueport,
+                peeroperationlisten,
+                peerchaincodelistenport,
+                portcouchdb,
             )
-            peer.CORE_PEER_CHAINCODEADDRESS = (
-                peer.name + "." + domain.name + ":" + str(peerchaincodelistenport)
-            )
-            peer.chaincodelistenport = peerchaincodelistenport
-            peer.CORE_PEER_CHAINCODELISTENADDRESS = "0.0.0.0:" + str(
-                peerchaincodelistenport
-            )
-            portlist.append(peerchaincodelistenport)
-            peer.CORE_PEER_GOSSIP_EXTERNALENDPOINT = peer.CORE_PEER_ADDRESS
-            peer.CORE_PEER_GOSSIP_BOOTSTRAP = peer.CORE_PEER_ADDRESS
-            peer.CORE_PEER_LOCALMSPID = org.name + "MSP"
-            peer.CORE_PEER_ID = peer.name + "." + domain.name
-
-            peer.database = database
 
             org.peers.append(peer)
 
-            portlist.append(valueport)
-
             ipeers += 1
             portpeer += 1000
             portcouchdb += 1000
@@ -623,6 +383,7 @@ class ConsoleOutput:
 
         domain.organizations.append(org)
         domain.qtyorgs += 1
+        domain.ports = ports.intervals()
         console.print("")
 
         build = Build(domain)
@@ -632,34 +393,24 @@ class ConsoleOutput:
         self.network_selected(domain.name)
 
     def create_peer(self, domain: Domain, org: Organization):
-        portlist: List[int] = []
+        ports = Ports(domain.ports)
+        ports.reserve_domain(domain)
 
         portpeer = 0
         peeroperationlisten = 0
         peerchaincodelistenport = 0
         portcouchdb = 0
-
-        portlist.append(domain.ca.serverport)
-        portlist.append(domain.ca.operationslistenport)
-        portlist.append(domain.orderer.adminlistenport)
-        portlist.append(domain.orderer.generallistenport)
-        portlist.append(domain.orderer.operationslistenport)
         for org in domain.organizations:
-            portlist.append(org.ca.serverport)
-            portlist.append(org.ca.operationslistenport)
             for peer in org.peers:
-                portlist.append(peer.operationslistenport)
                 peeroperationlisten = peer.operationslistenport + 1000
-                portlist.append(peer.chaincodelistenport)
                 peerchaincodelistenport = peer.chaincodelistenport + 1000
-                portlist.append(peer.peerlistenport)
                 portpeer = peer.peerlistenport + 1000
-                portlist.append(peer.database.port)
                 portcouchdb = peer.database.port + 1000
 
         ipeers = org.qtypeers + 1
         peer = Peer()
         peer.name = "peer" + str(ipeers) + "." + org.name
+        portpeer = ports.find(portpeer, 1000)
         peerport = console.input(
             "[bold]Peer " + peer.name + " Port Number (ex. " + str(portpeer) + "):[/] "
         )
@@ -678,7 +429,7 @@ class ConsoleOutput:
 
         validport = True
         while validport:
-            if valueport in portlist:
+            if not ports.free(valueport):
                 validport = True
                 peerport = console.input(
                     "[bold red]Peer "
@@ -705,80 +456,98 @@ class ConsoleOutput:
                 valueport = 0
             valueport = int(peerport)
 
-        peer.volumes = [
-            str(Path().absolute())
-            + "/domains/"
-            + domain.name
-            + "/peerOrganizations/"
-            + org.name
-            + "/"
-            + peer.name
-            + ":/etc/hyperledger/fabric",
-            peer.name + "." + domain.name + ":/var/hyperledger/production",
-            str(Path().absolute())
-            + "/domains/"
-            + domain.name
-            + "/peerOrganizations/"
-            + org.name
-            + "/"
-            + peer.name
-            + "/peercfg"
-            + ":/etc/hyperledger/peercfg",
-            str(Path().absolute())
-            + "/domains/"
-            + domain.name
-            + ":/etc/hyperledger/organizations",
-            "/var/run/docker.sock:/host/var/run/docker.sock",
-        ]
-
-        database = Database()
-        database.port = portcouchdb
-        database.name = "db.peer" + str(ipeers) + "." + org.name
-        database.COUCHDB_USER = "admin"
-        database.COUCHDB_PASSWORD = "adminpw"
-
-        peer.CORE_LEDGER_STATE_COUCHDBCONFIG_USERNAME = database.COUCHDB_USER
-        peer.CORE_LEDGER_STATE_COUCHDBCONFIG_PASSWORD = database.COUCHDB_PASSWORD
-        peer.CORE_LEDGER_STATE_COUCHDBCONFIG_COUCHDBADDRESS = (
-            database.name + "." + domain.name + ":5984"
-        )
-        peer.CORE_VM_DOCKER_HOSTCONFIG_NETWORKMODE = domain.networkname
-        peer.CHAINCODE_AS_A_SERVICE_BUILDER_CONFIG = (
-            '{"peername":"' + "peer" + str(ipeers) + org.name + '"}'
-        )
-        peer.CORE_PEER_LISTENADDRESS = "0.0.0.0:" + str(valueport)
-        peer.CORE_OPERATIONS_LISTENADDRESS = (
-            peer.name + "." + domain.name + ":" + str(peeroperationlisten)
-        )
-        peer.peerlistenport = valueport
-        peer.operationslistenport = peeroperationlisten
-        portlist.append(peeroperationlisten)
-        peer.CORE_PEER_ADDRESS = peer.name + "." + domain.name + ":" + str(valueport)
-        peer.CORE_PEER_CHAINCODEADDRESS = (
-            peer.name + "." + domain.name + ":" + str(peerchaincodelistenport)
-        )
-        peer.chaincodelistenport = peerchaincodelistenport
-        peer.CORE_PEER_CHAINCODELISTENADDRESS = "0.0.0.0:" + str(
-            peerchaincodelistenport
+        ports.reserve(valueport)
+        peeroperationlisten = ports.allocate(peeroperationlisten, 1000)
+        peerchaincodelistenport = ports.allocate(peerchaincodelistenport, 1000)
+        portcouchdb = ports.allocate(portcouchdb, 1000)
+
+        peer = topology.new_peer(
+            domain,
+            org,
+            ipeers,
+            valueport,
+            peeroperationlisten,
+            peerchaincodelistenport,
+            portcouchdb,
         )
-        portlist.append(peerchaincodelistenport)
-        peer.CORE_PEER_GOSSIP_EXTERNALENDPOINT = peer.CORE_PEER_ADDRESS
-        peer.CORE_PEER_GOSSIP_BOOTSTRAP = peer.CORE_PEER_ADDRESS
-        peer.CORE_PEER_LOCALMSPID = org.name + "MSP"
-        peer.CORE_PEER_ID = peer.name + "." + domain.name
-
-        peer.database = database
 
         org.peers.append(peer)
 
         org.qtypeers += 1
+        domain.ports = ports.intervals()
 
         build = Build(domain)
         build.build_new_peer(org, peer)
         blockchain = Blockchain(domain)
-        blockchain.join_channel_peer(org, peer)
+        blockchain.join_channel_peers(org, [peer])
+        self.network_selected(domain.name)
+
+    def create_organizations(self, domain: Domain):
+        os.system("clear")
+        header.header()
+        ports = Ports(domain.ports)
+        ports.reserve_domain(domain)
+
+        console.print("[bold orange1]NEW ORGANIZATIONS[/]")
+        console.print("")
+        console.print("[bold red]Press 'Q' to quit anytime[/]")
+        console.print("")
+
+        orgnames = [org.name for org in domain.organizations]
+        qtyorgs = self.ask_number(domain, "Number of Organizations")
+
+        orgs = []
+        for iorgs in range(domain.qtyorgs + 1, domain.qtyorgs + qtyorgs + 1):
+            orgname = console.input("[bold]Organization #" + str(iorgs) + " name:[/] ")
+            if orgname.lower() == "q":
+                self.network_selected(domain.name)
+            while not orgname.isalpha() or orgname in orgnames:
+                orgname = console.input(
+                    "[bold red]Organization #"
+                    + str(iorgs)
+                    + " name not valid or in use. Please retype again:[/] "
+                )
+                if orgname.lower() == "q":
+                    self.network_selected(domain.name)
+            orgnames.append(orgname)
+
+            orgs.append((orgname, self.ask_number(domain, "Number of Peers")))
+            console.print("")
+
+        neworgs = topology.add_organizations(domain, orgs, ports)
+
+        build = Build(domain)
+        build.build_new_organizations(neworgs)
+        blockchain = Blockchain(domain)
+        blockchain.build_new_organizations(neworgs)
+        self.network_selected(domain.name)
+
+    def create_peers(self, domain: Domain, org: Organization):
+        ports = Ports(domain.ports)
+        ports.reserve_domain(domain)
+
+        qtypeers = self.ask_number(domain, "Number of new " + org.name + " Peers")
+        newpeers = topology.add_peers(domain, org, qtypeers, ports)
+
+        build = Build(domain)
+        build.build_new_peers(org, newpeers)
+        blockchain = Blockchain(domain)
+        blockchain.join_channel_peers(org, newpeers)
         self.network_selected(domain.name)
 
+    def ask_number(self, domain: Domain, label: str) -> int:
+        """Asks a positive integer, going back to the network menu on 'Q'"""
+        value = console.input("[bold]" + label + ":[/] ")
+        while not value.isdigit() or int(value) < 1:
+            if value.lower() == "q":
+                self.network_selected(domain.name)
+            value = console.input(
+                "[bold red]"
+                + label
+                + " value not valid, min 1. Please retype again:[/] "
+            )
+        return int(value)
+
     def main_menu(self):
         os.system("clear")
         header.header()
@@ -940,7 +709,7 @@ class ConsoleOutput:
                 )
                 console.print("")
 
-    def select_organization(self, domain: Domain):
+    def select_organization(self, domain: Domain, bulk: bool = False):
         os.system("clear")
         header.header()
         console.print("[bold orange1]ADDING A PEER[/]")
@@ -966,7 +735,10 @@ class ConsoleOutput:
             elif option.isdigit() and (int(option) <= (len(domain.organizations) - 1)):
                 selected = False
                 console.print("")
-                self.create_peer(domain, domain.organizations[int(option)])
+                if bulk:
+                    self.create_peers(domain, domain.organizations[int(option)])
+                else:
+                    self.create_peer(domain, domain.organizations[int(option)])
             else:
                 option = console.input(
                     "[bold red]Wrong option.[/] [bold white]Select an Organization:[/] "
@@ -981,6 +753,8 @@ class ConsoleOutput:
         console.print("[bold white]N - Network status[/]")
         console.print("[bold white]O - Add organization[/]")
         console.print("[bold white]P - Add peer[/]")
+        console.print("[bold white]B - Add organizations (bulk)[/]")
+        console.print("[bold white]K - Add peers (bulk)[/]")
         console.print("[bold white]A - Add chaincode[/]")
         console.print("[bold white]F - Run FireFly[/]")
         console.print("[bold white]Y - Remove FireFly[/]")
@@ -993,7 +767,7 @@ class ConsoleOutput:
         console.print("[bold white]Q - Quit[/]")
         console.print("")
         option = console.input(
-            "[bold]Select an option (N,O,P,A,F,Y,G,S,C,D,R,M or Q):[/] "
+            "[bold]Select an option (N,O,P,B,K,A,F,Y,G,S,C,D,R,M or Q):[/] "
         )
         console.print("")
 
@@ -1035,6 +809,14 @@ class ConsoleOutput:
                     selectoption = False
                     self.select_organization(domain)
                     self.network_selected(domain.name)
+                case "b":
+                    selectoption = False
+                    self.create_organizations(domain)
+                    self.network_selected(domain.name)
+                case "k":
+                    selectoption = False
+                    self.select_organization(domain, True)
+                    self.network_selected(domain.name)
                 case "a":
                     selectoption = False
                     self.select_chaincode(domain)
@@ -1050,12 +832,10 @@ class ConsoleOutput:
                     self.network_selected(domain.name)
                 case "g":
                     selectoption = False
-                    run = Run(domain)
-                    exists = run.check_container()
-                    run.run_all()
-                    if not exists:
-                        blockchain = Blockchain(domain)
-                        blockchain.rebuild()
+                    reconcile = Reconcile(domain)
+                    reconcile.reconcile()
+                    blockchain = Blockchain(domain)
+                    blockchain.resume(reconcile.ledgers())
                     self.check_docker_status(domain)
                 case "s":
                     selectoption = False
@@ -1103,7 +883,7 @@ class ConsoleOutput:
                     exit(0)
                 case _:
                     option = console.input(
-                        "[bold]Select an option (N,O,P,A,F,Y,G,S,C,D,R,M or Q):[/] "
+                        "[bold]Select an option (N,O,P,B,K,A,F,Y,G,S,C,D,R,M or Q):[/] "
                     )
                     console.print("")
 
@@ -1117,24 +897,11 @@ class ConsoleOutput:
 
         chaincode = Chaincode()
 
-        portlist: List[int] = []
+        ports = Ports(domain.ports)
+        ports.reserve_domain(domain)
         ccport = 1999
-        portlist.append(domain.ca.serverport)
-        portlist.append(domain.ca.operationslistenport)
-        portlist.append(domain.orderer.adminlistenport)
-        portlist.append(domain.orderer.generallistenport)
-        portlist.append(domain.orderer.operationslistenport)
-        portlist.append(9999)  # Exclusive for Firefly chaincode
-        for org in domain.organizations:
-            portlist.append(org.ca.serverport)
-            portlist.append(org.ca.operationslistenport)
-            for peer in org.peers:
-                portlist.append(peer.operationslistenport)
-                portlist.append(peer.chaincodelistenport)
-                portlist.append(peer.peerlistenport)
-                portlist.append(peer.database.port)
+        ports.reserve(9999)  # Exclusive for Firefly chaincode
         for cc in domain.chaincodes:
-            portlist.append(cc.ccport)
             ccport = cc.ccport + 1000
 
         listccsrc = [
@@ -1274,7 +1041,7 @@ class ConsoleOutput:
 
                 validport = True
                 while validport:
-                    if valueport in portlist:
+                    if not ports.free(valueport):
                         validport = True
                         ccportn = console.input(
                             "[bold red]Chaincode Port Number value in use. Please retype again:[/] "
@@ -1300,6 +1067,8 @@ class ConsoleOutput:
                     valueport = int(ccportn)
 
                 chaincode.ccport = valueport
+                ports.reserve(valueport)
+                domain.ports = ports.intervals()
                 console.print("")
 
             """ hastls = console.input("[bold white]Use TLS Connection (y/n):[/] ")
@@ -1,7 +1,6 @@
 import json
 import os
 import shutil
-import time
 import webbrowser
 from pathlib import Path
 
@@ -13,7 +12,11 @@ from rich.console import Console
 
 from controllers.chaincode import ChaincodeDeploy
 from controllers.header import Header
+from helpers.commands import Commands
+from helpers.cryptostore import CryptoStore
 from helpers.paths import Paths
+from helpers.readiness import Readiness
+from helpers.tracing import tracer
 from models.chaincode import Chaincode
 from models.domain import Domain
 
@@ -25,14 +28,18 @@ yaml = ruamel.yaml.YAML()
 yaml.indent(sequence=3, offset=1)
 yaml.boolean_representation = [f"false", f"true"]
 header = Header()
+commands = Commands()
 
 
 class Firefly:
     def __init__(self, domain: Domain) -> None:
         self.domain: Domain = domain
         self.paths: Paths = Paths(domain)
+        self.store = CryptoStore(self.paths.CRYPTOSTOREPATH)
+        self.readiness = Readiness(domain)
         self.ffchaincode: Chaincode = None
 
+    @tracer.phase()
     def build_all(self):
         os.system("clear")
         header.header()
@@ -56,6 +63,7 @@ class Firefly:
         os.system(self.paths.APPPATH + "bin/ff stop " + self.domain.networkname)
         os.system(self.paths.APPPATH + "bin/ff remove -f " + self.domain.networkname) """
 
+    @tracer.phase()
     def build_connection_profiles(self):
         console.print("[bold white]# Preparing connection profiles[/]")
 
@@ -139,8 +147,6 @@ class Firefly:
         }
 
         for org in self.domain.organizations:
-            self.paths.set_org_paths(org)
-
             ccp["certificateAuthorities"][org.name + "." + self.domain.name] = {
                 "url": "https://"
                 + org.ca.name
@@ -176,8 +182,6 @@ class Firefly:
             }
 
             for peer in org.peers:
-                self.paths.set_peer_paths(org, peer)
-
                 ccp["channels"][self.domain.networkname]["peers"][
                     peer.name + "." + self.domain.name
                 ] = {
@@ -215,6 +219,7 @@ class Firefly:
             ) as yaml_file:
                 yaml.dump(ccp, yaml_file)
 
+    @tracer.phase()
     def deploy_firefly_chaincode(self):
         console.print("[bold white]# Deploy Firefly chaincode[/]")
         chaincode = Chaincode()
@@ -225,6 +230,7 @@ class Firefly:
         chaincodedeploy = ChaincodeDeploy(self.domain, chaincode)
         self.ffchaincode = chaincodedeploy.build_firefly()
 
+    @tracer.phase()
     def create_stack(self):
         console.print("[bold white]# Creating Firefly stack[/]")
         self.build_fabconnect()
@@ -233,6 +239,7 @@ class Firefly:
         self.build_database()
         self.build_firefly_core()
 
+    @tracer.phase()
     def start_stack(self):
         console.print("[bold white]# Starting Firefly stack[/]")
         console.print("")
@@ -246,8 +253,10 @@ class Firefly:
         whales = DockerClient(
             compose_files=[fabconnect, dataexchange, sharedstorage, database]
         )
-        whales.compose.up(detach=True)
-        time.sleep(5)
+        with tracer.span("compose up", "docker"):
+            whales.compose.up(detach=True)
+        if not self.readiness.fabconnect():
+            raise RuntimeError("fabconnect." + self.domain.name + " not ready")
 
         orgclient = self.domain.organizations[0]
 
@@ -290,23 +299,29 @@ class Firefly:
         console.print("")
         command = "sh -c 'for file in /migrations/*;do psql -U firefly -d firefly -f $file;done;'"
         clidocker = client.containers.get("database." + self.domain.name)
-        clidocker.exec_run(command)
-        time.sleep(5)
+        if not self.readiness.postgres(clidocker):
+            raise RuntimeError(clidocker.name + " not ready")
+        with tracer.span("docker exec " + command.split(" ")[0], "docker"):
+            clidocker.exec_run(command)
 
         console.print("# Enabling Database SSL....")
         command = "chmod 600 /var/lib/postgresql/server.key"
-        clidocker.exec_run(command)
+        with tracer.span("docker exec " + command.split(" ")[0], "docker"):
+            clidocker.exec_run(command)
         command = "chown postgres:postgres /var/lib/postgresql/server.key"
-        clidocker.exec_run(command)
+        with tracer.span("docker exec " + command.split(" ")[0], "docker"):
+            clidocker.exec_run(command)
         command = "psql -U firefly -d firefly -f /var/lib/postgresql/sslenable.sql"
-        clidocker.exec_run(command)
-        time.sleep(1)
+        with tracer.span("docker exec " + command.split(" ")[0], "docker"):
+            clidocker.exec_run(command)
 
         console.print("# Waiting Firefly start...")
         console.print("")
         whales = DockerClient(compose_files=[fireflycore])
-        whales.compose.up(detach=True)
-        time.sleep(5)
+        with tracer.span("compose up", "docker"):
+            whales.compose.up(detach=True)
+        if not self.readiness.firefly():
+            raise RuntimeError("firefly." + self.domain.name + " not ready")
 
         params = {
             "confirm": "true",
@@ -339,6 +354,7 @@ class Firefly:
         webbrowser.open("http://127.0.0.1:5000/ui", 1)
         webbrowser.open("http://127.0.0.1:5000/api", 1)
 
+    @tracer.phase()
     def build_fabconnect(self):
         console.print("[bold]## Bulding Fabconnect[/]")
 
@@ -347,10 +363,8 @@ class Firefly:
 
         # copy org msps to msp
         for org in self.domain.organizations:
-            self.paths.set_org_paths(org)
-
-            shutil.copytree(
-                self.paths.MSPORGPATH,
+            self.store.copytree(
+                self.paths.org(org).MSPORGPATH,
                 self.paths.FIREFLYFABCONNECTPATH + "msp/" + org.name,
             )
         # save fabconnect.yaml
@@ -429,6 +443,7 @@ class Firefly:
         ) as yaml_file:
             yaml.dump(fabconnectservice, yaml_file)
 
+    @tracer.phase()
     def build_sharedstorage(self):
         console.print("[bold]## Bulding Sharedstorage[/]")
 
@@ -478,6 +493,7 @@ class Firefly:
         ) as yaml_file:
             yaml.dump(sharedstorage, yaml_file)
 
+    @tracer.phase()
     def build_dataexchange(self):
         console.print("[bold]## Bulding Dataexchange[/]")
 
@@ -532,14 +548,30 @@ class Firefly:
         ) as yaml_file:
             yaml.dump(dataexchange, yaml_file)
 
-        old_dir = os.getcwd()
-        os.chdir(self.paths.FIREFLYDATAEXCHPATH)
-        os.system(
-            "openssl req -new -x509 -nodes -days 365 -subj '/CN=localhost/O=org' -keyout key.pem -out cert.pem"
+        commands.run(
+            [
+                "openssl",
+                "req",
+                "-new",
+                "-x509",
+                "-nodes",
+                "-days",
+                "365",
+                "-subj",
+                "/CN=localhost/O=org",
+                "-keyout",
+                "key.pem",
+                "-out",
+                "cert.pem",
+            ],
+            cwd=self.paths.FIREFLYDATAEXCHPATH,
+        )
+        shutil.copy(
+            self.paths.FIREFLYDATAEXCHPATH + "cert.pem",
+            self.paths.FIREFLYDATAEXCHPATH + "peer-certs/org.pem",
         )
-        shutil.copy("cert.pem", "peer-certs/org.pem")
-        os.chdir(old_dir)
 
+    @tracer.phase()
     def build_database(self):
         console.print("[bold]## Bulding Database[/]")
 
@@ -548,12 +580,24 @@ class Firefly:
             self.paths.FIREFLYDATABASEPATH + "migrations",
         )
 
-        old_dir = os.getcwd()
-        os.chdir(self.paths.FIREFLYDATABASEPATH)
-        os.system(
-            "openssl req -new -x509 -nodes -days 365 -subj '/CN=database/O=teste.com' -keyout key.pem -out cert.pem"
+        commands.run(
+            [
+                "openssl",
+                "req",
+                "-new",
+                "-x509",
+                "-nodes",
+                "-days",
+                "365",
+                "-subj",
+                "/CN=database/O=teste.com",
+                "-keyout",
+                "key.pem",
+                "-out",
+                "cert.pem",
+            ],
+            cwd=self.paths.FIREFLYDATABASEPATH,
         )
-        os.chdir(old_dir)
 
         with open(self.paths.FIREFLYDATABASEPATH + "sslenable.sql", "w") as file1:
             # Writing data to a file
@@ -612,6 +656,7 @@ class Firefly:
         ) as yaml_file:
             yaml.dump(database, yaml_file)
 
+    @tracer.phase()
     def build_firefly_core(self):
         console.print("[bold]## Bulding FireFly Core[/]")
 
@@ -0,0 +1,230 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import ruamel.yaml
+from python_on_whales import Container, DockerClient
+from rich.console import Console
+from rich.table import Table
+
+from controllers.run import Run
+from helpers.paths import Paths
+from helpers.tracing import tracer
+from models.domain import Domain
+
+console = Console()
+yaml = ruamel.yaml.YAML()
+
+
+@dataclass(frozen=True)
+class Action:
+    """One step of a reconcile plan: create, start, restart or remove a
+    container"""
+
+    kind: str
+    service: str
+    reason: str
+
+
+class Reconcile:
+    """Brings the containers of a network back to its setup.json.
+
+    The desired state is the CA, orderer, CouchDB, peer and CLI services the
+    domain compose files define for setup.json. The actual state is what the
+    Docker engine reports for the containers labelled service:
+    hyperledger-fabric created from those files, the compose volumes and the
+    domain network. The plan only touches what differs: missing containers
+    are created, stopped ones started, unhealthy ones restarted and
+    containers no longer in setup.json removed. Running containers are left
+    alone and named volumes, and so the ledgers, are kept."""
+
+    LABEL = "service=hyperledger-fabric"
+    CONFIGFILESLABEL = "com.docker.compose.project.config_files"
+    VOLUMELABEL = "com.docker.compose.volume"
+
+    def __init__(self, domain: Domain) -> None:
+        self.domain: Domain = domain
+        self.paths = Paths(domain)
+        self.run = Run(domain)
+        self.cadocker = DockerClient(
+            compose_files=[self.paths.COMPOSEPATH + "compose-ca.yaml"]
+        )
+        self.netdocker = DockerClient(
+            compose_files=[
+                self.paths.COMPOSEPATH + "compose-orderer.yaml",
+                self.paths.COMPOSEPATH + "compose-net.yaml",
+            ]
+        )
+        self.containers: Dict[str, Container] = {}
+        self.volumes: Dict[str, bool] = {}
+        self.network: bool = True
+
+    def graphs(self) -> List[Tuple[DockerClient, List[Tuple]]]:
+        """Start graph nodes of every desired service, with the docker client
+        of their compose files. CAs are not needed in cryptogen networks."""
+        graphs = []
+        if not self.domain.cryptogen:
+            graphs.append((self.cadocker, self.run.ca_nodes(self.cadocker)))
+        graphs.append((self.netdocker, self.run.network_nodes(self.netdocker)))
+        return graphs
+
+    def actual(self):
+        """Reads the containers, compose volumes and network of the domain
+        from the Docker engine"""
+        self.containers = {
+            container.name: container
+            for container in self.netdocker.container.list(
+                all=True, filters={"label": self.LABEL}
+            )
+            if self.paths.COMPOSEPATH
+            in container.config.labels.get(self.CONFIGFILESLABEL, "")
+        }
+
+        existing = {
+            volume.labels.get(self.VOLUMELABEL)
+            for volume in self.netdocker.volume.list(
+                filters={"label": self.VOLUMELABEL}
+            )
+        }
+        self.volumes = {volume: volume in existing for volume in self.desired_volumes()}
+
+        self.network = self.netdocker.network.exists(self.domain.networkname)
+
+    def desired_volumes(self) -> List[str]:
+        """Named volumes of the orderer and network compose files"""
+        volumes = []
+        for filename in ("compose-orderer.yaml", "compose-net.yaml"):
+            if not os.path.isfile(self.paths.COMPOSEPATH + filename):
+                continue
+            with open(self.paths.COMPOSEPATH + filename, encoding="utf-8") as f:
+                volumes.extend((yaml.load(f) or {}).get("volumes") or {})
+        return volumes
+
+    def ledgers(self) -> Dict[str, bool]:
+        """Whether the ledger volume of the orderer and of every peer existed
+        before the plan ran, by service"""
+        services = [self.domain.orderer.name + "." + self.domain.name] + [
+            peer.name + "." + self.domain.name
+            for org in self.domain.organizations
+            for peer in org.peers
+        ]
+        return {service: self.volumes.get(service, False) for service in services}
+
+    def plan(self) -> List[Action]:
+        """Actions that bring the actual state to the desired one"""
+        self.actual()
+
+        actions = []
+        desired = []
+        for _, nodes in self.graphs():
+            for service, _, _, _ in nodes:
+                desired.append(service)
+                container = self.containers.get(service)
+                if container is None:
+                    actions.append(Action("create", service, "missing"))
+                elif not self.network:
+                    # Containers keep the id of the network they were made on
+                    actions.append(
+                        Action(
+                            "create",
+                            service,
+                            "network " + self.domain.networkname + " missing",
+                        )
+                    )
+                elif not container.state.running:
+                    actions.append(Action("start", service, container.state.status))
+                elif (
+                    container.state.health is not None
+                    and container.state.health.status == "unhealthy"
+                ):
+                    actions.append(Action("restart", service, "unhealthy"))
+
+        cas = [
+            ca.name + "." + self.domain.name
+            for ca in [self.domain.ca, self.domain.caorderer]
+            + [org.ca for org in self.domain.organizations]
+        ]
+        for name in self.containers:
+            if name in desired or (self.domain.cryptogen and name in cas):
+                continue
+            actions.append(Action("remove", name, "not in setup.json"))
+
+        return actions
+
+    def report(self, actions: List[Action]):
+        """Prints the plan and the volumes that will be created with it"""
+        table = Table(title="Reconcile plan")
+        table.add_column("Action")
+        table.add_column("Target")
+        table.add_column("Reason")
+
+        for action in actions:
+            table.add_row(action.kind, action.service, action.reason)
+        for volume, exists in self.volumes.items():
+            if not exists:
+                table.add_row("create", "volume " + volume, "missing")
+        if not self.network:
+            table.add_row("create", "network " + self.domain.networkname, "missing")
+
+        console.print(table)
+
+    def apply(self, actions: List[Action]):
+        """Runs the plan: removals first, then every created, started or
+        restarted service as one start graph. Volumes and the network are
+        created by compose with the services that use them."""
+        kinds = {action.service: action.kind for action in actions}
+
+        removed = [action.service for action in actions if action.kind == "remove"]
+        if removed:
+            console.print("[bold white]# Removing " + str(len(removed)) + "...[/]")
+            with tracer.span(
+                "container remove", "docker", {"containers": len(removed)}
+            ):
+                self.netdocker.container.remove(removed, force=True)
+
+        graph = []
+        for docker, nodes in self.graphs():
+            nodes = [node for node in nodes if node[0] in kinds]
+            created = [node[0] for node in nodes if kinds[node[0]] == "create"]
+            restarted = [node[0] for node in nodes if kinds[node[0]] == "restart"]
+
+            if created:
+                with tracer.span(
+                    "compose create", "docker", {"services": len(created)}
+                ):
+                    docker.compose.rm(created, stop=True)
+                    docker.compose.up(created, detach=True, start=False)
+            if restarted:
+                with tracer.span(
+                    "compose stop", "docker", {"services": len(restarted)}
+                ):
+                    docker.compose.stop(restarted)
+
+            for service, _, dependencies, ready in nodes:
+                graph.append(
+                    (
+                        service,
+                        docker,
+                        [name for name in dependencies if name in kinds],
+                        ready,
+                    )
+                )
+
+        if graph:
+            console.print("[bold white]# Starting " + str(len(graph)) + "...[/]")
+            self.run.start_graph("Reconcile", graph)
+
+    @tracer.phase()
+    def reconcile(self) -> List[Action]:
+        """Plans, prints and applies. Returns the plan"""
+        console.print("[bold white]# Reading network state...[/]")
+        actions = self.plan()
+        if not actions and self.network:
+            console.print("[bold green]Network matches setup.json[/]")
+            console.print("")
+            return actions
+
+        self.report(actions)
+        self.apply(actions)
+        console.print("")
+        return actions
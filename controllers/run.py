@@ -1,11 +1,15 @@
+import functools
 import os
-import time
 from pathlib import Path
+from typing import Callable, List, Tuple
 
 from python_on_whales import DockerClient
 from rich.console import Console
 
 from controllers.header import Header
+from helpers.readiness import Readiness
+from helpers.scheduler import Scheduler
+from helpers.tracing import tracer
 from models.domain import Domain
 from models.organization import Organization
 from models.peer import Peer
@@ -15,127 +19,262 @@ header = Header()
 
 
 class Run:
+    """Starts the network containers.
+
+    Compose services are created first and then started as a dependency
+    graph (CouchDB before its peer, every peer before the CLI), with each
+    service gated on its own readiness probe. Independent branches start
+    concurrently, so bring-up takes as long as the slowest chain instead of
+    the sum of all services."""
+
     def __init__(self, domain: Domain) -> None:
         self.domain: Domain = domain
+        self.readiness = Readiness(domain)
 
+    @tracer.phase()
     def run_all(self):
         os.system("clear")
         header.header()
         console.print("[bold orange1]RUN[/]")
         console.print("")
         console.print("[bold green]Starting network[/]")
-        console.print("[bold white]# Starting CAs[/]")
-        self.start_ca()
-        console.print("")
-        console.print("[bold white]# Starting orderer, peers and databases[/]")
-        self.starting_opd()
+        console.print("[bold white]# Starting CAs, orderer, peers and databases[/]")
+
+        cadocker = self.compose(["compose-ca.yaml"])
+        netdocker = self.compose(["compose-orderer.yaml", "compose-net.yaml"])
+        self.start_graph(
+            "Network start",
+            self.ca_nodes(cadocker) + self.network_nodes(netdocker),
+        )
         console.print("")
 
-    def start_ca(self):
-        pathfabricca = "".join(
-            [
-                str(Path().absolute()),
-                "/domains/",
-                self.domain.name,
-                "/compose/",
-                "compose-ca.yaml",
+    def compose(self, filenames: List[str]) -> DockerClient:
+        """Docker client for the given compose files, with every container
+        created but not started"""
+        pathcompose = self.domain_compose_path()
+
+        docker = DockerClient(
+            compose_files=[pathcompose + filename for filename in filenames]
+        )
+        with tracer.span("compose create", "docker"):
+            docker.compose.up(detach=True, start=False)
+        return docker
+
+    def ca_nodes(self, docker: DockerClient, cas: list = None) -> List[Tuple]:
+        """_summary_"""
+        if cas is None:
+            cas = [self.domain.ca, self.domain.caorderer] + [
+                org.ca for org in self.domain.organizations
             ]
+
+        return [
+            (
+                ca.name + "." + self.domain.name,
+                docker,
+                [],
+                functools.partial(self.readiness.ca, ca),
+            )
+            for ca in cas
+        ]
+
+    def network_nodes(
+        self, docker: DockerClient, peers: list = None, cli: bool = True
+    ) -> List[Tuple]:
+        """Orderer, CouchDB -> peer and peers -> CLI nodes"""
+        nodes = []
+        if peers is None:
+            nodes.append(
+                (
+                    self.domain.orderer.name + "." + self.domain.name,
+                    docker,
+                    [],
+                    self.readiness.orderer,
+                )
+            )
+            peers = [peer for org in self.domain.organizations for peer in org.peers]
+
+        peernames = []
+        for peer in peers:
+            peername = peer.name + "." + self.domain.name
+            dependencies = []
+            if peer.database is not None:
+                databasename = peer.database.name + "." + self.domain.name
+                nodes.append(
+                    (
+                        databasename,
+                        docker,
+                        [],
+                        functools.partial(self.readiness.couchdb, peer.database),
+                    )
+                )
+                dependencies.append(databasename)
+
+            nodes.append(
+                (
+                    peername,
+                    docker,
+                    dependencies,
+                    functools.partial(self.readiness.peer, peer),
+                )
+            )
+            peernames.append(peername)
+
+        if cli:
+            cliname = "cli." + self.domain.name
+            nodes.append(
+                (
+                    cliname,
+                    docker,
+                    peernames,
+                    functools.partial(self.running, docker, cliname),
+                )
+            )
+
+        return nodes
+
+    def running(self, docker: DockerClient, container: str) -> bool:
+        """_summary_"""
+        return self.readiness.poll(
+            container, lambda: docker.container.inspect(container).state.running
         )
 
-        docker = DockerClient(compose_files=[pathfabricca])
-        docker.compose.up(detach=True)
+    def start_service(
+        self, docker: DockerClient, service: str, ready: Callable[[], bool]
+    ):
+        """Starts one created service and waits until it is ready"""
+        with tracer.span("compose start", "docker", {"service": service}):
+            docker.compose.start([service])
+
+        if not ready():
+            raise RuntimeError(service + " not ready")
+
+    def start_graph(self, title: str, nodes: List[Tuple]):
+        """Starts every (service, docker, dependencies, ready) node as soon as
+        all its dependencies are ready"""
+        scheduler = Scheduler()
+        for service, docker, dependencies, ready in nodes:
+            scheduler.add(
+                service,
+                functools.partial(self.start_service, docker, service, ready),
+                dependencies,
+            )
+
+        scheduler.run()
+        console.print("")
+        scheduler.report(title)
+
+        if scheduler.failed:
+            raise next(iter(scheduler.failed.values()))
+
+    @tracer.phase()
+    def start_ca(self):
+        docker = self.compose(["compose-ca.yaml"])
         console.print("[bold]# Waiting CAs...[/]")
-        time.sleep(2)
+        self.start_graph("CAs start", self.ca_nodes(docker))
 
+    @tracer.phase()
     def start_ca_new(self, orgname: str):
-        pathfabricca = "".join(
-            [
-                str(Path().absolute()),
-                "/domains/",
-                self.domain.name,
-                "/compose/",
-                "compose-ca-" + orgname + ".yaml",
-            ]
+        self.start_ca_overlay(
+            "compose-ca-" + orgname + ".yaml",
+            [org for org in self.domain.organizations if org.name == orgname],
         )
 
-        docker = DockerClient(compose_files=[pathfabricca])
-        docker.compose.up(detach=True)
+    @tracer.phase()
+    def start_ca_overlay(self, overlay: str, orgs: List[Organization]):
+        """Starts the CAs of new organizations from a temporary compose
+        overlay, removed afterwards"""
+        docker = self.compose([overlay])
         console.print("[bold]# Waiting new CA...[/]")
-        time.sleep(2)
+        self.start_graph("CA start", self.ca_nodes(docker, [org.ca for org in orgs]))
 
-        os.remove(Path(pathfabricca))
+        os.remove(Path(self.domain_compose_path() + overlay))
 
+    @tracer.phase()
     def starting_opd(self):
-        pathorderer = "".join(
-            [
-                str(Path().absolute()),
-                "/domains/",
-                self.domain.name,
-                "/compose/",
-                "compose-orderer.yaml",
-            ]
-        )
-
-        pathnet = "".join(
-            [
-                str(Path().absolute()),
-                "/domains/",
-                self.domain.name,
-                "/compose/",
-                "compose-net.yaml",
-            ]
-        )
-
-        docker = DockerClient(compose_files=[pathorderer, pathnet])
-        docker.compose.up(detach=True)
+        docker = self.compose(["compose-orderer.yaml", "compose-net.yaml"])
 
         console.print("")
         console.print("## Waiting Network...")
         console.print("")
-        time.sleep(2)
+        self.start_graph("Network start", self.network_nodes(docker))
 
+    @tracer.phase()
     def starting_pd_org(self, org: Organization):
-        pathnet = "".join(
-            [
-                str(Path().absolute()),
-                "/domains/",
-                self.domain.name,
-                "/compose/",
-                "compose-net-" + org.name + ".yaml",
-            ]
+        console.print("")
+        console.print("## Waiting Organization...")
+        console.print("")
+        self.start_overlay(
+            "compose-net-" + org.name + ".yaml", org.peers, "Organization start"
         )
 
-        docker = DockerClient(compose_files=[pathnet])
-        docker.compose.up(detach=True)
-
+    @tracer.phase()
+    def starting_pd(self, peer: Peer):
         console.print("")
-        console.print("## Waiting Organization...")
+        console.print("## Waiting Peer...")
         console.print("")
-        time.sleep(2)
+        self.start_overlay("compose-net-" + peer.name + ".yaml", [peer], "Peer start")
 
-        os.remove(Path(pathnet))
+    @tracer.phase()
+    def start_overlay(self, overlay: str, peers: List[Peer], title: str):
+        """Starts new peers and databases from a temporary compose overlay,
+        removed afterwards"""
+        docker = self.compose([overlay])
+        self.start_graph(title, self.network_nodes(docker, peers, False))
 
-    def starting_pd(self, peer: Peer):
-        pathnet = "".join(
+        os.remove(Path(self.domain_compose_path() + overlay))
+
+    @tracer.phase()
+    def restart_services(self, services: List[str]):
+        """Recreates the given services from the domain compose files and
+        starts them in dependency order. Named volumes, and so the ledgers,
+        are kept and every other container keeps running."""
+        pathcompose = self.domain_compose_path()
+        cadocker = DockerClient(compose_files=[pathcompose + "compose-ca.yaml"])
+        netdocker = DockerClient(
+            compose_files=[
+                pathcompose + "compose-orderer.yaml",
+                pathcompose + "compose-net.yaml",
+            ]
+        )
+
+        nodes = []
+        for docker, candidates in (
+            (cadocker, self.ca_nodes(cadocker)),
+            (netdocker, self.network_nodes(netdocker)),
+        ):
+            candidates = [node for node in candidates if node[0] in services]
+            if not candidates:
+                continue
+
+            names = [node[0] for node in candidates]
+            with tracer.span("compose recreate", "docker", {"services": len(names)}):
+                docker.compose.rm(names, stop=True)
+                docker.compose.up(names, detach=True, start=False)
+
+            for service, _, dependencies, ready in candidates:
+                nodes.append(
+                    (
+                        service,
+                        docker,
+                        [name for name in dependencies if name in services],
+                        ready,
+                    )
+                )
+
+        console.print("[bold]# Restarting " + str(len(nodes)) + " services...[/]")
+        self.start_graph("Restart", nodes)
+
+    def domain_compose_path(self) -> str:
+        """_summary_"""
+        return "".join(
             [
                 str(Path().absolute()),
                 "/domains/",
                 self.domain.name,
                 "/compose/",
-                "compose-net-" + peer.name + ".yaml",
             ]
         )
 
-        docker = DockerClient(compose_files=[pathnet])
-        docker.compose.up(detach=True)
-
-        console.print("")
-        console.print("## Waiting Peer...")
-        console.print("")
-        time.sleep(1)
-
-        os.remove(Path(pathnet))
-
     def check_container(self) -> bool:
         pathorderer = "".join(
             [
@@ -0,0 +1,213 @@
+import base64
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import requests
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    decode_dss_signature,
+    encode_dss_signature,
+)
+from cryptography.x509.oid import NameOID
+from requests.adapters import HTTPAdapter
+
+from helpers.tracing import tracer
+
+# Order of the P-256 curve, signatures are normalized to low-S as Fabric expects
+P256ORDER = 0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551
+
+
+class CaError(Exception):
+    """Raised when the Fabric CA answers a request with errors"""
+
+    def __init__(self, endpoint: str, status: int, messages: List[str]) -> None:
+        self.endpoint = endpoint
+        self.status = status
+        self.messages = messages
+        super().__init__(
+            endpoint + " returned " + str(status) + ": " + "; ".join(messages)
+        )
+
+
+class CaClient:
+    """Fabric CA REST client.
+
+    Every CA gets one pooled HTTPS session, shared by all instances and
+    threads, so registrations reuse open TLS connections instead of starting a
+    fabric-ca-client process each. The registrar is enrolled once per CA and
+    its certificate and key are kept in memory to sign the request tokens."""
+
+    POOLSIZE = 16
+    REQUESTTIMEOUT = 30.0
+
+    sessions: Dict[str, requests.Session] = {}
+    identities: Dict[Tuple[str, str], Tuple[bytes, ec.EllipticCurvePrivateKey]] = {}
+    lock = threading.Lock()
+
+    def __init__(
+        self,
+        port: int,
+        certfile: str,
+        registrar: str = "admin",
+        registrarpw: str = "adminpw",
+    ) -> None:
+        self.url = "https://localhost:" + str(port)
+        self.certfile = certfile
+        self.registrar = registrar
+        self.registrarpw = registrarpw
+
+    def session(self) -> requests.Session:
+        """_summary_"""
+        with CaClient.lock:
+            session = CaClient.sessions.get(self.url)
+            if session is None:
+                session = requests.Session()
+                session.mount(
+                    "https://",
+                    HTTPAdapter(pool_connections=1, pool_maxsize=self.POOLSIZE),
+                )
+                session.verify = self.certfile
+                CaClient.sessions[self.url] = session
+            return session
+
+    def request(self, endpoint: str, body: dict, auth: Tuple[str, str] = None) -> dict:
+        """POSTs to /api/v1/<endpoint>, authenticated with basic auth when
+        given, else with a registrar token"""
+        path = "/api/v1/" + endpoint
+        data = json.dumps(body).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if auth is None:
+            headers["Authorization"] = self.token("POST", path, data)
+
+        response = self.session().post(
+            self.url + path,
+            data=data,
+            headers=headers,
+            auth=auth,
+            timeout=self.REQUESTTIMEOUT,
+        )
+        try:
+            reply = response.json()
+        except ValueError:
+            raise CaError(endpoint, response.status_code, [response.text.strip()])
+
+        if not reply.get("success"):
+            raise CaError(
+                endpoint,
+                response.status_code,
+                [error.get("message", "") for error in reply.get("errors") or []],
+            )
+        return reply["result"]
+
+    def enroll(
+        self, enrollid: str, secret: str, profile: str = None, hosts: List[str] = None
+    ) -> Tuple[bytes, ec.EllipticCurvePrivateKey]:
+        """Enrolls an identity with a fresh P-256 key, returns the PEM
+        certificate and the key"""
+        key = ec.generate_private_key(ec.SECP256R1())
+        csr = (
+            x509.CertificateSigningRequestBuilder()
+            .subject_name(
+                x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, enrollid)])
+            )
+            .sign(key, hashes.SHA256())
+        )
+
+        body = {
+            "certificate_request": csr.public_bytes(serialization.Encoding.PEM).decode(
+                "utf-8"
+            )
+        }
+        if profile:
+            body["profile"] = profile
+        if hosts:
+            body["hosts"] = hosts
+
+        with tracer.span("ca enroll", "ca", {"id": enrollid}):
+            result = self.request("enroll", body, (enrollid, secret))
+        return base64.b64decode(result["Cert"]), key
+
+    def identity(self) -> Tuple[bytes, ec.EllipticCurvePrivateKey]:
+        """Registrar certificate and key, enrolled on first use"""
+        key = (self.url, self.registrar)
+        with CaClient.lock:
+            identity = CaClient.identities.get(key)
+        if identity is None:
+            identity = self.enroll(self.registrar, self.registrarpw)
+            with CaClient.lock:
+                identity = CaClient.identities.setdefault(key, identity)
+        return identity
+
+    def token(self, method: str, path: str, body: bytes) -> str:
+        """Fabric CA token: the registrar certificate and its signature over
+        method, URI, body and certificate"""
+        cert, key = self.identity()
+        b64cert = base64.b64encode(cert).decode("utf-8")
+        payload = ".".join(
+            [
+                method,
+                base64.b64encode(path.encode("utf-8")).decode("utf-8"),
+                base64.b64encode(body).decode("utf-8"),
+                b64cert,
+            ]
+        )
+
+        r, s = decode_dss_signature(
+            key.sign(payload.encode("utf-8"), ec.ECDSA(hashes.SHA256()))
+        )
+        if s > P256ORDER // 2:
+            s = P256ORDER - s
+        signature = encode_dss_signature(r, s)
+
+        return b64cert + "." + base64.b64encode(signature).decode("utf-8")
+
+    def register(
+        self,
+        enrollid: str,
+        secret: str,
+        idtype: str,
+        attrs: List[dict] = None,
+        affiliation: str = "",
+    ) -> str:
+        """Registers an identity and returns its secret. An identity that is
+        already registered is not an error, so builds can be re-run against a
+        live CA."""
+        body = {
+            "id": enrollid,
+            "type": idtype,
+            "secret": secret,
+            "affiliation": affiliation,
+            "attrs": attrs or [],
+        }
+        try:
+            with tracer.span("ca register", "ca", {"id": enrollid}):
+                return self.request("register", body)["secret"]
+        except CaError as e:
+            if any("already registered" in message for message in e.messages):
+                return secret
+            raise
+
+    def register_users(
+        self,
+        enrollids: List[str],
+        idtype: str = "client",
+        secretsuffix: str = "pw",
+        affiliation: str = "",
+    ) -> Dict[str, str]:
+        """Registers many identities over the pooled session, POOLSIZE at a
+        time, for load-test clients. Returns the secret of every identity;
+        each secret is the id followed by secretsuffix."""
+        self.identity()
+
+        def register(enrollid: str) -> str:
+            return self.register(
+                enrollid, enrollid + secretsuffix, idtype, affiliation=affiliation
+            )
+
+        with ThreadPoolExecutor(max_workers=self.POOLSIZE) as executor:
+            secrets = list(executor.map(register, enrollids))
+        return dict(zip(enrollids, secrets))
@@ -1,17 +1,38 @@
-import os
+import json
+import subprocess
+from typing import Dict, List
 
 from helpers.paths import Paths
+from helpers.runner import CommandError, Runner
 from models.chaincode import Chaincode
 from models.domain import Domain
 from models.orderer import Orderer
 from models.organization import Organization
 from models.peer import Peer
 
+runner = Runner()
+
 
 class Commands:
     def __init__(self) -> None:
         pass
 
+    def run(
+        self,
+        argv: List[str],
+        env: Dict[str, str] = None,
+        cwd: str = None,
+        check: bool = True,
+    ) -> subprocess.CompletedProcess:
+        """_summary_"""
+        return runner.run(argv, env, cwd, check)
+
+    def output(
+        self, argv: List[str], env: Dict[str, str] = None, cwd: str = None
+    ) -> str:
+        """_summary_"""
+        return runner.run(argv, env, cwd).stdout
+
     def enroll(
         self,
         apppath: str,
@@ -21,22 +42,22 @@ class Commands:
         port: int,
         certfile: str,
     ):
-        os.environ["FABRIC_CA_CLIENT_HOME"] = home
-        command = (
-            apppath
-            + "bin/fabric-ca-client enroll "
-            + "-u https://"
-            + user
-            + ":"
-            + passwd
-            + "@localhost:"
-            + str(port)
-            + " --csr.hosts localhost"
-            + " --tls.certfiles "
-            + certfile
-        )
+        command = [
+            apppath + "bin/fabric-ca-client",
+            "enroll",
+            "-u",
+            "https://" + user + ":" + passwd + "@localhost:" + str(port),
+            "--csr.hosts",
+            "localhost",
+            "--tls.certfiles",
+            certfile,
+            "-H",
+            home,
+            "-M",
+            "msp",
+        ]
         # print(command)
-        os.system(command)
+        self.run(command)
 
     def enroll_msp(
         self,
@@ -47,23 +68,22 @@ class Commands:
         port: int,
         certfile: str,
     ):
-        os.environ["FABRIC_CA_CLIENT_HOME"] = home
-        os.environ["FABRIC_CA_CLIENT_MSPDIR"] = "msp"
-        command = (
-            apppath
-            + "bin/fabric-ca-client enroll "
-            + "-u https://"
-            + user
-            + ":"
-            + passwd
-            + "@localhost:"
-            + str(port)
-            + " --csr.hosts localhost"
-            + " --tls.certfiles "
-            + certfile
-        )
+        command = [
+            apppath + "bin/fabric-ca-client",
+            "enroll",
+            "-u",
+            "https://" + user + ":" + passwd + "@localhost:" + str(port),
+            "--csr.hosts",
+            "localhost",
+            "--tls.certfiles",
+            certfile,
+            "-H",
+            home,
+            "-M",
+            "msp",
+        ]
         # print(command)
-        os.system(command)
+        self.run(command)
 
     def enroll_tls(
         self,
@@ -76,28 +96,28 @@ class Commands:
         myhost: str,
         certfile: str,
     ):
-        os.environ["FABRIC_CA_CLIENT_HOME"] = home
-        os.environ["FABRIC_CA_CLIENT_MSPDIR"] = "tls"
-        command = (
-            apppath
-            + "bin/fabric-ca-client enroll "
-            + "-u https://"
-            + user
-            + ":"
-            + passwd
-            + "@localhost:"
-            + str(port)
-            + " --enrollment.profile tls --csr.hosts "
-            + ",".join(csrhosts)
-            + " --myhost "
-            + myhost
-            + " --tls.certfiles "
-            + certfile
-        )
+        command = [
+            apppath + "bin/fabric-ca-client",
+            "enroll",
+            "-u",
+            "https://" + user + ":" + passwd + "@localhost:" + str(port),
+            "--enrollment.profile",
+            "tls",
+            "--csr.hosts",
+            ",".join(csrhosts),
+            "--myhost",
+            myhost,
+            "--tls.certfiles",
+            certfile,
+            "-H",
+            home,
+            "-M",
+            "tls",
+        ]
         # print(command)
-        os.system(command)
+        self.run(command)
 
-    def register_orderer(
+    def register(
         self,
         apppath: str,
         home: str,
@@ -105,23 +125,46 @@ class Commands:
         passwd: str,
         port: int,
         certfile: str,
+        idtype: str,
+        attrs: str = None,
     ):
-        os.environ["FABRIC_CA_CLIENT_HOME"] = home
-        command = (
-            apppath
-            + "bin/fabric-ca-client register "
-            + "-u https://localhost:"
-            + str(port)
-            + " --id.name "
-            + user
-            + " --id.secret "
-            + passwd
-            + " --id.type orderer "
-            + " --tls.certfiles "
-            + certfile
-        )
+        """Registers an identity. An identity that is already registered is
+        not an error, so builds can be re-run against a live CA."""
+        command = [
+            apppath + "bin/fabric-ca-client",
+            "register",
+            "-u",
+            "https://localhost:" + str(port),
+            "--id.name",
+            user,
+            "--id.secret",
+            passwd,
+            "--id.type",
+            idtype,
+            "--tls.certfiles",
+            certfile,
+            "-H",
+            home,
+            "-M",
+            "msp",
+        ]
+        if attrs:
+            command += ["--id.attrs", attrs]
         # print(command)
-        os.system(command)
+        result = self.run(command, check=False)
+        if result.returncode != 0 and "already registered" not in result.stderr:
+            raise CommandError(command, result.returncode, result.stdout, result.stderr)
+
+    def register_orderer(
+        self,
+        apppath: str,
+        home: str,
+        user: str,
+        passwd: str,
+        port: int,
+        certfile: str,
+    ):
+        self.register(apppath, home, user, passwd, port, certfile, "orderer")
 
     def register_orderer_admin(
         self,
@@ -132,23 +175,16 @@ class Commands:
         port: int,
         certfile: str,
     ):
-        os.environ["FABRIC_CA_CLIENT_HOME"] = home
-        command = (
-            apppath
-            + "bin/fabric-ca-client register "
-            + "-u https://localhost:"
-            + str(port)
-            + " --id.name "
-            + user
-            + " --id.secret "
-            + passwd
-            + " --id.type admin "
-            + " --tls.certfiles "
-            + certfile
-            + ' --id.attrs "hf.Registrar.Roles=client,hf.Registrar.Attributes=*,hf.Revoker=true,hf.GenCRL=true,admin=true:ecert,abac.init=true:ecert"'
+        self.register(
+            apppath,
+            home,
+            user,
+            passwd,
+            port,
+            certfile,
+            "admin",
+            "hf.Registrar.Roles=client,hf.Registrar.Attributes=*,hf.Revoker=true,hf.GenCRL=true,admin=true:ecert,abac.init=true:ecert",
         )
-        # print(command)
-        os.system(command)
 
     def register_admin(
         self,
@@ -160,22 +196,7 @@ class Commands:
         # caname: str,
         certfile: str,
     ):
-        os.environ["FABRIC_CA_CLIENT_HOME"] = home
-        command = (
-            apppath
-            + "bin/fabric-ca-client register "
-            + "-u https://localhost:"
-            + str(port)
-            + " --id.name "
-            + user
-            + " --id.secret "
-            + passwd
-            + " --id.type admin "
-            + " --tls.certfiles "
-            + certfile
-        )
-        # print(command)
-        os.system(command)
+        self.register(apppath, home, user, passwd, port, certfile, "admin")
 
     def register_peer(
         self,
@@ -186,22 +207,7 @@ class Commands:
         port: int,
         certfile: str,
     ):
-        os.environ["FABRIC_CA_CLIENT_HOME"] = home
-        command = (
-            apppath
-            + "bin/fabric-ca-client register "
-            + "-u https://localhost:"
-            + str(port)
-            + " --id.name "
-            + user
-            + " --id.secret "
-            + passwd
-            + " --id.type peer "
-            + " --tls.certfiles "
-            + certfile
-        )
-        # print(command)
-        os.system(command)
+        self.register(apppath, home, user, passwd, port, certfile, "peer")
 
     def register_client(
         self,
@@ -212,22 +218,7 @@ class Commands:
         port: int,
         certfile: str,
     ):
-        os.environ["FABRIC_CA_CLIENT_HOME"] = home
-        command = (
-            apppath
-            + "bin/fabric-ca-client register "
-            + "-u https://localhost:"
-            + str(port)
-            + " --id.name "
-            + user
-            + " --id.secret "
-            + passwd
-            + " --id.type client "
-            + " --tls.certfiles "
-            + certfile
-        )
-        # print(command)
-        os.system(command)
+        self.register(apppath, home, user, passwd, port, certfile, "client")
 
     def register_user(
         self,
@@ -238,51 +229,33 @@ class Commands:
         port: int,
         certfile: str,
     ):
-        os.environ["FABRIC_CA_CLIENT_HOME"] = home
-        command = (
-            apppath
-            + "bin/fabric-ca-client register "
-            + "-u https://localhost:"
-            + str(port)
-            + " --id.name "
-            + user
-            + " --id.secret "
-            + passwd
-            + " --id.type user "
-            + " --tls.certfiles "
-            + certfile
-        )
-        # print(command)
-        os.system(command)
+        self.register(apppath, home, user, passwd, port, certfile, "user")
 
     def configtxgen_config_path(
         self, apppath: str, configpath: str, block: str, channel: str
     ):
-        command = (
-            apppath
-            + "bin/configtxgen -configPath "
-            + configpath
-            + " -profile SampleAppChannelEtcdRaft -outputBlock "
-            + block
-            + " -channelID "
-            + channel
-        )
+        command = [
+            apppath + "bin/configtxgen",
+            "-configPath",
+            configpath,
+            "-profile",
+            "SampleAppChannelEtcdRaft",
+            "-outputBlock",
+            block,
+            "-channelID",
+            channel,
+        ]
         # print(command)
-        os.system(command)
+        self.run(command)
 
     def configtxgen_print_org(self, apppath: str, configtx: str, org: Organization):
-        os.environ["FABRIC_CFG_PATH"] = configtx
-        command = (
-            apppath
-            + "bin/configtxgen -printOrg "
-            + org.name
-            + "MSP > "
-            + configtx
-            + org.name
-            + ".json"
-        )
+        env = {"FABRIC_CFG_PATH": configtx}
+        command = [apppath + "bin/configtxgen", "-printOrg", org.name + "MSP"]
         # print(command)
-        os.system(command)
+        output = self.output(command, env)
+
+        with open(configtx + org.name + ".json", "w", encoding="utf-8") as f:
+            f.write(output)
 
     def osnadmin(
         self,
@@ -295,27 +268,54 @@ class Commands:
         tlscert: str,
         tlskey: str,
     ):
-        os.environ["FABRIC_CFG_PATH"] = configpath
-        os.environ["BLOCKFILE"] = block
+        env = {"FABRIC_CFG_PATH": configpath, "BLOCKFILE": block}
+
+        command = [
+            apppath + "bin/osnadmin",
+            "channel",
+            "join",
+            "--channelID",
+            channel,
+            "--config-block",
+            block,
+            "-o",
+            "localhost:" + str(orderer.adminlistenport),
+            "--ca-file",
+            caroot,
+            "--client-cert",
+            tlscert,
+            "--client-key",
+            tlskey,
+        ]
+        # print(command)
+        self.run(command, env)
 
-        command = (
-            apppath
-            + "bin/osnadmin channel join --channelID "
-            + channel
-            + " --config-block "
-            + block
-            + " -o localhost:"
-            + str(orderer.adminlistenport)
-            + " --ca-file '"
-            + caroot
-            + "' --client-cert '"
-            + tlscert
-            + "' --client-key '"
-            + tlskey
-            + "'"
-        )
+    def osnadmin_channel_list(
+        self,
+        apppath: str,
+        channel: str,
+        orderer: Orderer,
+        caroot: str,
+        tlscert: str,
+        tlskey: str,
+    ) -> str:
+        command = [
+            apppath + "bin/osnadmin",
+            "channel",
+            "list",
+            "--channelID",
+            channel,
+            "-o",
+            "localhost:" + str(orderer.adminlistenport),
+            "--ca-file",
+            caroot,
+            "--client-cert",
+            tlscert,
+            "--client-key",
+            tlskey,
+        ]
         # print(command)
-        os.system(command)
+        return self.output(command)
 
     def peer_channel_join(
         self,
@@ -327,171 +327,265 @@ class Commands:
         caroot: str,
         peermsp: str,
     ):
-        os.environ["BLOCKFILE"] = block
-        os.environ["FABRIC_CFG_PATH"] = configpath
-        os.environ["CORE_PEER_TLS_ENABLED"] = "true"
-        os.environ["CORE_PEER_LOCALMSPID"] = org.name + "MSP"
-        os.environ["CORE_PEER_TLS_ROOTCERT_FILE"] = caroot
-        os.environ["CORE_PEER_MSPCONFIGPATH"] = peermsp
-        os.environ["CORE_PEER_ADDRESS"] = "localhost:" + str(peer.peerlistenport)
-
-        command = apppath + "bin/peer channel join -b " + block
+        env = {
+            "BLOCKFILE": block,
+            "FABRIC_CFG_PATH": configpath,
+            "CORE_PEER_TLS_ENABLED": "true",
+            "CORE_PEER_LOCALMSPID": org.name + "MSP",
+            "CORE_PEER_TLS_ROOTCERT_FILE": caroot,
+            "CORE_PEER_MSPCONFIGPATH": peermsp,
+            "CORE_PEER_ADDRESS": "localhost:" + str(peer.peerlistenport),
+        }
+
+        command = [apppath + "bin/peer", "channel", "join", "-b", block]
         # print(command)
-        os.system(command)
+        self.run(command, env)
 
-    def peer_channel_signconfigtx(self, configtx: str, org: Organization):
-        command = (
-            "peer channel signconfigtx -f "
-            + configtx
-            + org.name
-            + "_update_in_envelope.pb"
-        )
-        # print(command)
-        os.system(command)
+    def peer_channel_getinfo(
+        self,
+        org: Organization,
+        peer: Peer,
+        apppath: str,
+        channel: str,
+        configpath: str,
+        caroot: str,
+        peermsp: str,
+    ) -> str:
+        env = self.peer_env(org, peer, configpath, caroot, peermsp)
 
-    def configtxlator_proto_decode(
-        self, apppath: str, configpath: str, file: str, update: bool = None
-    ):
-        commontype = "common.ConfigUpdate " if update else "common.Block "
-        command = (
-            apppath
-            + "bin/configtxlator proto_decode --input "
-            + configpath
-            + file
-            + ".pb --type "
-            + commontype
-            + "--output "
-            + configpath
-            + file
-            + ".json"
-        )
+        command = [apppath + "bin/peer", "channel", "getinfo", "-c", channel]
         # print(command)
-        os.system(command)
+        return self.output(command, env)
 
-    def configtxlator_proto_encode(
-        self, apppath: str, configpath: str, file: str, envelope: bool = None
-    ):
-        commontype = "common.Envelope" if envelope else "common.Config"
-        command = (
-            apppath
-            + "bin/configtxlator proto_encode --input "
-            + configpath
-            + file
-            + ".json --type "
-            + commontype
-            + " --output "
-            + configpath
-            + file
-            + ".pb"
-        )
-        # print(command)
-        os.system(command)
+    def peer_channel_list(
+        self,
+        org: Organization,
+        peer: Peer,
+        apppath: str,
+        configpath: str,
+        caroot: str,
+        peermsp: str,
+    ) -> str:
+        env = self.peer_env(org, peer, configpath, caroot, peermsp)
 
-    def configtxlator_compute_update(self, apppath: str, channel: str, configpath: str):
-        command = (
-            apppath
-            + "bin/configtxlator compute_update --channel_id "
-            + channel
-            + " --original "
-            + configpath
-            + "config.pb --updated "
-            + configpath
-            + "modified_config.pb --output "
-            + configpath
-            + "config_update.pb"
-        )
+        command = [apppath + "bin/peer", "channel", "list"]
         # print(command)
-        os.system(command)
+        return self.output(command, env)
 
-    def jq_export_config(self, configpath: str):
-        command = (
-            "jq .data.data[0].payload.data.config "
-            + configpath
-            + "config_block.json > "
-            + configpath
-            + "config.json"
-        )
+    def peer_env(
+        self,
+        org: Organization,
+        peer: Peer,
+        configpath: str,
+        caroot: str,
+        peermsp: str,
+    ) -> Dict[str, str]:
+        """Admin environment of the peer CLI for a peer reached from the host"""
+        return {
+            "FABRIC_CFG_PATH": configpath,
+            "CORE_PEER_TLS_ENABLED": "true",
+            "CORE_PEER_LOCALMSPID": org.name + "MSP",
+            "CORE_PEER_TLS_ROOTCERT_FILE": caroot,
+            "CORE_PEER_MSPCONFIGPATH": peermsp,
+            "CORE_PEER_ADDRESS": "localhost:" + str(peer.peerlistenport),
+        }
+
+    def peer_channel_joinbysnapshot(
+        self,
+        org: Organization,
+        peer: Peer,
+        apppath: str,
+        snapshotpath: str,
+        configpath: str,
+        caroot: str,
+        peermsp: str,
+    ):
+        env = self.peer_env(org, peer, configpath, caroot, peermsp)
+        command = [
+            apppath + "bin/peer",
+            "channel",
+            "joinbysnapshot",
+            "--snapshotpath",
+            snapshotpath,
+        ]
         # print(command)
-        os.system(command)
+        self.run(command, env)
 
-    def jq_export_modified_config(self, org: Organization, configpath: str):
-        command = (
-            'jq -s \'.[0] * {"channel_group":{"groups":{"Application":{"groups": {"'
-            + org.name
-            + "MSP\":.[1]}}}}}' "
-            + configpath
-            + "config.json "
-            + configpath
-            + org.name
-            + ".json > "
-            + configpath
-            + "modified_config.json"
-        )
+    def peer_snapshot_submitrequest(
+        self,
+        org: Organization,
+        peer: Peer,
+        apppath: str,
+        channel: str,
+        configpath: str,
+        caroot: str,
+        peermsp: str,
+    ):
+        env = self.peer_env(org, peer, configpath, caroot, peermsp)
+        command = [
+            apppath + "bin/peer",
+            "snapshot",
+            "submitrequest",
+            "-c",
+            channel,
+            "-b",
+            "0",
+            "--peerAddress",
+            env["CORE_PEER_ADDRESS"],
+            "--tlsRootCertFile",
+            caroot,
+        ]
         # print(command)
-        os.system(command)
+        self.run(command, env)
 
-    def echo_payload(
-        self, channel: str, confupdtfile: str, configpath: str, org: Organization
-    ):
-        command = (
-            'echo \'{"payload":{"header":{"channel_header":{"channel_id":"'
-            + channel
-            + '", "type":2}},"data":{"config_update":'
-            + confupdtfile
-            + "}}}' | jq . >"
-            + configpath
-            + org.name
-            + "_update_in_envelope.json"
-        )
+    def peer_snapshot_listpending(
+        self,
+        org: Organization,
+        peer: Peer,
+        apppath: str,
+        channel: str,
+        configpath: str,
+        caroot: str,
+        peermsp: str,
+    ) -> str:
+        env = self.peer_env(org, peer, configpath, caroot, peermsp)
+        command = [
+            apppath + "bin/peer",
+            "snapshot",
+            "listpending",
+            "-c",
+            channel,
+            "--peerAddress",
+            env["CORE_PEER_ADDRESS"],
+            "--tlsRootCertFile",
+            caroot,
+        ]
         # print(command)
-        os.system(command)
+        return self.output(command, env)
 
-    def peer_lifecycle_chaincode_calculatepackageid(
-        self, apppath: str, tarchaincode: str, buildpath: str
+    def peer_channel_signconfigtx(
+        self, configtx: str, org: Organization, env: Dict[str, str] = None
     ):
-        command = (
-            apppath
-            + "bin/peer lifecycle chaincode calculatepackageid "
-            + tarchaincode
-            + " > "
-            + buildpath
-            + "PACKAGEID.txt"
-        )
+        command = [
+            "peer",
+            "channel",
+            "signconfigtx",
+            "-f",
+            configtx + org.name + "_update_in_envelope.pb",
+        ]
         # print(command)
-        os.system(command)
+        self.run(command, env)
 
-    def peer_lifecycle_chaincode_install(self, apppath: str, chaincodepkg: str):
-        command = apppath + "bin/peer lifecycle chaincode install " + chaincodepkg
+    def peer_lifecycle_chaincode_install(
+        self, apppath: str, chaincodepkg: str, env: Dict[str, str] = None
+    ):
+        command = [
+            apppath + "bin/peer",
+            "lifecycle",
+            "chaincode",
+            "install",
+            chaincodepkg,
+        ]
         # print(command)
-        os.system(command)
+        self.run(command, env)
 
     def peer_lifecycle_chaincode_package(
-        self, apppath: str, chaincodepkg: str, chaincode: Chaincode
+        self,
+        apppath: str,
+        chaincodepkg: str,
+        chaincode: Chaincode,
+        env: Dict[str, str] = None,
+        cwd: str = None,
     ):
-        command = (
-            apppath
-            + "bin/peer lifecycle chaincode package "
-            + chaincode.name
-            + ".tar.gz"
-            + " --path "
-            + chaincodepkg
-            + " --lang golang --label "
-            + chaincode.name
-            + "_"
-            + str(chaincode.version)
-        )
-        os.system(command)
+        command = [
+            apppath + "bin/peer",
+            "lifecycle",
+            "chaincode",
+            "package",
+            chaincode.name + ".tar.gz",
+            "--path",
+            chaincodepkg,
+            "--lang",
+            "golang",
+            "--label",
+            chaincode.name + "_" + str(chaincode.version),
+        ]
+        self.run(command, env, cwd)
+
+    def peer_lifecycle_chaincode_queryinstalled(
+        self, apppath: str, packageid: str, env: Dict[str, str] = None
+    ) -> bool:
+        command = [
+            apppath + "bin/peer",
+            "lifecycle",
+            "chaincode",
+            "queryinstalled",
+            "--output",
+            "json",
+        ]
+        # print(command)
+        installed = json.loads(self.output(command, env) or "{}")
+        packageids = [
+            chaincode["package_id"]
+            for chaincode in installed.get("installed_chaincodes", [])
+            if chaincode["package_id"].startswith(packageid)
+        ]
+        return len(packageids) > 0
+
+    def peer_lifecycle_chaincode_queryapproved(
+        self,
+        apppath: str,
+        channel: str,
+        chaincodename: str,
+        chaincodeversion: int,
+        env: Dict[str, str] = None,
+    ) -> dict:
+        """Approved definition of the peer's org, empty when not approved"""
+        command = [
+            apppath + "bin/peer",
+            "lifecycle",
+            "chaincode",
+            "queryapproved",
+            "--channelID",
+            channel,
+            "--name",
+            chaincodename,
+            "--sequence",
+            str(chaincodeversion),
+            "--output",
+            "json",
+        ]
+        # print(command)
+        result = self.run(command, env, check=False)
+        if result.returncode != 0:
+            return {}
+        return json.loads(result.stdout or "{}")
 
-    def peer_lifecycle_chaincode_queryinstalled(self, apppath: str, packageid: str):
-        command = (
-            apppath
-            + "bin/peer lifecycle chaincode queryinstalled --output json "
-            + "| jq -r 'try (.installed_chaincodes[].package_id)'"
-            + "| grep ^"
-            + packageid
-        )
+    def peer_lifecycle_chaincode_querycommitted(
+        self,
+        apppath: str,
+        channel: str,
+        chaincodename: str,
+        env: Dict[str, str] = None,
+    ) -> dict:
+        """Committed definition on the channel, empty when not committed"""
+        command = [
+            apppath + "bin/peer",
+            "lifecycle",
+            "chaincode",
+            "querycommitted",
+            "--channelID",
+            channel,
+            "--name",
+            chaincodename,
+            "--output",
+            "json",
+        ]
         # print(command)
-        os.system(command)
+        result = self.run(command, env, check=False)
+        if result.returncode != 0:
+            return {}
+        return json.loads(result.stdout or "{}")
 
     def peer_lifecycle_chaincode_approveformyorg(
         self,
@@ -504,32 +598,35 @@ class Commands:
         chaincodename: str,
         chaincodeversion: int,
         packageid: str,
+        env: Dict[str, str] = None,
     ):
-        initrequired = ""
+        command = [
+            apppath + "bin/peer",
+            "lifecycle",
+            "chaincode",
+            "approveformyorg",
+            "-o",
+            "localhost:" + str(orderer.generallistenport),
+            "--ordererTLSHostnameOverride",
+            orderername,
+            "--tls",
+            "--cafile",
+            cafile,
+            "--channelID",
+            channel,
+            "--name",
+            chaincodename,
+            "--version",
+            str(chaincodeversion),
+            "--package-id",
+            packageid,
+            "--sequence",
+            str(chaincodeversion),
+        ]
         if invoke:
-            initrequired = " --init-required"
-        command = (
-            apppath
-            + "bin/peer lifecycle chaincode approveformyorg -o localhost:"
-            + str(orderer.generallistenport)
-            + " --ordererTLSHostnameOverride "
-            + orderername
-            + " --tls --cafile "
-            + cafile
-            + " --channelID "
-            + channel
-            + " --name "
-            + chaincodename
-            + " --version "
-            + str(chaincodeversion)
-            + " --package-id "
-            + packageid
-            + " --sequence "
-            + str(chaincodeversion)
-            + initrequired
-        )
+            command.append("--init-required")
         # print(command)
-        os.system(command)
+        self.run(command, env)
 
     def peer_lifecycle_chaincode_checkcommitreadiness(
         self,
@@ -541,31 +638,47 @@ class Commands:
         channel: str,
         chaincodename: str,
         chaincodeversion: int,
-    ):
-        initrequired = ""
+        env: Dict[str, str] = None,
+    ) -> str:
+        command = [
+            apppath + "bin/peer",
+            "lifecycle",
+            "chaincode",
+            "checkcommitreadiness",
+            "-o",
+            orderername + ":" + str(orderer.generallistenport),
+            "--tls",
+            "--cafile",
+            cafile,
+            "--channelID",
+            channel,
+            "--name",
+            chaincodename,
+            "--version",
+            str(chaincodeversion),
+            "--sequence",
+            str(chaincodeversion),
+            "--output",
+            "json",
+        ]
         if invoke:
-            initrequired = " --init-required"
-        command = (
-            apppath
-            + "bin/peer lifecycle chaincode checkcommitreadiness -o "
-            + orderername
-            + ":"
-            + str(orderer.generallistenport)
-            + " --tls --cafile "
-            + cafile
-            + " --channelID "
-            + channel
-            + " --name "
-            + chaincodename
-            + " --version "
-            + str(chaincodeversion)
-            + " --sequence "
-            + str(chaincodeversion)
-            + " --output json"
-            + initrequired
-        )
+            command.append("--init-required")
         # print(command)
-        os.system(command)
+        return self.output(command, env)
+
+    def peer_addresses(self, domain: Domain) -> List[str]:
+        """Returns the --peerAddresses/--tlsRootCertFiles pairs of every peer"""
+        paths = Paths(domain)
+        peeraddress = []
+        for org in domain.organizations:
+            for peer in org.peers:
+                peeraddress += [
+                    "--peerAddresses",
+                    "localhost:" + str(peer.peerlistenport),
+                    "--tlsRootCertFiles",
+                    paths.peer(org, peer).PEERCAROOT,
+                ]
+        return peeraddress
 
     def peer_lifecycle_chaincode_commit(
         self,
@@ -578,44 +691,38 @@ class Commands:
         chaincodename: str,
         domain: Domain,
         chaincodeversion: int,
+        env: Dict[str, str] = None,
     ):
-        paths = Paths(domain)
-        peeraddress = ""
-        for org in domain.organizations:
-            paths.set_org_paths(org)
-            for peer in org.peers:
-                paths.set_peer_paths(org, peer)
-                peeraddress += (
-                    " --peerAddresses localhost:"
-                    + str(peer.peerlistenport)
-                    + " --tlsRootCertFiles "
-                    + paths.PEERCAROOT
-                )
-
-        initrequired = ""
-        if invoke:
-            initrequired = " --init-required"
         command = (
-            apppath
-            + "bin/peer lifecycle chaincode commit -o localhost:"
-            + str(orderer.generallistenport)
-            + " --ordererTLSHostnameOverride "
-            + orderername
-            + " --tls --cafile "
-            + cafile
-            + " --channelID "
-            + channel
-            + " --name "
-            + chaincodename
-            + peeraddress
-            + " --version "
-            + str(chaincodeversion)
-            + " --sequence "
-            + str(chaincodeversion)
-            + initrequired
+            [
+                apppath + "bin/peer",
+                "lifecycle",
+                "chaincode",
+                "commit",
+                "-o",
+                "localhost:" + str(orderer.generallistenport),
+                "--ordererTLSHostnameOverride",
+                orderername,
+                "--tls",
+                "--cafile",
+                cafile,
+                "--channelID",
+                channel,
+                "--name",
+                chaincodename,
+            ]
+            + self.peer_addresses(domain)
+            + [
+                "--version",
+                str(chaincodeversion),
+                "--sequence",
+                str(chaincodeversion),
+            ]
         )
+        if invoke:
+            command.append("--init-required")
         # print(command)
-        os.system(command)
+        self.run(command, env)
 
     def peer_chaincode_invoke(
         self,
@@ -627,41 +734,32 @@ class Commands:
         channel: str,
         chaincodename: str,
         domain: Domain,
+        env: Dict[str, str] = None,
     ):
-        paths = Paths(domain)
-        peeraddress = ""
-        for org in domain.organizations:
-            paths.set_org_paths(org)
-            for peer in org.peers:
-                paths.set_peer_paths(org, peer)
-                peeraddress += (
-                    " --peerAddresses localhost:"
-                    + str(peer.peerlistenport)
-                    + " --tlsRootCertFiles "
-                    + paths.PEERCAROOT
-                )
-
-        fcncall = '{"function":"","Args":[]}'
-        initrequired = " -c " + "'" + fcncall + "'"
+        initrequired = ["-c", '{"function":"","Args":[]}']
 
         if invoke:
-            fcncall = '{"function":"InitLedger","Args":[]}'
-            initrequired = " --isInit -c " + "'" + fcncall + "'"
+            initrequired = ["--isInit", "-c", '{"function":"InitLedger","Args":[]}']
 
         command = (
-            apppath
-            + "/bin/peer chaincode invoke -o localhost:"
-            + str(orderer.generallistenport)
-            + " --ordererTLSHostnameOverride "
-            + orderername
-            + " --tls --cafile "
-            + cafile
-            + " --channelID "
-            + channel
-            + " --name "
-            + chaincodename
-            + peeraddress
+            [
+                apppath + "bin/peer",
+                "chaincode",
+                "invoke",
+                "-o",
+                "localhost:" + str(orderer.generallistenport),
+                "--ordererTLSHostnameOverride",
+                orderername,
+                "--tls",
+                "--cafile",
+                cafile,
+                "--channelID",
+                channel,
+                "--name",
+                chaincodename,
+            ]
+            + self.peer_addresses(domain)
             + initrequired
         )
         # print(command)
-        os.system(command)
+        self.run(command, env)
@@ -0,0 +1,181 @@
+import atexit
+import copy
+import json
+import socket
+import subprocess
+import threading
+from typing import Dict, List
+
+import requests
+from rich.console import Console
+
+from helpers.paths import Paths
+from helpers.readiness import Readiness
+from models.domain import Domain
+
+console = Console()
+
+
+class Configtxlator:
+    """In-memory channel config update engine.
+
+    Decoding, patching, diffing and envelope encoding go through a single
+    long-lived `configtxlator start` REST server, shared by every instance and
+    stopped when the process exits. Nothing is written to disk in between."""
+
+    HOST = "127.0.0.1"
+    REQUESTTIMEOUT = 30.0
+
+    process: subprocess.Popen = None
+    url: str = None
+    lock = threading.Lock()
+
+    def __init__(self, domain: Domain) -> None:
+        self.domain: Domain = domain
+        self.paths = Paths(domain)
+        self.readiness = Readiness(domain)
+        self.session = requests.Session()
+
+    def start(self) -> str:
+        """Starts the REST server once and returns its base URL"""
+        with Configtxlator.lock:
+            if Configtxlator.process and Configtxlator.process.poll() is None:
+                return Configtxlator.url
+
+            with socket.socket() as sock:
+                sock.bind((self.HOST, 0))
+                port = sock.getsockname()[1]
+
+            Configtxlator.process = subprocess.Popen(
+                [
+                    self.paths.APPPATH + "bin/configtxlator",
+                    "start",
+                    "--hostname",
+                    self.HOST,
+                    "--port",
+                    str(port),
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            Configtxlator.url = "http://" + self.HOST + ":" + str(port)
+            atexit.register(Configtxlator.stop)
+
+            def probe() -> bool:
+                with socket.create_connection((self.HOST, port), timeout=1):
+                    return True
+
+            if not self.readiness.poll("configtxlator", probe, 30):
+                raise RuntimeError("configtxlator server did not start")
+
+            return Configtxlator.url
+
+    @staticmethod
+    def stop():
+        """_summary_"""
+        if Configtxlator.process and Configtxlator.process.poll() is None:
+            Configtxlator.process.terminate()
+            Configtxlator.process.wait()
+
+    def decode(self, msgtype: str, data: bytes) -> dict:
+        """_summary_"""
+        response = self.session.post(
+            self.start() + "/protolator/decode/" + msgtype,
+            data=data,
+            timeout=self.REQUESTTIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def encode(self, msgtype: str, data: dict) -> bytes:
+        """_summary_"""
+        response = self.session.post(
+            self.start() + "/protolator/encode/" + msgtype,
+            data=json.dumps(data).encode("utf-8"),
+            timeout=self.REQUESTTIMEOUT,
+        )
+        response.raise_for_status()
+        return response.content
+
+    def compute_update(self, channel: str, original: bytes, updated: bytes) -> bytes:
+        """_summary_"""
+        response = self.session.post(
+            self.start() + "/configtxlator/compute/update-from-configs",
+            data={"channel": channel},
+            files={"original": original, "updated": updated},
+            timeout=self.REQUESTTIMEOUT,
+        )
+        response.raise_for_status()
+        return response.content
+
+    def org_update_envelope(
+        self, channel: str, block: bytes, orgmsp: str, orgdefinition: dict
+    ) -> bytes:
+        """Builds the config update envelope adding an org to the application
+        groups of the channel, starting from the current config block"""
+        return self.orgs_update_envelope(channel, block, {orgmsp: orgdefinition})
+
+    def orgs_update_envelope(
+        self, channel: str, block: bytes, orgdefinitions: Dict[str, dict]
+    ) -> bytes:
+        """Same as org_update_envelope for several orgs, keyed by MSP ID, so
+        they are added by a single config transaction"""
+        config = self.block_config(block)
+
+        modified = copy.deepcopy(config)
+        modified["channel_group"]["groups"]["Application"]["groups"].update(
+            orgdefinitions
+        )
+
+        update = self.compute_update(
+            channel,
+            self.encode("common.Config", config),
+            self.encode("common.Config", modified),
+        )
+
+        envelope = {
+            "payload": {
+                "header": {"channel_header": {"channel_id": channel, "type": 2}},
+                "data": {"config_update": self.decode("common.ConfigUpdate", update)},
+            }
+        }
+
+        return self.encode("common.Envelope", envelope)
+
+    def block_config(self, block: bytes) -> dict:
+        """Channel config carried by a config block"""
+        return self.decode("common.Block", block)["data"]["data"][0]["payload"]["data"][
+            "config"
+        ]
+
+    def admins_quorum(self, block: bytes) -> int:
+        """Number of org admin signatures the Application Admins policy of the
+        channel requires to modify the application orgs"""
+        application = self.block_config(block)["channel_group"]["groups"]["Application"]
+        orgs = len(application["groups"])
+        policy = application["policies"]["Admins"]["policy"]
+
+        # only implicit meta policies (type 3) are counted, any other
+        # policy is assumed to need every org
+        if policy["type"] != 3:
+            return orgs
+        rule = policy["value"]["rule"]
+        if rule == "ANY":
+            return min(1, orgs)
+        if rule == "ALL":
+            return orgs
+        return orgs // 2 + 1
+
+    def merge_signatures(self, envelope: bytes, signed: List[bytes]) -> bytes:
+        """Adds the signatures of separately signed copies of a config update
+        envelope to the envelope"""
+        merged = self.decode("common.Envelope", envelope)
+        signatures = merged["payload"]["data"].setdefault("signatures", [])
+        for data in signed:
+            for signature in self.decode("common.Envelope", data)["payload"][
+                "data"
+            ].get("signatures", []):
+                if signature not in signatures:
+                    signatures.append(signature)
+
+        return self.encode("common.Envelope", merged)
@@ -0,0 +1,377 @@
+import datetime
+import hashlib
+import ipaddress
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+
+from helpers.cryptostore import CryptoStore
+from helpers.paths import Paths
+from helpers.tracing import tracer
+from models.ca import Ca
+from models.chaincode import Chaincode
+from models.domain import Domain
+from models.organization import Organization
+from models.peer import Peer
+
+VALIDITY = datetime.timedelta(days=3650)
+
+
+def ski(key: ec.EllipticCurvePublicKey) -> bytes:
+    """Fabric subject key identifier: SHA-256 of the uncompressed point. It
+    also names the key files, as the Fabric keystore looks keys up by it"""
+    return hashlib.sha256(
+        key.public_bytes(
+            serialization.Encoding.X962,
+            serialization.PublicFormat.UncompressedPoint,
+        )
+    ).digest()
+
+
+def subject(cn: str, ou: str = None) -> x509.Name:
+    """Subject with the same names the Fabric CA puts in its certificates"""
+    names = [
+        x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
+        x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, "North Carolina"),
+        x509.NameAttribute(NameOID.ORGANIZATION_NAME, "Hyperledger"),
+        x509.NameAttribute(NameOID.ORGANIZATIONAL_UNIT_NAME, ou or "Fabric"),
+        x509.NameAttribute(NameOID.COMMON_NAME, cn),
+    ]
+    return x509.Name(names)
+
+
+def san(hosts: List[str]) -> x509.SubjectAlternativeName:
+    """_summary_"""
+    names = []
+    for host in hosts:
+        try:
+            names.append(x509.IPAddress(ipaddress.ip_address(host)))
+        except ValueError:
+            names.append(x509.DNSName(host))
+    return x509.SubjectAlternativeName(names)
+
+
+def key_pem(key: ec.EllipticCurvePrivateKey) -> bytes:
+    """_summary_"""
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+def cert_pem(cert: x509.Certificate) -> bytes:
+    """_summary_"""
+    return cert.public_bytes(serialization.Encoding.PEM)
+
+
+def issue(request: tuple) -> Tuple[bytes, bytes]:
+    """Generates a P-256 key and its certificate signed by the given CA.
+
+    request is (CA cert PEM, CA key PEM, CN, OU, hosts, tls); it only holds
+    plain values so it can be sent to a worker process. Returns the PEM
+    certificate and key."""
+    cacertpem, cakeypem, cn, ou, hosts, tls = request
+    cacert = x509.load_pem_x509_certificate(cacertpem)
+    cakey = serialization.load_pem_private_key(cakeypem, None)
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    now = datetime.datetime.now(datetime.timezone.utc)
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(subject(cn, ou))
+        .issuer_name(cacert.subject)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(
+            min(
+                now + VALIDITY,
+                cacert.not_valid_after.replace(tzinfo=datetime.timezone.utc),
+            )
+        )
+        .add_extension(x509.BasicConstraints(ca=False, path_length=None), True)
+        .add_extension(
+            x509.KeyUsage(
+                digital_signature=True,
+                content_commitment=False,
+                key_encipherment=tls,
+                data_encipherment=False,
+                key_agreement=tls,
+                key_cert_sign=False,
+                crl_sign=False,
+                encipher_only=False,
+                decipher_only=False,
+            ),
+            True,
+        )
+        .add_extension(x509.SubjectKeyIdentifier(ski(key.public_key())), False)
+        .add_extension(
+            x509.AuthorityKeyIdentifier(ski(cakey.public_key()), None, None),
+            False,
+        )
+    )
+    if tls:
+        builder = builder.add_extension(
+            x509.ExtendedKeyUsage(
+                [ExtendedKeyUsageOID.SERVER_AUTH, ExtendedKeyUsageOID.CLIENT_AUTH]
+            ),
+            False,
+        )
+    if hosts:
+        builder = builder.add_extension(san(hosts), False)
+
+    cert = builder.sign(cakey, hashes.SHA256())
+    return cert_pem(cert), key_pem(key)
+
+
+class Cryptogen:
+    """Offline crypto material generator.
+
+    Writes the files the Fabric CA enrollments of Build would write: the CA
+    certificates in fabricca/<ca>/crypto and, for every identity, an msp or
+    tls folder with signcerts, keystore and cacerts/tlscacerts named after
+    the CA port. Keys and certificates are made in a process pool, so no CA
+    container has to run. CA keys are kept in crypto/msp/keystore, where
+    fabric-ca-server finds them, so the CAs can still be started later."""
+
+    def __init__(self, domain: Domain) -> None:
+        self.domain: Domain = domain
+        self.paths = Paths(domain)
+        self.store = CryptoStore(self.paths.CRYPTOSTOREPATH)
+        self.cas: Dict[str, Tuple[bytes, bytes]] = {}
+        self.requests: List[tuple] = []
+        self.targets: List[Tuple[str, str, Ca]] = []
+
+    def ca(self, ca: Ca) -> Tuple[bytes, bytes]:
+        """Certificate and key of a CA, read from its crypto folder or
+        created there with its server TLS certificate"""
+        if ca.name in self.cas:
+            return self.cas[ca.name]
+
+        cryptopath = self.paths.FABRICCAPATH + ca.name + "/crypto/"
+        keystore = cryptopath + "msp/keystore/"
+        cafile = cryptopath + "ca-cert.pem"
+
+        if os.path.isfile(cafile):
+            cacertpem = Path(cafile).read_bytes()
+            cacert = x509.load_pem_x509_certificate(cacertpem)
+            keyfile = Path(keystore + ski(cacert.public_key()).hex() + "_sk")
+            self.cas[ca.name] = (cacertpem, keyfile.read_bytes())
+            return self.cas[ca.name]
+
+        cn = ca.name + "." + self.domain.name
+        key = ec.generate_private_key(ec.SECP256R1())
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(subject(cn))
+            .issuer_name(subject(cn))
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(minutes=5))
+            .not_valid_after(now + VALIDITY)
+            .add_extension(x509.BasicConstraints(ca=True, path_length=1), True)
+            .add_extension(
+                x509.KeyUsage(
+                    digital_signature=False,
+                    content_commitment=False,
+                    key_encipherment=False,
+                    data_encipherment=False,
+                    key_agreement=False,
+                    key_cert_sign=True,
+                    crl_sign=True,
+                    encipher_only=False,
+                    decipher_only=False,
+                ),
+                True,
+            )
+            .add_extension(x509.SubjectKeyIdentifier(ski(key.public_key())), False)
+            .sign(key, hashes.SHA256())
+        )
+        self.cas[ca.name] = (cert_pem(cert), key_pem(key))
+
+        # Its own CN, as a subject equal to the issuer reads as self-signed
+        tlscertpem, tlskeypem = issue(
+            self.cas[ca.name] + (ca.name, None, [cn, ca.name, "localhost"], True)
+        )
+
+        Path(keystore).mkdir(parents=True, exist_ok=True)
+        self.write(keystore + ski(key.public_key()).hex() + "_sk", key_pem(key))
+        self.write(cafile, cert_pem(cert))
+        self.write(self.keyfile(keystore, tlscertpem), tlskeypem)
+        self.write(cryptopath + "tls-cert.pem", tlscertpem)
+
+        return self.cas[ca.name]
+
+    def add(self, home: str, folder: str, ca: Ca, cn: str, ou: str, hosts: List[str]):
+        """Queues an identity of home, issued by ca. folder is msp or tls, as
+        for fabric-ca-client -M"""
+        self.requests.append(self.ca(ca) + (cn, ou, hosts, folder == "tls"))
+        self.targets.append((home, folder, ca))
+
+    def add_orderer(self):
+        """_summary_"""
+        paths = self.paths
+        domain = self.domain
+        ordererhost = domain.orderer.name + "." + domain.name
+
+        self.add(
+            paths.CACLIENTDOMAINPATH, "msp", domain.ca, "admin", "admin", ["localhost"]
+        )
+        self.add(
+            paths.CAORDERERCACLIENTPATH,
+            "msp",
+            domain.caorderer,
+            "admin",
+            "admin",
+            ["localhost"],
+        )
+        self.add(
+            paths.ORDERERORGADMINPATH,
+            "msp",
+            domain.caorderer,
+            "admin",
+            "admin",
+            ["localhost"],
+        )
+        self.add(
+            paths.ORDERERORGADMINPATH,
+            "tls",
+            domain.caorderer,
+            "admin",
+            None,
+            ["localhost"],
+        )
+        self.add(
+            paths.ORDDOMAINPATH,
+            "msp",
+            domain.caorderer,
+            "orderer",
+            "orderer",
+            ["localhost"],
+        )
+        self.add(
+            paths.ORDDOMAINPATH,
+            "tls",
+            domain.ca,
+            ordererhost,
+            None,
+            [ordererhost, domain.orderer.name, "localhost"],
+        )
+
+    def add_org(self, org: Organization):
+        """_summary_"""
+        orgpaths = self.paths.org(org)
+
+        self.add(
+            orgpaths.CAORGCACLIENTPATH, "msp", org.ca, "admin", "admin", ["localhost"]
+        )
+        for home in (orgpaths.ORGCACLIENTPATH, orgpaths.ORGPATH):
+            self.add(home, "msp", org.ca, "admin", "admin", ["localhost"])
+            self.add(home, "tls", org.ca, "admin", None, ["localhost"])
+
+    def add_peer(self, org: Organization, peer: Peer):
+        """_summary_"""
+        peerpaths = self.paths.peer(org, peer)
+        peerhost = peer.name + "." + self.domain.name
+
+        self.add(
+            peerpaths.PEERPATH,
+            "msp",
+            org.ca,
+            peer.name.replace(".", ""),
+            "peer",
+            ["localhost"],
+        )
+        self.add(
+            peerpaths.PEERPATH,
+            "tls",
+            self.domain.ca,
+            peerhost,
+            None,
+            [peerhost, peer.name, "localhost"],
+        )
+
+    def add_chaincode(self, org: Organization, peer: Peer, chaincode: Chaincode):
+        """Identities of the CCAAS container of chaincode next to peer, as
+        ChaincodeDeploy.chaincode_crypto enrolls them"""
+        ccpaths = self.paths.chaincode(org, peer, chaincode)
+        home = self.paths.peer(org, peer).PEERPATH + chaincode.name + "/"
+
+        self.add(home, "msp", org.ca, chaincode.name, "peer", ["localhost"])
+        self.add(
+            home,
+            "tls",
+            self.domain.ca,
+            ccpaths.CCNAME,
+            None,
+            [ccpaths.CCNAME, ccpaths.CCSMALLNAME, "localhost"],
+        )
+
+    @tracer.phase()
+    def generate(
+        self,
+        orgs: List[Organization],
+        peers: List[Tuple[Organization, Peer]],
+        orderer: bool = False,
+    ) -> int:
+        """Issues the orderer (when asked), organization and peer identities
+        and writes them. Returns the number of certificates issued"""
+        if orderer:
+            self.add_orderer()
+        for org in orgs:
+            self.add_org(org)
+        for org, peer in peers:
+            self.add_peer(org, peer)
+
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            issued = list(
+                executor.map(
+                    issue,
+                    self.requests,
+                    chunksize=max(1, len(self.requests) // (4 * os.cpu_count())),
+                )
+            )
+
+        for (home, folder, ca), (certpem, keypem) in zip(self.targets, issued):
+            self.write_identity(home, folder, ca, certpem, keypem)
+
+        count = len(issued)
+        self.requests, self.targets = [], []
+        return count
+
+    def write_identity(
+        self, home: str, folder: str, ca: Ca, certpem: bytes, keypem: bytes
+    ):
+        """Same files and names as fabric-ca-client enroll -H home -M folder"""
+        path = home + folder + "/"
+        cafolder = "tlscacerts/tls-" if folder == "tls" else "cacerts/"
+        for subfolder in ("signcerts/", "keystore/", cafolder.split("/")[0] + "/"):
+            Path(path + subfolder).mkdir(parents=True, exist_ok=True)
+
+        # Layouts copy the only key of the keystore to key.pem, drop old ones
+        for file_name in os.listdir(path + "keystore/"):
+            os.remove(path + "keystore/" + file_name)
+
+        self.write(path + "signcerts/cert.pem", certpem)
+        self.write(self.keyfile(path + "keystore/", certpem), keypem)
+        self.write(
+            path + cafolder + "localhost-" + str(ca.serverport) + ".pem",
+            self.cas[ca.name][0],
+        )
+
+    def keyfile(self, keystore: str, certpem: bytes) -> str:
+        """_summary_"""
+        cert = x509.load_pem_x509_certificate(certpem)
+        return keystore + ski(cert.public_key()).hex() + "_sk"
+
+    def write(self, path: str, data: bytes):
+        """Replaces path, which may be linked to a crypto store object"""
+        self.store.write(path, data)
@@ -0,0 +1,101 @@
+import errno
+import fcntl
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from helpers.digest import Digest
+
+digest = Digest()
+
+
+class CryptoStore:
+    """Content-addressed store of crypto files.
+
+    Certificates, keys and config.yaml files are copied to many MSP and TLS
+    folders. Each content is stored once under its SHA-256 and every copy is
+    materialized as a hard link to the stored object, or as a reflink when
+    hard links are not possible, so N copies cost one inode and one set of
+    blocks. Stored objects are read-only, but root ignores the mode, so files
+    are never changed in place: copy() and write() replace them. Rebuilding a
+    copy that already links to the right object does nothing."""
+
+    # ioctl number of FICLONE, shares the extents of a file (btrfs, xfs)
+    FICLONE = 0x40049409
+
+    def __init__(self, storepath: str) -> None:
+        self.storepath: str = storepath
+        self.lock = threading.Lock()
+        self.stats = {"linked": 0, "cloned": 0, "copied": 0, "kept": 0}
+
+    def put(self, src: str) -> str:
+        """Stores the content of src and returns the path of its object"""
+        sha = digest.file(src)
+        objpath = self.storepath + sha[:2] + "/" + sha
+        if os.path.isfile(objpath):
+            return objpath
+
+        Path(self.storepath + sha[:2]).mkdir(parents=True, exist_ok=True)
+        tmppath = objpath + "." + str(threading.get_ident()) + ".tmp"
+        shutil.copyfile(src, tmppath)
+        os.chmod(tmppath, os.stat(src).st_mode & 0o555)
+        os.replace(tmppath, objpath)
+        return objpath
+
+    def copy(self, src: str, dst: str) -> str:
+        """Drop-in for shutil.copy: materializes the content of src at dst,
+        or at dst/<name of src> when dst is a folder. Returns the path
+        written."""
+        if os.path.isdir(dst):
+            dst = os.path.join(dst, os.path.basename(src))
+
+        objpath = self.put(src)
+        if os.path.exists(dst) and os.path.samefile(objpath, dst):
+            self.count("kept")
+            return dst
+
+        tmppath = dst + "." + str(threading.get_ident()) + ".tmp"
+        self.count(self.materialize(objpath, tmppath))
+        os.replace(tmppath, dst)
+        return dst
+
+    def write(self, path: str, data: bytes) -> str:
+        """Writes data to path through a new file. A path linked to a stored
+        object is replaced, never changed in place, as every other copy of
+        the object shares its inode."""
+        tmppath = path + "." + str(threading.get_ident()) + ".tmp"
+        with open(tmppath, "wb") as tmpfile:
+            tmpfile.write(data)
+        os.replace(tmppath, path)
+        return path
+
+    def copytree(self, src: str, dst: str) -> str:
+        """Drop-in for shutil.copytree, every file goes through the store and
+        an existing dst is updated instead of failing"""
+        return shutil.copytree(src, dst, copy_function=self.copy, dirs_exist_ok=True)
+
+    def materialize(self, objpath: str, dst: str) -> str:
+        """Hard link, else reflink, else plain copy of objpath at dst.
+        Returns which one was made"""
+        try:
+            os.link(objpath, dst)
+            return "linked"
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EMLINK, errno.EPERM, errno.ENOTSUP):
+                raise
+
+        with open(objpath, "rb") as srcfile, open(dst, "wb") as dstfile:
+            try:
+                fcntl.ioctl(dstfile.fileno(), self.FICLONE, srcfile.fileno())
+                kind = "cloned"
+            except OSError:
+                shutil.copyfileobj(srcfile, dstfile)
+                kind = "copied"
+        shutil.copymode(objpath, dst)
+        return kind
+
+    def count(self, kind: str):
+        """_summary_"""
+        with self.lock:
+            self.stats[kind] += 1
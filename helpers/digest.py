@@ -0,0 +1,37 @@
+import hashlib
+import os
+from typing import Dict
+
+
+class Digest:
+    """SHA-256 content hashes of files and directory trees"""
+
+    BLOCKSIZE = 1024 * 1024
+
+    def __init__(self) -> None:
+        pass
+
+    def file(self, path: str) -> str:
+        """_summary_"""
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(self.BLOCKSIZE), b""):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def tree(self, path: str, extra: Dict[str, str] = None) -> str:
+        """Hash of every file path and content under path, walked in sorted
+        order, plus any extra key/values that also affect the result"""
+        sha = hashlib.sha256()
+
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                filepath = os.path.join(root, name)
+                sha.update(os.path.relpath(filepath, path).encode("utf-8") + b"\0")
+                sha.update(self.file(filepath).encode("utf-8") + b"\0")
+
+        for key in sorted(extra or {}):
+            sha.update((key + "=" + str(extra[key])).encode("utf-8") + b"\0")
+
+        return sha.hexdigest()
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+from collections.abc import Set
+from typing import Any, Dict, List
+
+
+def serialize(value: Any) -> Any:
+    """JSON form of the values json does not know: sets, also as loaded from
+    YAML, and models"""
+    if isinstance(value, Set):
+        return sorted(value)
+    if hasattr(value, "__dict__"):
+        return value.__dict__
+    return str(value)
+
+
+class Manifest:
+    """Input digests of the generated artifacts of a network.
+
+    Every artifact (an identity, a compose service, setup.json) is recorded
+    with the SHA-256 of the inputs that determine it. An artifact has to be
+    rebuilt when that digest changes or one of its files is missing. An
+    artifact without a record, built before the manifest existed or by the
+    wizard menus, is adopted as it is when its files exist."""
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.artifacts: Dict[str, str] = {}
+        self.current: Dict[str, str] = {}
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as manifest_file:
+                self.artifacts = json.load(manifest_file)
+
+    def digest(self, inputs: Any) -> str:
+        """_summary_"""
+        return hashlib.sha256(
+            json.dumps(inputs, sort_keys=True, default=serialize).encode("utf-8")
+        ).hexdigest()
+
+    def changed(
+        self, name: str, inputs: Any, files: List[str] = None, adopt: Any = None
+    ) -> bool:
+        """True when artifact name has to be rebuilt. Without a record, adopt
+        (the inputs read back from disk) or, by default, the inputs
+        themselves stand for the recorded state when the files exist."""
+        digest = self.digest(inputs)
+        self.current[name] = digest
+
+        if not all(os.path.exists(path) for path in files or []):
+            return True
+        if name not in self.artifacts:
+            return adopt is not None and self.digest(adopt) != digest
+        return self.artifacts[name] != digest
+
+    def save(self):
+        """Records the digests checked in this build"""
+        self.artifacts = dict(self.current)
+        with open(self.path, "w", encoding="utf-8") as manifest_file:
+            json.dump(self.artifacts, manifest_file, indent=4, sort_keys=True)
@@ -0,0 +1,60 @@
+import gzip
+import hashlib
+import io
+import json
+import tarfile
+from typing import Dict
+
+
+class Package:
+    """Builds chaincode packages in memory.
+
+    Archives are reproducible: entries are sorted and carry fixed mtimes,
+    owners and modes, and the gzip header has no timestamp, so identical
+    sources always give identical bytes and therefore identical package IDs."""
+
+    MODE = 0o644
+
+    def __init__(self) -> None:
+        pass
+
+    def tar_gz(self, files: Dict[str, bytes]) -> bytes:
+        """_summary_"""
+        tarbuffer = io.BytesIO()
+        with tarfile.open(
+            fileobj=tarbuffer, mode="w", format=tarfile.GNU_FORMAT
+        ) as tar:
+            for name in sorted(files):
+                info = tarfile.TarInfo(name)
+                info.size = len(files[name])
+                info.mtime = 0
+                info.mode = self.MODE
+                info.uid = info.gid = 0
+                info.uname = info.gname = ""
+                tar.addfile(info, io.BytesIO(files[name]))
+
+        gzbuffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=gzbuffer, mode="wb", mtime=0) as gz:
+            gz.write(tarbuffer.getvalue())
+
+        return gzbuffer.getvalue()
+
+    def ccaas(self, label: str, connection: dict) -> bytes:
+        """Chaincode-as-a-service package: metadata.json plus code.tar.gz
+        holding connection.json"""
+        metadata = {"path": "", "type": "ccaas", "label": label}
+
+        code = self.tar_gz(
+            {"connection.json": json.dumps(connection, indent=2).encode("utf-8")}
+        )
+
+        return self.tar_gz(
+            {
+                "code.tar.gz": code,
+                "metadata.json": json.dumps(metadata, indent=2).encode("utf-8"),
+            }
+        )
+
+    def package_id(self, label: str, package: bytes) -> str:
+        """Same value as `peer lifecycle chaincode calculatepackageid`"""
+        return label + ":" + hashlib.sha256(package).hexdigest()
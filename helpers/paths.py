@@ -1,6 +1,9 @@
 import os
 import shutil
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Dict
 
 from rich.console import Console
 
@@ -12,358 +15,410 @@ from models.peer import Peer
 console = Console()
 
 
+@dataclass(frozen=True)
+class OrgPaths:
+    """Paths of one peer organization, computed once and never mutated"""
+
+    CAORGNAME: str
+    ORGNAME: str
+    CAORGPATH: str
+    CAORGCRYPTOPATH: str
+    CAORGCACLIENTPATH: str
+    CAORGCACLIENTMSPPATH: str
+    TLSCERTORGFILE: str
+    CACERTORGFILE: str
+    ORGPATH: str
+    MSPORGPATH: str
+    MSPORGCACERTPATH: str
+    TLSORGPATH: str
+    TLSORGTLSCAPATH: str
+    ORGCRYPTOPATH: str
+    ORGCACLIENTPATH: str
+    ORGMSPPATH: str
+    ORGADMINCERTPATH: str
+    ORGADMINKEYPATH: str
+    ORGSIGNCERTPATH: str
+    ORGMSPTLSCAPATH: str
+    ORGTLSPATH: str
+    ORGTLSTLSCAPATH: str
+    ORGADMINTLSKEYPATH: str
+
+
+@dataclass(frozen=True)
+class PeerPaths:
+    """Paths of one peer, computed once and never mutated"""
+
+    PEERPATH: str
+    PEERNAME: str
+    PEERCFGPATH: str
+    PEERMSPPATH: str
+    PEERTLSCAMSPPATH: str
+    PEERKEYSTOREMSPPATH: str
+    PEERCACERTPATH: str
+    PEERADMINCERTPATH: str
+    PEERTLSPATH: str
+    PEERTLSCAPATH: str
+    PEERSIGNCERTPATH: str
+    PEERKEYSTOREPATH: str
+    PEERSERVERCRT: str
+    PEERSERVERKEY: str
+    PEERCAROOT: str
+
+
+@dataclass(frozen=True)
+class ChaincodePaths:
+    """Paths and names of one chaincode instance served for a peer"""
+
+    CCPATH: str
+    CCNAME: str
+    CCSMALLNAME: str
+    CCIMAGE: str
+
+
 class Paths:
-    APPPATH = str()
-    DOMAINPATH = str()
-    DOMAINCONFIGPATH = str()
-    DOMAINCONFIGTXFILE = str()
-    DOMAINCONFIGTXJSONFILE = str()
-    DOMAINCONFIGBUILDPATH = str()
-    FABRICCAPATH = str()
-    CADOMAINNAME = str()
-    CADOMAINPATH = str()
-    CADOMAINCRYPTOPATH = str()
-    CACLIENTDOMAINPATH = str()
-    CACLIENTDOMAINMSPPATH = str()
-    CACERTDOMAINFILE = str()
-    TLSCERTDOMAINFILE = str()
-    CAORDERERNAME = str()
-    CAORDERERPATH = str()
-    CAORDERERCRYPTOPATH = str()
-    CAORDERERCACLIENTPATH = str()
-    CAORDERERCACLIENTMSPPATH = str()
-    CACERTORDERERFILE = str()
-    TLSCERTORDERERFILE = str()
-    ORDERERNAME = str()
-    ORDERERORGPATH = str()
-    ORDERERORGADMINPATH = str()
-    ORDERERORGMSPPATH = str()
-    ORDERERORGSIGNCERTPATH = str()
-    ORDDOMAINPATH = str()
-    ORDDOMAINMSPPATH = str()
-    ORDTLSCAMSPPATH = str()
-    ORDDOMAINCACERTPATH = str()
-    ORDSIGNCERTMSPPATH = str()
-    ORDKEYSTOREMSPPATH = str()
-    ORDDOMAINTLSPATH = str()
-    ORDDOMAINADMINCERTPATH = str()
-    ORDTLSCAPATH = str()
-    ORDSIGNCERTPATH = str()
-    ORDKEYSTOREPATH = str()
-    PEERORGPATH = str()
-    CCCRYPTOPATH = str()
-    CCCRYPTOTLSPATH = str()
-    CCCRYPTOTLSCAPATH = str()
-    CHANNELARTIFACTSPATH = str()
-    BLOCKFILE = str()
-    COMPOSEPATH = str()
-    FIREFLYSOURCESPATH = str()
-    FIREFLYPATH = str()
-    FIREFLYCCPATH = str()
-    FIREFLYCLIPATH = str()
-    CONFIGPATH = str()
-    CONFIGPEER = str()
-    CONFIGTX = str()
-    CONFIGORDERER = str()
-    CLIEXTPATH = str()
-    CLIPATH = str()
-    EXTCONFIGTX = str()
-    CLIBLOCKPATH = str()
-    CLIROOTCA = str()
-    CLISERVERCRT = str()
-    CLISERVERKEY = str()
-    PEERCFGPATH = str()
-    ORGPATH = str()
-    ORGCRYPTOPATH = str()
-    ORGCACLIENTPATH = str()
-    ORGMSPPATH = str()
-    CAORGNAME = str()
-    CAORGPATH = str()
-    CAORGCRYPTOPATH = str()
-    CAORGCACLIENTPATH = str()
-    CAORGCACLIENTMSPPATH = str()
-    TLSCERTORGFILE = str()
-    CACERTORGFILE = str()
-    ORGNAME = str()
-    ORGADMINCERTPATH = str()
-    PEERPATH = str()
-    PEERNAME = str()
-    PEERMSPPATH = str()
-    PEERTLSCAMSPPATH = str()
-    PEERTLSPATH = str()
-    PEERCACERTPATH = str()
-    PEERTLSCAPATH = str()
-    PEERSIGNCERTPATH = str()
-    PEERKEYSTOREPATH = str()
-    PEERADMINCERTPATH = str()
-    CHAINCODEPATH = str()
-    CHAINCODEBUILDPATH = str()
-    CHAINCODESRC = str()
-    CHAINCODEPKG = str()
-    PEERSERVERCRT = str()
-    PEERSERVERKEY = str()
-    PEERCAROOT = str()
-    ORDERERORGADMINCERTPATH = str()
-    ORDERERORGTLSCAMSPPATH = str()
-    ORGTLSPATH = str()
-    ORGTLSTLSCAPATH = str()
-    ORGSIGNCERTPATH = str()
-    ORDERERORGCAMSPPATH = str()
-    CLIHOSTNAME = str()
+    """Domain-wide paths are set on each instance. Organization, peer and
+    chaincode paths are built once per entity by org(), peer() and chaincode()
+    and shared as immutable objects, so concurrent tasks never interfere."""
+
+    cache: Dict[tuple, Any] = {}
+    lock = threading.Lock()
+
+    APPPATH: str
+    DOMAINPATH: str
+    DOMAINCONFIGPATH: str
+    DOMAINCONFIGTXFILE: str
+    DOMAINCONFIGTXJSONFILE: str
+    DOMAINCONFIGBUILDPATH: str
+    FABRICCAPATH: str
+    CADOMAINNAME: str
+    CADOMAINPATH: str
+    CADOMAINCRYPTOPATH: str
+    CACLIENTDOMAINPATH: str
+    CACLIENTDOMAINMSPPATH: str
+    CACERTDOMAINFILE: str
+    TLSCERTDOMAINFILE: str
+    CAORDERERNAME: str
+    CAORDERERPATH: str
+    CAORDERERCRYPTOPATH: str
+    CAORDERERCACLIENTPATH: str
+    CAORDERERCACLIENTMSPPATH: str
+    CACERTORDERERFILE: str
+    TLSCERTORDERERFILE: str
+    ORDERERNAME: str
+    ORDERERORGPATH: str
+    ORDERERORGADMINPATH: str
+    ORDERERORGMSPPATH: str
+    ORDERERORGSIGNCERTPATH: str
+    ORDDOMAINPATH: str
+    ORDDOMAINMSPPATH: str
+    ORDTLSCAMSPPATH: str
+    ORDDOMAINCACERTPATH: str
+    ORDSIGNCERTMSPPATH: str
+    ORDKEYSTOREMSPPATH: str
+    ORDDOMAINTLSPATH: str
+    ORDDOMAINADMINCERTPATH: str
+    ORDTLSCAPATH: str
+    ORDSIGNCERTPATH: str
+    ORDKEYSTOREPATH: str
+    PEERORGPATH: str
+    CCCRYPTOPATH: str
+    CCCRYPTOTLSPATH: str
+    CCCRYPTOTLSCAPATH: str
+    CHANNELARTIFACTSPATH: str
+    BLOCKFILE: str
+    COMPOSEPATH: str
+    CRYPTOSTOREPATH: str
+    SNAPSHOTPATH: str
+    PEERSNAPSHOTPATH: str
+    FIREFLYPATH: str
+    FIREFLYCCPATH: str
+    CONFIGPATH: str
+    CONFIGPEER: str
+    CONFIGTX: str
+    CONFIGORDERER: str
+    CLIEXTPATH: str
+    CLIPATH: str
+    EXTCONFIGTX: str
+    CLIBLOCKPATH: str
+    CLIROOTCA: str
+    CLISERVERCRT: str
+    CLISERVERKEY: str
+    CHAINCODEPATH: str
+    CHAINCODEBUILDPATH: str
+    CHAINCODESRC: str
+    CHAINCODEPKG: str
+    ORDERERORGADMINCERTPATH: str
+    ORDERERORGTLSCAMSPPATH: str
+    ORDERERORGCAMSPPATH: str
+    CLIHOSTNAME: str
 
     def __init__(self, domain: Domain) -> None:
         self.domain: Domain = domain
 
         # Application Path
         # ${PWD}
-        Paths.APPPATH = str(Path().absolute()) + "/"
+        self.APPPATH = str(Path().absolute()) + "/"
 
         # Domain Path
         # ${PWD}/domains/[DOMAIN]/
-        Paths.DOMAINPATH = Paths.APPPATH + "domains/" + self.domain.name + "/"
+        self.DOMAINPATH = self.APPPATH + "domains/" + self.domain.name + "/"
         # ${PWD}/domains/[DOMAIN]/config/
-        Paths.DOMAINCONFIGPATH = Paths.DOMAINPATH + "config/"
+        self.DOMAINCONFIGPATH = self.DOMAINPATH + "config/"
         # ${PWD}/domains/[DOMAIN]/config/configtx.yaml
-        Paths.DOMAINCONFIGTXFILE = Paths.DOMAINCONFIGPATH + "configtx.yaml"
+        self.DOMAINCONFIGTXFILE = self.DOMAINCONFIGPATH + "configtx.yaml"
         # ${PWD}/domains/[DOMAIN]/config/configtx.json
-        Paths.DOMAINCONFIGTXJSONFILE = Paths.DOMAINCONFIGPATH + "configtx.json"
+        self.DOMAINCONFIGTXJSONFILE = self.DOMAINCONFIGPATH + "configtx.json"
         # ${PWD}/domains/[DOMAIN]/config/build/
-        Paths.DOMAINCONFIGBUILDPATH = Paths.DOMAINCONFIGPATH + "build/"
+        self.DOMAINCONFIGBUILDPATH = self.DOMAINCONFIGPATH + "build/"
 
         # Fabric CAs Paths
         # ${PWD}/domains/[DOMAIN]/fabricca/
-        Paths.FABRICCAPATH = Paths.DOMAINPATH + "fabricca/"
+        self.FABRICCAPATH = self.DOMAINPATH + "fabricca/"
         ## Fabric CA Domain
         # ca.[DOMAIN]
-        Paths.CADOMAINNAME = self.domain.ca.name + "." + self.domain.name
+        self.CADOMAINNAME = self.domain.ca.name + "." + self.domain.name
         # ${PWD}/domains/[DOMAIN]/fabricca/ca/
-        Paths.CADOMAINPATH = Paths.FABRICCAPATH + self.domain.ca.name + "/"
+        self.CADOMAINPATH = self.FABRICCAPATH + self.domain.ca.name + "/"
         # ${PWD}/domains/[DOMAIN]/fabricca/ca/crypto/
-        Paths.CADOMAINCRYPTOPATH = Paths.CADOMAINPATH + "crypto/"
+        self.CADOMAINCRYPTOPATH = self.CADOMAINPATH + "crypto/"
 
         # Fabric CA Client Domain Admin
         # ${PWD}/domains/[DOMAIN]/fabricca/ca/admin/
-        Paths.CACLIENTDOMAINPATH = Paths.CADOMAINPATH + "admin/"
+        self.CACLIENTDOMAINPATH = self.CADOMAINPATH + "admin/"
         # ${PWD}/domains/[DOMAIN]/fabricca/ca/admin/msp/
-        Paths.CACLIENTDOMAINMSPPATH = Paths.CACLIENTDOMAINPATH + "msp/"
+        self.CACLIENTDOMAINMSPPATH = self.CACLIENTDOMAINPATH + "msp/"
 
         ## Fabric CA Domain Cert Files
         # ${PWD}/domains/[DOMAIN]/fabricca/ca/crypto/ca-cert.pem
-        Paths.CACERTDOMAINFILE = Paths.CADOMAINCRYPTOPATH + "ca-cert.pem"
+        self.CACERTDOMAINFILE = self.CADOMAINCRYPTOPATH + "ca-cert.pem"
         # ${PWD}/domains/[DOMAIN]/fabricca/ca/crypto/tls-cert.pem
-        Paths.TLSCERTDOMAINFILE = Paths.CADOMAINCRYPTOPATH + "tls-cert.pem"
+        self.TLSCERTDOMAINFILE = self.CADOMAINCRYPTOPATH + "tls-cert.pem"
 
         ## Fabric CA Orderer
         # ca.orderer.[DOMAIN]
-        Paths.CAORDERERNAME = self.domain.caorderer.name + "." + self.domain.name
+        self.CAORDERERNAME = self.domain.caorderer.name + "." + self.domain.name
         # ${PWD}/domains/[DOMAIN]/fabricca/ca.orderer/
-        Paths.CAORDERERPATH = Paths.FABRICCAPATH + self.domain.caorderer.name + "/"
+        self.CAORDERERPATH = self.FABRICCAPATH + self.domain.caorderer.name + "/"
         # ${PWD}/domains/[DOMAIN]/fabricca/ca.orderer/crypto/
-        Paths.CAORDERERCRYPTOPATH = Paths.CAORDERERPATH + "crypto/"
+        self.CAORDERERCRYPTOPATH = self.CAORDERERPATH + "crypto/"
         # ${PWD}/domains/[DOMAIN]/fabricca/ca.orderer/admin/
-        Paths.CAORDERERCACLIENTPATH = Paths.CAORDERERPATH + "admin/"
+        self.CAORDERERCACLIENTPATH = self.CAORDERERPATH + "admin/"
         # ${PWD}/domains/[DOMAIN]/fabricca/ca.orderer/admin/msp/
-        Paths.CAORDERERCACLIENTMSPPATH = Paths.CAORDERERCACLIENTPATH + "msp/"
+        self.CAORDERERCACLIENTMSPPATH = self.CAORDERERCACLIENTPATH + "msp/"
         ## Fabric CA Domain Cert Files
         # ${PWD}/domains/[DOMAIN]/fabricca/ca.orderer/crypto/ca-cert.pem
-        Paths.CACERTORDERERFILE = Paths.CAORDERERCRYPTOPATH + "ca-cert.pem"
+        self.CACERTORDERERFILE = self.CAORDERERCRYPTOPATH + "ca-cert.pem"
         # ${PWD}/domains/[DOMAIN]/fabricca/ca.orderer/crypto/tls-cert.pem
-        Paths.TLSCERTORDERERFILE = Paths.CAORDERERCRYPTOPATH + "tls-cert.pem"
+        self.TLSCERTORDERERFILE = self.CAORDERERCRYPTOPATH + "tls-cert.pem"
 
         # Orderer Organization Paths
         # orderer.[DOMAIN]
-        Paths.ORDERERNAME = self.domain.orderer.name + "." + self.domain.name
+        self.ORDERERNAME = self.domain.orderer.name + "." + self.domain.name
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/
-        Paths.ORDERERORGPATH = Paths.DOMAINPATH + "ordererOrganizations/"
+        self.ORDERERORGPATH = self.DOMAINPATH + "ordererOrganizations/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/admin/
-        Paths.ORDERERORGADMINPATH = Paths.ORDERERORGPATH + "admin/"
+        self.ORDERERORGADMINPATH = self.ORDERERORGPATH + "admin/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/admin/msp/
-        Paths.ORDERERORGMSPPATH = Paths.ORDERERORGADMINPATH + "msp/"
+        self.ORDERERORGMSPPATH = self.ORDERERORGADMINPATH + "msp/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/admin/msp/cacerts/
-        Paths.ORDERERORGCAMSPPATH = Paths.ORDERERORGMSPPATH + "cacerts/"
+        self.ORDERERORGCAMSPPATH = self.ORDERERORGMSPPATH + "cacerts/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/admin/msp/tlscacerts/
-        Paths.ORDERERORGTLSCAMSPPATH = Paths.ORDERERORGMSPPATH + "tlscacerts/"
+        self.ORDERERORGTLSCAMSPPATH = self.ORDERERORGMSPPATH + "tlscacerts/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/admin/msp/admincerts/
-        Paths.ORDERERORGADMINCERTPATH = Paths.ORDERERORGMSPPATH + "admincerts/"
+        self.ORDERERORGADMINCERTPATH = self.ORDERERORGMSPPATH + "admincerts/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/admin/msp/signcerts/
-        Paths.ORDERERORGSIGNCERTPATH = Paths.ORDERERORGMSPPATH + "signcerts/"
+        self.ORDERERORGSIGNCERTPATH = self.ORDERERORGMSPPATH + "signcerts/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/admin/tls/
-        Paths.ORDERERORGTLSPATH = Paths.ORDERERORGADMINPATH + "tls/"
+        self.ORDERERORGTLSPATH = self.ORDERERORGADMINPATH + "tls/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/admin/tls/tlscacerts/
-        Paths.ORDERERORGTLSCAPATH = Paths.ORDERERORGTLSPATH + "tlscacerts/"
+        self.ORDERERORGTLSCAPATH = self.ORDERERORGTLSPATH + "tlscacerts/"
 
         ## Orderer Domain Paths
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/
-        Paths.ORDDOMAINPATH = Paths.ORDERERORGPATH + self.domain.orderer.name + "/"
+        self.ORDDOMAINPATH = self.ORDERERORGPATH + self.domain.orderer.name + "/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/msp/
-        Paths.ORDDOMAINMSPPATH = Paths.ORDDOMAINPATH + "msp/"
+        self.ORDDOMAINMSPPATH = self.ORDDOMAINPATH + "msp/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/msp/admincerts/
-        Paths.ORDDOMAINADMINCERTPATH = Paths.ORDDOMAINMSPPATH + "admincerts/"
+        self.ORDDOMAINADMINCERTPATH = self.ORDDOMAINMSPPATH + "admincerts/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/msp/tlscacerts/
-        Paths.ORDTLSCAMSPPATH = Paths.ORDDOMAINMSPPATH + "tlscacerts/"
+        self.ORDTLSCAMSPPATH = self.ORDDOMAINMSPPATH + "tlscacerts/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/msp/cacerts/
-        Paths.ORDDOMAINCACERTPATH = Paths.ORDDOMAINMSPPATH + "cacerts/"
+        self.ORDDOMAINCACERTPATH = self.ORDDOMAINMSPPATH + "cacerts/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/msp/signcerts/
-        Paths.ORDSIGNCERTMSPPATH = Paths.ORDDOMAINMSPPATH + "signcerts/"
+        self.ORDSIGNCERTMSPPATH = self.ORDDOMAINMSPPATH + "signcerts/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/msp/keystore/
-        Paths.ORDKEYSTOREMSPPATH = Paths.ORDDOMAINMSPPATH + "keystore/"
+        self.ORDKEYSTOREMSPPATH = self.ORDDOMAINMSPPATH + "keystore/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/tls/
-        Paths.ORDDOMAINTLSPATH = Paths.ORDDOMAINPATH + "tls/"
+        self.ORDDOMAINTLSPATH = self.ORDDOMAINPATH + "tls/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/tls/tlscacerts/
-        Paths.ORDTLSCAPATH = Paths.ORDDOMAINTLSPATH + "tlscacerts/"
+        self.ORDTLSCAPATH = self.ORDDOMAINTLSPATH + "tlscacerts/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/tls/signcerts/
-        Paths.ORDSIGNCERTPATH = Paths.ORDDOMAINTLSPATH + "signcerts/"
+        self.ORDSIGNCERTPATH = self.ORDDOMAINTLSPATH + "signcerts/"
         # ${PWD}/domains/[DOMAIN]/ordererOrganizations/orderer/tls/keystore/
-        Paths.ORDKEYSTOREPATH = Paths.ORDDOMAINTLSPATH + "keystore/"
+        self.ORDKEYSTOREPATH = self.ORDDOMAINTLSPATH + "keystore/"
 
         # Peer Organizations Paths
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/
-        Paths.PEERORGPATH = Paths.DOMAINPATH + "peerOrganizations/"
+        self.PEERORGPATH = self.DOMAINPATH + "peerOrganizations/"
 
         # Chaincode Crypto Path (under review)
         # ${PWD}/domains/[DOMAIN]/chaincodecrypto/
-        Paths.CCCRYPTOPATH = Paths.DOMAINPATH + "chaincodecrypto/"
+        self.CCCRYPTOPATH = self.DOMAINPATH + "chaincodecrypto/"
         # ${PWD}/domains/[DOMAIN]/chaincodecrypto/tls/
-        Paths.CCCRYPTOTLSPATH = Paths.CCCRYPTOPATH + "tls/"
+        self.CCCRYPTOTLSPATH = self.CCCRYPTOPATH + "tls/"
         # ${PWD}/domains/[DOMAIN]/chaincodecrypto/tls/tlscacerts/
-        Paths.CCCRYPTOTLSCAPATH = Paths.CCCRYPTOTLSPATH + "tlscacerts/"
+        self.CCCRYPTOTLSCAPATH = self.CCCRYPTOTLSPATH + "tlscacerts/"
 
         # Channel Artifacts Path
         # ${PWD}/domains/[DOMAIN]/channelartifacts/
-        Paths.CHANNELARTIFACTSPATH = Paths.DOMAINPATH + "channelartifacts/"
+        self.CHANNELARTIFACTSPATH = self.DOMAINPATH + "channelartifacts/"
         # ${PWD}/domains/[DOMAIN]/channelartifacts/[NETWORK].block
-        Paths.BLOCKFILE = (
-            Paths.CHANNELARTIFACTSPATH + self.domain.networkname + ".block"
-        )
+        self.BLOCKFILE = self.CHANNELARTIFACTSPATH + self.domain.networkname + ".block"
 
         # Compose Files Path
         # ${PWD}/domains/[DOMAIN]/compose/
-        Paths.COMPOSEPATH = Paths.DOMAINPATH + "compose/"
+        self.COMPOSEPATH = self.DOMAINPATH + "compose/"
+
+        # Crypto Store, every certificate, key and config.yaml stored once
+        # ${PWD}/domains/[DOMAIN]/cryptostore/
+        self.CRYPTOSTOREPATH = self.DOMAINPATH + "cryptostore/"
+
+        # Ledger Snapshots Cache
+        # ${PWD}/domains/[DOMAIN]/snapshots/[NETWORK]/
+        self.SNAPSHOTPATH = (
+            self.DOMAINPATH + "snapshots/" + self.domain.networkname + "/"
+        )
 
         # Config Path and Files
         # ${PWD}/config/
-        Paths.CONFIGPATH = Paths.APPPATH + "config/"
+        self.CONFIGPATH = self.APPPATH + "config/"
         # ${PWD}/config/core.yaml
-        Paths.CONFIGPEER = Paths.CONFIGPATH + "core.yaml"
+        self.CONFIGPEER = self.CONFIGPATH + "core.yaml"
         # ${PWD}/config/configtx.yaml
-        Paths.CONFIGTX = Paths.CONFIGPATH + "configtx.yaml"
+        self.CONFIGTX = self.CONFIGPATH + "configtx.yaml"
         # ${PWD}/config/orderer.yaml
-        Paths.CONFIGORDERER = Paths.CONFIGPATH + "orderer.yaml"
+        self.CONFIGORDERER = self.CONFIGPATH + "orderer.yaml"
 
         # CLI
-        Paths.CLIHOSTNAME = "cli." + self.domain.name
-        Paths.CLIEXTPATH = (
+        self.CLIHOSTNAME = "cli." + self.domain.name
+        self.CLIEXTPATH = (
             "/opt/gopath/src/github.com/hyperledger/fabric/peer/organizations/"
         )
-        Paths.CLIPATH = "/etc/hyperledger/organizations/"
+        self.CLIPATH = "/etc/hyperledger/organizations/"
         # /opt/gopath/src/github.com/hyperledger/fabric/peer/organizations/config/build/
-        Paths.EXTCONFIGTX = Paths.CLIEXTPATH + "config/build/"
+        self.EXTCONFIGTX = self.CLIEXTPATH + "config/build/"
         # /etc/hyperledger/organizations/channelartifacts/
-        Paths.CLIBLOCKPATH = Paths.CLIPATH + "channelartifacts/"
-        # Paths.CLIROOTCA = "ordererOrganizations/orderer/tls/ca-root.crt"
-        Paths.CLIROOTCA = "ordererOrganizations/orderer/tls/tlscacerts/tls-cert.pem"
-        # Paths.CLISERVERCRT = "ordererOrganizations/orderer/tls/server.crt"
-        Paths.CLISERVERCRT = "ordererOrganizations/orderer/tls/signcerts/cert.crt"
-        # Paths.CLISERVERKEY = "ordererOrganizations/orderer/tls/server.key"
-        Paths.CLISERVERKEY = "ordererOrganizations/orderer/tls/keystore/key.pem"
+        self.CLIBLOCKPATH = self.CLIPATH + "channelartifacts/"
+        # /etc/hyperledger/organizations/snapshots/[NETWORK]/, same mount in peers
+        self.PEERSNAPSHOTPATH = (
+            self.CLIPATH + "snapshots/" + self.domain.networkname + "/"
+        )
+        # self.CLIROOTCA = "ordererOrganizations/orderer/tls/ca-root.crt"
+        self.CLIROOTCA = "ordererOrganizations/orderer/tls/tlscacerts/tls-cert.pem"
+        # self.CLISERVERCRT = "ordererOrganizations/orderer/tls/server.crt"
+        self.CLISERVERCRT = "ordererOrganizations/orderer/tls/signcerts/cert.crt"
+        # self.CLISERVERKEY = "ordererOrganizations/orderer/tls/server.key"
+        self.CLISERVERKEY = "ordererOrganizations/orderer/tls/keystore/key.pem"
 
         # CHAINCODE
         # ${PWD}/chaincodes/
-        Paths.CHAINCODEPATH = Paths.APPPATH + "chaincodes/"
+        self.CHAINCODEPATH = self.APPPATH + "chaincodes/"
         # ${PWD}/chaincodes/build/
-        Paths.CHAINCODEBUILDPATH = Paths.CHAINCODEPATH + "build/"
+        self.CHAINCODEBUILDPATH = self.CHAINCODEPATH + "build/"
         # ${PWD}/chaincodes/build/src/
-        Paths.CHAINCODESRC = Paths.CHAINCODEBUILDPATH + "src/"
+        self.CHAINCODESRC = self.CHAINCODEBUILDPATH + "src/"
         # ${PWD}/chaincodes/build/pkg/
-        Paths.CHAINCODEPKG = Paths.CHAINCODEBUILDPATH + "pkg/"
+        self.CHAINCODEPKG = self.CHAINCODEBUILDPATH + "pkg/"
 
         # Firefly Git Path
         # ${PWD}/domains/[DOMAIN]/fireflysources/
-        # Paths.FIREFLYSOURCESPATH = Paths.DOMAINPATH + "fireflysources/"
-        Paths.FIREFLYPATH = Paths.DOMAINPATH + "firefly/"
-        Paths.FIREFLYCCPATH = Paths.CHAINCODEPATH + "firefly/"
+        # self.FIREFLYSOURCESPATH = self.DOMAINPATH + "fireflysources/"
+        self.FIREFLYPATH = self.DOMAINPATH + "firefly/"
+        self.FIREFLYCCPATH = self.CHAINCODEPATH + "firefly/"
         # ${PWD}/domains/[DOMAIN]/firefly/fabconnect
-        Paths.FIREFLYFABCONNECTPATH = Paths.FIREFLYPATH + "fabconnect/"
+        self.FIREFLYFABCONNECTPATH = self.FIREFLYPATH + "fabconnect/"
         # ${PWD}/domains/[DOMAIN]/firefly/dataexchange
-        Paths.FIREFLYDATAEXCHPATH = Paths.FIREFLYPATH + "dataexchange/"
+        self.FIREFLYDATAEXCHPATH = self.FIREFLYPATH + "dataexchange/"
         # ${PWD}/domains/[DOMAIN]/firefly/core
-        Paths.FIREFLYCOREPATH = Paths.FIREFLYPATH + "core/"
+        self.FIREFLYCOREPATH = self.FIREFLYPATH + "core/"
         # ${PWD}/domains/[DOMAIN]/firefly/database
-        Paths.FIREFLYDATABASEPATH = Paths.FIREFLYPATH + "database/"
+        self.FIREFLYDATABASEPATH = self.FIREFLYPATH + "database/"
         # ${PWD}/fireflysources/firefly/db/migrations/postgres
-        Paths.FIREFLYDBMIGRATION = (
-            Paths.APPPATH + "fireflysources/firefly/db/migrations/postgres"
+        self.FIREFLYDBMIGRATION = (
+            self.APPPATH + "fireflysources/firefly/db/migrations/postgres"
         )
 
         # ${PWD}/domains/[DOMAIN]/firefly/stacks/[NETWORK]
-        Paths.FIREFLYSTACK = (
-            Paths.FIREFLYPATH + "stacks/" + self.domain.networkname + "/"
-        )
-        # Paths.FIREFLYCLIPATH = Paths.FIREFLYSOURCESPATH + "firefly-cli/"
+        self.FIREFLYSTACK = self.FIREFLYPATH + "stacks/" + self.domain.networkname + "/"
+        # self.FIREFLYCLIPATH = self.FIREFLYSOURCESPATH + "firefly-cli/"
 
-    def build_folders(self):
-        """_summary_"""
+    def build_folders(self, clean: bool = True):
+        """Creates the domain folders. A clean build first removes every
+        generated crypto and channel folder and the ledger snapshots"""
         console.print("[bold white]# Preparing folders[/]")
 
         for p in (
-            Paths.FABRICCAPATH,
-            Paths.PEERORGPATH,
-            Paths.ORDERERORGPATH,
-            Paths.CCCRYPTOPATH,
-            Paths.CHANNELARTIFACTSPATH,
-            Paths.CACLIENTDOMAINPATH,
+            self.FABRICCAPATH,
+            self.PEERORGPATH,
+            self.ORDERERORGPATH,
+            self.CCCRYPTOPATH,
+            self.CHANNELARTIFACTSPATH,
+            self.CACLIENTDOMAINPATH,
+            self.CRYPTOSTOREPATH,
+            self.SNAPSHOTPATH,
         ):
-            shutil.rmtree(p, ignore_errors=True)
+            if clean:
+                shutil.rmtree(p, ignore_errors=True)
 
-        pathcompose = Path(Paths.COMPOSEPATH)
+        pathcompose = Path(self.COMPOSEPATH)
         pathcompose.mkdir(parents=True, exist_ok=True)
 
-        # pathfireflysrc = Path(Paths.FIREFLYSOURCESPATH)
+        # pathfireflysrc = Path(self.FIREFLYSOURCESPATH)
         # pathfireflysrc.mkdir(parents=True, exist_ok=True)
 
-        pathfirefly = Path(Paths.FIREFLYPATH)
+        pathfirefly = Path(self.FIREFLYPATH)
         pathfirefly.mkdir(parents=True, exist_ok=True)
 
-        # pathfireflycli = Path(Paths.FIREFLYCLIPATH)
+        # pathfireflycli = Path(self.FIREFLYCLIPATH)
         # pathfireflycli.mkdir(parents=True, exist_ok=True)
 
-        pathfabricca = Path(Paths.CADOMAINPATH)
+        pathfabricca = Path(self.CADOMAINPATH)
         pathfabricca.mkdir(parents=True, exist_ok=True)
 
-        pathfabriccaord = Path(Paths.CAORDERERPATH)
+        pathfabriccaord = Path(self.CAORDERERPATH)
         pathfabriccaord.mkdir(parents=True, exist_ok=True)
 
-        pathfabriccaclient = Path(Paths.CACLIENTDOMAINPATH)
+        pathfabriccaclient = Path(self.CACLIENTDOMAINPATH)
         pathfabriccaclient.mkdir(parents=True, exist_ok=True)
 
-        pathorderer = Path(Paths.ORDDOMAINADMINCERTPATH)
+        pathorderer = Path(self.ORDDOMAINADMINCERTPATH)
         pathorderer.mkdir(parents=True, exist_ok=True)
 
-        pathordererorg = Path(Paths.ORDERERORGADMINCERTPATH)
+        pathordererorg = Path(self.ORDERERORGADMINCERTPATH)
         pathordererorg.mkdir(parents=True, exist_ok=True)
 
-        pathchaincode = Path(Paths.CCCRYPTOPATH)
+        pathchaincode = Path(self.CCCRYPTOPATH)
         pathchaincode.mkdir(parents=True, exist_ok=True)
 
-        msptlscacerts = Path(Paths.ORDTLSCAMSPPATH)
+        msptlscacerts = Path(self.ORDTLSCAMSPPATH)
         msptlscacerts.mkdir(parents=True, exist_ok=True)
 
-        caclientdomain = Path(Paths.CACLIENTDOMAINMSPPATH)
+        caclientdomain = Path(self.CACLIENTDOMAINMSPPATH)
         caclientdomain.mkdir(parents=True, exist_ok=True)
 
-        caclientorderer = Path(Paths.CAORDERERCACLIENTMSPPATH)
+        caclientorderer = Path(self.CAORDERERCACLIENTMSPPATH)
         caclientorderer.mkdir(parents=True, exist_ok=True)
 
-        configdomain = Path(Paths.DOMAINCONFIGPATH)
+        configdomain = Path(self.DOMAINCONFIGPATH)
         configdomain.mkdir(parents=True, exist_ok=True)
 
-        configbdomain = Path(Paths.DOMAINCONFIGBUILDPATH)
+        configbdomain = Path(self.DOMAINCONFIGBUILDPATH)
         configbdomain.mkdir(parents=True, exist_ok=True)
 
-        channelartifacts = Path(Paths.CHANNELARTIFACTSPATH)
+        channelartifacts = Path(self.CHANNELARTIFACTSPATH)
         channelartifacts.mkdir(parents=True, exist_ok=True)
 
-        ordorgtlscapath = Path(Paths.ORDERERORGTLSCAMSPPATH)
+        ordorgtlscapath = Path(self.ORDERERORGTLSCAMSPPATH)
         ordorgtlscapath.mkdir(parents=True, exist_ok=True)
 
         for org in self.domain.organizations:
@@ -371,18 +426,18 @@ class Paths:
 
     def build_folders_org(self, org: Organization):
         """_summary_"""
-        self.set_org_paths(org)
+        orgpaths = self.org(org)
 
-        pathfabriccaorg = Path(Paths.FABRICCAPATH + org.ca.name)
+        pathfabriccaorg = Path(orgpaths.CAORGPATH)
         pathfabriccaorg.mkdir(parents=True, exist_ok=True)
 
-        pathorgs = Path(Paths.PEERORGPATH + org.name)
+        pathorgs = Path(orgpaths.ORGPATH)
         pathorgs.mkdir(parents=True, exist_ok=True)
 
-        adminpath = Path(Paths.ORGADMINCERTPATH)
+        adminpath = Path(orgpaths.ORGADMINCERTPATH)
         adminpath.mkdir(parents=True, exist_ok=True)
 
-        caorgclient = Path(Paths.CAORGCACLIENTMSPPATH)
+        caorgclient = Path(orgpaths.CAORGCACLIENTMSPPATH)
         caorgclient.mkdir(parents=True, exist_ok=True)
 
         for peer in org.peers:
@@ -390,131 +445,172 @@ class Paths:
 
     def build_folder_peer(self, org: Organization, peer: Peer):
         """_summary_"""
-        self.set_peer_paths(org, peer)
+        peerpaths = self.peer(org, peer)
 
-        Paths.PEERCFGPATH = Paths.PEERORGPATH + org.name + "/" + peer.name + "/peercfg/"
-        pathpeers = Path(Paths.PEERCFGPATH)
+        pathpeers = Path(peerpaths.PEERCFGPATH)
         pathpeers.mkdir(parents=True, exist_ok=True)
 
-        adminpath = Path(Paths.PEERADMINCERTPATH)
+        adminpath = Path(peerpaths.PEERADMINCERTPATH)
         adminpath.mkdir(parents=True, exist_ok=True)
 
-        msptlscacerts = Path(Paths.PEERTLSCAMSPPATH)
+        msptlscacerts = Path(peerpaths.PEERTLSCAMSPPATH)
         msptlscacerts.mkdir(parents=True, exist_ok=True)
 
         shutil.copy(
-            Paths.CONFIGPEER,
-            Paths.PEERCFGPATH + "core.yaml",
+            self.CONFIGPEER,
+            peerpaths.PEERCFGPATH + "core.yaml",
         )
 
-    def set_org_paths(self, org: Organization):
+    def cached(self, key: tuple, build: Callable[[], Any]) -> Any:
+        """Returns the path object stored for key, building it on first use"""
+        key = (self.DOMAINPATH,) + key
+        with Paths.lock:
+            if key not in Paths.cache:
+                Paths.cache[key] = build()
+            return Paths.cache[key]
+
+    def org(self, org: Organization) -> OrgPaths:
         """_summary_"""
+        return self.cached(
+            ("org", org.name, org.ca.name), lambda: self.build_org_paths(org)
+        )
 
-        # ca.[ORG].[DOMAIN]
-        Paths.CAORGNAME = org.ca.name + "." + self.domain.name
-        # [ORG].[DOMAIN]
-        Paths.ORGNAME = org.name + "." + self.domain.name
+    def peer(self, org: Organization, peer: Peer) -> PeerPaths:
+        """_summary_"""
+        return self.cached(
+            ("peer", org.name, peer.name), lambda: self.build_peer_paths(org, peer)
+        )
+
+    def chaincode(
+        self, org: Organization, peer: Peer, chaincode: Chaincode
+    ) -> ChaincodePaths:
+        """_summary_"""
+        return self.cached(
+            ("chaincode", org.name, peer.name, chaincode.name),
+            lambda: self.build_chaincode_paths(org, peer, chaincode),
+        )
+
+    def build_org_paths(self, org: Organization) -> OrgPaths:
+        """_summary_"""
 
         # ${PWD}/domains/[DOMAIN]/fabricca/[ORG]/
-        Paths.CAORGPATH = Paths.FABRICCAPATH + org.ca.name + "/"
+        caorgpath = self.FABRICCAPATH + org.ca.name + "/"
         # ${PWD}/domains/[DOMAIN]/fabricca/[ORG]/crypto/
-        Paths.CAORGCRYPTOPATH = Paths.CAORGPATH + "crypto/"
+        caorgcryptopath = caorgpath + "crypto/"
         # ${PWD}/domains/[DOMAIN]/fabricca/[ORG]/admin/
-        Paths.CAORGCACLIENTPATH = Paths.CAORGPATH + "admin/"
-        # ${PWD}/domains/[DOMAIN]/fabricca/[ORG]/admin/msp/
-        Paths.CAORGCACLIENTMSPPATH = Paths.CAORGCACLIENTPATH + "msp/"
-        # ${PWD}/domains/[DOMAIN]/fabricca/[ORG]/crypto/tls-cert.pem
-        Paths.TLSCERTORGFILE = Paths.CAORGCRYPTOPATH + "tls-cert.pem"
-        # ${PWD}/domains/[DOMAIN]/fabricca/[ORG]/crypto/ca-cert.pem
-        Paths.CACERTORGFILE = Paths.CAORGCRYPTOPATH + "ca-cert.pem"
-
+        caorgcaclientpath = caorgpath + "admin/"
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/
-        Paths.ORGPATH = Paths.PEERORGPATH + org.name + "/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/msp
-        Paths.MSPORGPATH = Paths.PEERORGPATH + org.name + "/msp/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/msp
-        Paths.MSPORGCACERTPATH = Paths.MSPORGPATH + "cacerts/"
+        orgpath = self.PEERORGPATH + org.name + "/"
+        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/msp/
+        msporgpath = orgpath + "msp/"
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/tls/
-        Paths.TLSORGPATH = Paths.PEERORGPATH + org.name + "/tls/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/tls/tlscacerts
-        Paths.TLSORGTLSCAPATH = Paths.TLSORGPATH + "tlscacerts/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/crypto/
-        Paths.ORGCRYPTOPATH = Paths.ORGPATH + "crypto/"
-
+        tlsorgpath = orgpath + "tls/"
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/
-        Paths.ORGCACLIENTPATH = Paths.ORGPATH + "admin/"
+        orgcaclientpath = orgpath + "admin/"
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/msp/
-        Paths.ORGMSPPATH = Paths.ORGCACLIENTPATH + "msp/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/msp/admincerts/
-        Paths.ORGADMINCERTPATH = Paths.ORGMSPPATH + "admincerts/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/msp/keystore/
-        Paths.ORGADMINKEYPATH = Paths.ORGMSPPATH + "keystore/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/msp/signcerts/
-        Paths.ORGSIGNCERTPATH = Paths.ORGMSPPATH + "signcerts/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/msp/tlscacerts/
-        Paths.ORGMSPTLSCAPATH = Paths.ORGMSPPATH + "tlscacerts/"
-
+        orgmsppath = orgcaclientpath + "msp/"
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/tls/
-        Paths.ORGTLSPATH = Paths.ORGCACLIENTPATH + "tls/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/tls/tlscacerts/
-        Paths.ORGTLSTLSCAPATH = Paths.ORGTLSPATH + "tlscacerts/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/tls/keystore/
-        Paths.ORGADMINTLSKEYPATH = Paths.ORGTLSPATH + "keystore/"
+        orgtlspath = orgcaclientpath + "tls/"
+
+        return OrgPaths(
+            # ca.[ORG].[DOMAIN]
+            CAORGNAME=org.ca.name + "." + self.domain.name,
+            # [ORG].[DOMAIN]
+            ORGNAME=org.name + "." + self.domain.name,
+            CAORGPATH=caorgpath,
+            CAORGCRYPTOPATH=caorgcryptopath,
+            CAORGCACLIENTPATH=caorgcaclientpath,
+            # ${PWD}/domains/[DOMAIN]/fabricca/[ORG]/admin/msp/
+            CAORGCACLIENTMSPPATH=caorgcaclientpath + "msp/",
+            # ${PWD}/domains/[DOMAIN]/fabricca/[ORG]/crypto/tls-cert.pem
+            TLSCERTORGFILE=caorgcryptopath + "tls-cert.pem",
+            # ${PWD}/domains/[DOMAIN]/fabricca/[ORG]/crypto/ca-cert.pem
+            CACERTORGFILE=caorgcryptopath + "ca-cert.pem",
+            ORGPATH=orgpath,
+            MSPORGPATH=msporgpath,
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/msp/cacerts/
+            MSPORGCACERTPATH=msporgpath + "cacerts/",
+            TLSORGPATH=tlsorgpath,
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/tls/tlscacerts/
+            TLSORGTLSCAPATH=tlsorgpath + "tlscacerts/",
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/crypto/
+            ORGCRYPTOPATH=orgpath + "crypto/",
+            ORGCACLIENTPATH=orgcaclientpath,
+            ORGMSPPATH=orgmsppath,
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/msp/admincerts/
+            ORGADMINCERTPATH=orgmsppath + "admincerts/",
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/msp/keystore/
+            ORGADMINKEYPATH=orgmsppath + "keystore/",
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/msp/signcerts/
+            ORGSIGNCERTPATH=orgmsppath + "signcerts/",
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/msp/tlscacerts/
+            ORGMSPTLSCAPATH=orgmsppath + "tlscacerts/",
+            ORGTLSPATH=orgtlspath,
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/tls/tlscacerts/
+            ORGTLSTLSCAPATH=orgtlspath + "tlscacerts/",
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/admin/tls/keystore/
+            ORGADMINTLSKEYPATH=orgtlspath + "keystore/",
+        )
 
-    def set_peer_paths(self, org: Organization, peer: Peer):
+    def build_peer_paths(self, org: Organization, peer: Peer) -> PeerPaths:
         """_summary_"""
 
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/
-        Paths.PEERPATH = Paths.PEERORGPATH + org.name + "/" + peer.name + "/"
-        # [PEER].[DOMAIN]
-        Paths.PEERNAME = peer.name + "." + self.domain.name
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/peercfg/
-        Paths.PEERCFGPATH = Paths.PEERORGPATH + org.name + "/" + peer.name + "/peercfg/"
+        peerpath = self.PEERORGPATH + org.name + "/" + peer.name + "/"
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/msp/
-        Paths.PEERMSPPATH = Paths.PEERPATH + "msp/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/msp/tlscacerts/
-        Paths.PEERTLSCAMSPPATH = Paths.PEERMSPPATH + "tlscacerts/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/msp/keystore/
-        Paths.PEERKEYSTOREMSPPATH = Paths.PEERMSPPATH + "keystore/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/msp/cacerts/
-        Paths.PEERCACERTPATH = Paths.PEERMSPPATH + "cacerts/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/msp/admincerts/
-        Paths.PEERADMINCERTPATH = Paths.PEERMSPPATH + "admincerts/"
+        peermsppath = peerpath + "msp/"
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/tls/
-        Paths.PEERTLSPATH = Paths.PEERPATH + "tls/"
+        peertlspath = peerpath + "tls/"
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/tls/tlscacerts/
-        Paths.PEERTLSCAPATH = Paths.PEERTLSPATH + "tlscacerts/"
+        peertlscapath = peertlspath + "tlscacerts/"
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/tls/signcerts/
-        Paths.PEERSIGNCERTPATH = Paths.PEERTLSPATH + "signcerts/"
+        peersigncertpath = peertlspath + "signcerts/"
         # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/tls/keystore/
-        Paths.PEERKEYSTOREPATH = Paths.PEERTLSPATH + "keystore/"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/tls/server.crt
-        # Paths.PEERSERVERCRT = Paths.PEERTLSPATH + "server.crt"
-        Paths.PEERSERVERCRT = Paths.PEERSIGNCERTPATH + "cert.crt"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/tls/server.key
-        # Paths.PEERSERVERKEY = Paths.PEERTLSPATH + "server.key"
-        Paths.PEERSERVERKEY = Paths.PEERKEYSTOREPATH + "key.pem"
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/tls/ca-root.crt
-        # Paths.PEERCAROOT = Paths.PEERTLSPATH + "ca-root.crt"
-        Paths.PEERCAROOT = Paths.PEERTLSCAPATH + "tls-cert.pem"
-
-    def set_chaincode_paths(self, org: Organization, peer: Peer, chaincode: Chaincode):
+        peerkeystorepath = peertlspath + "keystore/"
+
+        return PeerPaths(
+            PEERPATH=peerpath,
+            # [PEER].[DOMAIN]
+            PEERNAME=peer.name + "." + self.domain.name,
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/peercfg/
+            PEERCFGPATH=peerpath + "peercfg/",
+            PEERMSPPATH=peermsppath,
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/msp/tlscacerts/
+            PEERTLSCAMSPPATH=peermsppath + "tlscacerts/",
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/msp/keystore/
+            PEERKEYSTOREMSPPATH=peermsppath + "keystore/",
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/msp/cacerts/
+            PEERCACERTPATH=peermsppath + "cacerts/",
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/msp/admincerts/
+            PEERADMINCERTPATH=peermsppath + "admincerts/",
+            PEERTLSPATH=peertlspath,
+            PEERTLSCAPATH=peertlscapath,
+            PEERSIGNCERTPATH=peersigncertpath,
+            PEERKEYSTOREPATH=peerkeystorepath,
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/tls/signcerts/cert.crt
+            PEERSERVERCRT=peersigncertpath + "cert.crt",
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/tls/keystore/key.pem
+            PEERSERVERKEY=peerkeystorepath + "key.pem",
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/tls/tlscacerts/tls-cert.pem
+            PEERCAROOT=peertlscapath + "tls-cert.pem",
+        )
+
+    def build_chaincode_paths(
+        self, org: Organization, peer: Peer, chaincode: Chaincode
+    ) -> ChaincodePaths:
         """_summary_"""
 
-        # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/[CHAINCODE]
-        Paths.CCPATH = (
-            Paths.PEERORGPATH + org.name + "/" + peer.name + "/" + chaincode.name
-        )
-        # [PEER].[CHAINCODE].ccaas.[DOMAIN]
-        Paths.CCNAME = (
-            peer.name.replace(".", "")
+        return ChaincodePaths(
+            # ${PWD}/domains/[DOMAIN]/peerOrganizations/[ORG]/[PEER]/[CHAINCODE]
+            CCPATH=self.PEERORGPATH + org.name + "/" + peer.name + "/" + chaincode.name,
+            # [PEER].[CHAINCODE].ccaas.[DOMAIN]
+            CCNAME=peer.name.replace(".", "")
             + "."
             + chaincode.name
             + ".ccaas."
-            + self.domain.name
+            + self.domain.name,
+            # [PEER].[CHAINCODE].ccaas
+            CCSMALLNAME=peer.name.replace(".", "") + "." + chaincode.name + ".ccaas",
+            # [CHAINCODE]_ccaas_image:latest
+            CCIMAGE=chaincode.name + "_ccaas_image:latest",
         )
-
-        Paths.CCSMALLNAME = peer.name.replace(".", "") + "." + chaincode.name + ".ccaas"
-
-        # [CHAINCODE]_ccaas_image:latest
-        Paths.CCIMAGE = chaincode.name + "_ccaas_image:latest"
@@ -0,0 +1,130 @@
+import socket
+from bisect import bisect_right
+from typing import List
+
+from models.domain import Domain
+
+
+class Ports:
+    """Host port allocator.
+
+    Allocated ports are kept as sorted, disjoint [start, end] intervals, so
+    checking a port or a block of ports is a binary search instead of a scan
+    over every port of the network. Candidate ports are also bind-tested on
+    the host, which skips ports already taken by other processes. The
+    intervals are persisted in setup.json (Domain.ports)."""
+
+    MINPORT = 1024
+    MAXPORT = 65535
+    HOST = "0.0.0.0"
+
+    def __init__(self, intervals: List[List[int]] = None) -> None:
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in intervals or []:
+            self.reserve(start, end - start + 1)
+
+    def intervals(self) -> List[List[int]]:
+        """_summary_"""
+        return [[start, end] for start, end in zip(self.starts, self.ends)]
+
+    def used(self, port: int, size: int = 1) -> bool:
+        """True when any port of [port, port + size) is already allocated"""
+        i = bisect_right(self.starts, port + size - 1) - 1
+        return i >= 0 and self.ends[i] >= port
+
+    def host_free(self, port: int) -> bool:
+        """Bind test on the host"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            try:
+                sock.bind((self.HOST, port))
+            except OSError:
+                return False
+        return True
+
+    def free(self, port: int, size: int = 1) -> bool:
+        """_summary_"""
+        if port < self.MINPORT or port + size - 1 > self.MAXPORT:
+            return False
+        if self.used(port, size):
+            return False
+        return all(self.host_free(p) for p in range(port, port + size))
+
+    def reserve(self, port: int, size: int = 1):
+        """Marks [port, port + size) as allocated, merging adjacent intervals"""
+        if port <= 0:
+            return
+
+        start, end = port, port + size - 1
+        i = bisect_right(self.starts, start)
+
+        if i > 0 and self.ends[i - 1] >= start - 1:
+            i -= 1
+            start = self.starts[i]
+            end = max(end, self.ends[i])
+            del self.starts[i]
+            del self.ends[i]
+
+        while i < len(self.starts) and self.starts[i] <= end + 1:
+            end = max(end, self.ends[i])
+            del self.starts[i]
+            del self.ends[i]
+
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def find(self, preferred: int, stride: int = 1, size: int = 1) -> int:
+        """First free block at preferred, preferred + stride, ... without
+        allocating it"""
+        port = max(preferred, self.MINPORT)
+        while port + size - 1 <= self.MAXPORT:
+            if self.free(port, size):
+                return port
+            port += stride
+        raise ValueError("no free port from " + str(preferred))
+
+    def allocate(self, preferred: int, stride: int = 1, size: int = 1) -> int:
+        """_summary_"""
+        port = self.find(preferred, stride, size)
+        self.reserve(port, size)
+        return port
+
+    def allocate_many(
+        self, count: int, preferred: int, stride: int = 1, size: int = 1
+    ) -> List[int]:
+        """Allocates count blocks in one pass, for bulk organization and peer
+        additions"""
+        ports = []
+        port = preferred
+        for _ in range(count):
+            port = self.allocate(port, stride, size)
+            ports.append(port)
+            port += stride
+        return ports
+
+    def reserve_domain(self, domain: Domain):
+        """Reserves every port used by the domain entities, for networks
+        whose setup.json predates persisted allocations"""
+        for port in (
+            domain.ca.serverport,
+            domain.ca.operationslistenport,
+            domain.caorderer.serverport,
+            domain.caorderer.operationslistenport,
+            domain.orderer.adminlistenport,
+            domain.orderer.generallistenport,
+            domain.orderer.operationslistenport,
+        ):
+            self.reserve(port)
+
+        for org in domain.organizations:
+            self.reserve(org.ca.serverport)
+            self.reserve(org.ca.operationslistenport)
+            for peer in org.peers:
+                self.reserve(peer.peerlistenport)
+                self.reserve(peer.operationslistenport)
+                self.reserve(peer.chaincodelistenport)
+                if peer.database is not None:
+                    self.reserve(peer.database.port)
+
+        for chaincode in domain.chaincodes:
+            self.reserve(chaincode.ccport)
@@ -0,0 +1,213 @@
+import json
+import os
+import time
+from typing import Callable
+
+import requests
+import urllib3
+from rich.console import Console
+
+from helpers.commands import Commands
+from helpers.paths import Paths
+from helpers.tracing import tracer
+from models.ca import Ca
+from models.database import Database
+from models.domain import Domain
+from models.orderer import Orderer
+from models.peer import Peer
+
+# CA TLS certificates are self-signed, the probes only need to reach the endpoint
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+console = Console()
+commands = Commands()
+
+
+class Readiness:
+    """Polls real readiness signals of the network components instead of sleeping.
+
+    Every probe is retried with an adaptive backoff (starting at INITIALDELAY and
+    growing by BACKOFF up to MAXDELAY) until it succeeds or the deadline expires.
+    """
+
+    INITIALDELAY = 0.1
+    BACKOFF = 1.5
+    MAXDELAY = 2.0
+    TIMEOUT = 120.0
+    REQUESTTIMEOUT = 2.0
+
+    def __init__(self, domain: Domain) -> None:
+        self.domain: Domain = domain
+        self.paths = Paths(domain)
+
+    def poll(self, name: str, probe: Callable[[], bool], timeout: float = None) -> bool:
+        """Run probe until it returns True or the deadline is reached"""
+        with tracer.span("wait " + name, "wait"):
+            return self.wait(name, probe, timeout)
+
+    def wait(self, name: str, probe: Callable[[], bool], timeout: float = None) -> bool:
+        timeout = self.TIMEOUT if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        delay = self.INITIALDELAY
+
+        while True:
+            try:
+                if probe():
+                    return True
+            except Exception:
+                pass
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                console.print(
+                    "[bold red]## "
+                    + name
+                    + " not ready after "
+                    + str(int(timeout))
+                    + "s[/]"
+                )
+                return False
+
+            time.sleep(min(delay, remaining))
+            delay = min(delay * self.BACKOFF, self.MAXDELAY)
+
+    def http_ok(self, url: str) -> bool:
+        response = requests.get(url, timeout=self.REQUESTTIMEOUT)
+        return response.status_code == 200
+
+    def ca(self, ca: Ca, timeout: float = None) -> bool:
+        """Fabric CA answers on /cainfo"""
+
+        def probe() -> bool:
+            response = requests.get(
+                "https://localhost:" + str(ca.serverport) + "/cainfo",
+                timeout=self.REQUESTTIMEOUT,
+                verify=False,
+            )
+            return response.status_code == 200 and response.json().get("success")
+
+        return self.poll(ca.name + "." + self.domain.name, probe, timeout)
+
+    def cas(self, timeout: float = None) -> bool:
+        ready = self.ca(self.domain.ca, timeout)
+        ready = self.ca(self.domain.caorderer, timeout) and ready
+        for org in self.domain.organizations:
+            ready = self.ca(org.ca, timeout) and ready
+        return ready
+
+    def orderer(self, orderer: Orderer = None, timeout: float = None) -> bool:
+        """Orderer operations service answers on /healthz"""
+        orderer = self.domain.orderer if orderer is None else orderer
+        return self.poll(
+            orderer.name + "." + self.domain.name,
+            lambda: self.http_ok(
+                "http://localhost:" + str(orderer.operationslistenport) + "/healthz"
+            ),
+            timeout,
+        )
+
+    def couchdb(self, database: Database, timeout: float = None) -> bool:
+        """CouchDB answers on /_up"""
+        return self.poll(
+            database.name + "." + self.domain.name,
+            lambda: self.http_ok("http://localhost:" + str(database.port) + "/_up"),
+            timeout,
+        )
+
+    def peer(self, peer: Peer, timeout: float = None) -> bool:
+        """Peer operations service answers on /healthz (it also checks CouchDB)"""
+        return self.poll(
+            peer.name + "." + self.domain.name,
+            lambda: self.http_ok(
+                "http://localhost:" + str(peer.operationslistenport) + "/healthz"
+            ),
+            timeout,
+        )
+
+    def peers(self, peers: list, timeout: float = None) -> bool:
+        ready = True
+        for peer in peers:
+            if peer.database is not None:
+                ready = self.couchdb(peer.database, timeout) and ready
+            ready = self.peer(peer, timeout) and ready
+        return ready
+
+    def network(self, timeout: float = None) -> bool:
+        ready = self.orderer(timeout=timeout)
+        for org in self.domain.organizations:
+            ready = self.peers(org.peers, timeout) and ready
+        return ready
+
+    def channel(self, timeout: float = None) -> bool:
+        """Orderer reports the channel as active through osnadmin channel list"""
+        return self.poll(
+            "channel " + self.domain.networkname,
+            lambda: self.channel_info().get("status") == "active",
+            timeout,
+        )
+
+    def channel_info(self) -> dict:
+        """Channel status and height as reported by osnadmin channel list"""
+        output = commands.osnadmin_channel_list(
+            self.paths.APPPATH,
+            self.domain.networkname,
+            self.domain.orderer,
+            self.paths.ORDTLSCAPATH + "tls-cert.pem",
+            self.paths.ORDSIGNCERTPATH + "cert.crt",
+            self.paths.ORDKEYSTOREPATH + "key.pem",
+        )
+        return json.loads(output[output.index("{") :])
+
+    def height(
+        self, peer: Peer, getinfo: Callable[[], str], height: int, timeout: float = None
+    ) -> bool:
+        """Peer ledger reaches height, as reported by peer channel getinfo"""
+
+        def probe() -> bool:
+            output = getinfo()
+            info = json.loads(output[output.index("{") :])
+            return info.get("height", 0) >= height
+
+        return self.poll("height " + peer.name, probe, timeout)
+
+    def approval(
+        self, mspid: str, checkcommit: Callable[[], str], timeout: float = None
+    ) -> bool:
+        """Organization approval is visible in checkcommitreadiness"""
+
+        def probe() -> bool:
+            output = checkcommit()
+            readiness = json.loads(output[output.index("{") :])
+            return readiness["approvals"].get(mspid, False)
+
+        return self.poll("approval " + mspid, probe, timeout)
+
+    def file(self, path: str, timeout: float = None) -> bool:
+        return self.poll(
+            os.path.basename(path),
+            lambda: os.path.isfile(path) and os.path.getsize(path) > 0,
+            timeout,
+        )
+
+    def fabconnect(self, timeout: float = None) -> bool:
+        return self.poll(
+            "fabconnect." + self.domain.name,
+            lambda: self.http_ok("http://localhost:5102/status"),
+            timeout,
+        )
+
+    def postgres(self, container, timeout: float = None) -> bool:
+        return self.poll(
+            container.name,
+            lambda: container.exec_run("pg_isready -U firefly -d firefly").exit_code
+            == 0,
+            timeout,
+        )
+
+    def firefly(self, timeout: float = None) -> bool:
+        """FireFly core answers on /api/v1/status"""
+        return self.poll(
+            "firefly." + self.domain.name,
+            lambda: self.http_ok("http://127.0.0.1:5000/api/v1/status"),
+            timeout,
+        )
@@ -0,0 +1,116 @@
+import json
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping
+
+from rich.console import Console
+
+from helpers.tracing import Tracer, tracer
+
+console = Console()
+
+
+class CommandError(Exception):
+    """Raised when a command exits with a non-zero status"""
+
+    def __init__(
+        self, argv: List[str], returncode: int, stdout: str, stderr: str
+    ) -> None:
+        self.argv = argv
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        super().__init__(
+            " ".join([os.path.basename(argv[0])] + argv[1:3])
+            + " exited with "
+            + str(returncode)
+            + ": "
+            + (stderr or stdout).strip()[-500:]
+        )
+
+
+class Runner:
+    """Executes argv lists without a shell and journals every invocation.
+
+    Each process run appends one JSON line per command (argv, exit code,
+    wall time) to logs/commands-[RUNID].jsonl."""
+
+    RUNID = Tracer.RUNID
+    JOURNALPATH = Tracer.LOGPATH
+
+    journal: List[dict] = []
+    lock = threading.Lock()
+
+    def __init__(self) -> None:
+        pass
+
+    def environment(self, variables: Dict[str, str] = None) -> Mapping[str, str]:
+        """Returns a read-only copy of the process environment with the
+        given variables applied, so concurrent commands never share state"""
+        env = dict(os.environ)
+        if variables:
+            env.update({key: str(value) for key, value in variables.items()})
+        return MappingProxyType(env)
+
+    def run(
+        self,
+        argv: List[str],
+        env: Dict[str, str] = None,
+        cwd: str = None,
+        check: bool = True,
+    ) -> subprocess.CompletedProcess:
+        """_summary_"""
+        argv = [str(arg) for arg in argv]
+        started = time.time()
+        with tracer.span(
+            " ".join([os.path.basename(argv[0])] + argv[1:3]),
+            "command",
+            {"argv": argv},
+        ):
+            try:
+                result = subprocess.run(
+                    argv,
+                    env=self.environment(env),
+                    cwd=cwd,
+                    capture_output=True,
+                    text=True,
+                )
+            except OSError as e:
+                result = subprocess.CompletedProcess(argv, 127, "", str(e))
+
+        self.record(argv, result.returncode, started, time.time() - started, cwd)
+
+        if check and result.returncode != 0:
+            raise CommandError(argv, result.returncode, result.stdout, result.stderr)
+
+        return result
+
+    def record(
+        self, argv: List[str], returncode: int, started: float, seconds: float, cwd: str
+    ):
+        """_summary_"""
+        entry = {
+            "command": os.path.basename(argv[0]),
+            "argv": argv,
+            "cwd": cwd,
+            "returncode": returncode,
+            "started": round(started, 3),
+            "seconds": round(seconds, 3),
+        }
+
+        with Runner.lock:
+            Runner.journal.append(entry)
+            try:
+                Path(Runner.JOURNALPATH).mkdir(parents=True, exist_ok=True)
+                with open(
+                    Runner.JOURNALPATH + "commands-" + Runner.RUNID + ".jsonl",
+                    "a",
+                    encoding="utf-8",
+                ) as journal:
+                    journal.write(json.dumps(entry) + "\n")
+            except OSError:
+                pass
@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List
+
+from rich.console import Console
+from rich.table import Table
+
+from helpers.tracing import tracer
+
+console = Console()
+
+
+class Scheduler:
+    """Runs named tasks on a bounded thread pool as soon as all their
+    dependencies have finished successfully. Tasks depending on a failed
+    task are skipped."""
+
+    MAXWORKERS = 8
+
+    def __init__(self, maxworkers: int = None) -> None:
+        self.maxworkers: int = maxworkers or self.MAXWORKERS
+        self.tasks: Dict[str, Callable[[], Any]] = {}
+        self.dependencies: Dict[str, List[str]] = {}
+        self.results: Dict[str, Any] = {}
+        self.failed: Dict[str, Exception] = {}
+        self.durations: Dict[str, float] = {}
+
+    def add(self, name: str, task: Callable[[], Any], dependencies: List[str] = None):
+        self.tasks[name] = task
+        self.dependencies[name] = list(dependencies or [])
+
+    def execute(self, name: str) -> Any:
+        with tracer.span(name, "task"):
+            return self.tasks[name]()
+
+    def run(self) -> Dict[str, Any]:
+        pending = dict(self.dependencies)
+        running = {}
+        started = {}
+
+        with ThreadPoolExecutor(max_workers=self.maxworkers) as executor:
+            while pending or running:
+                for name, dependencies in list(pending.items()):
+                    blocked = [
+                        dep
+                        for dep in dependencies
+                        if dep in self.failed or dep not in self.tasks
+                    ]
+                    if blocked:
+                        del pending[name]
+                        self.failed[name] = RuntimeError(
+                            "dependency " + blocked[0] + " not satisfied"
+                        )
+                        console.print(
+                            "[bold red]## Skipping "
+                            + name
+                            + ": dependency "
+                            + blocked[0]
+                            + " not satisfied[/]"
+                        )
+                    elif all(dep in self.results for dep in dependencies):
+                        del pending[name]
+                        started[name] = time.monotonic()
+                        running[executor.submit(self.execute, name)] = name
+
+                if not running:
+                    # only reachable with a dependency cycle
+                    for name in pending:
+                        self.failed[name] = RuntimeError("dependency cycle")
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    self.durations[name] = time.monotonic() - started[name]
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as e:
+                        self.failed[name] = e
+                        console.print(
+                            "[bold red]## Task " + name + " failed: " + str(e) + "[/]"
+                        )
+
+        return self.results
+
+    def report(self, title: str):
+        """Prints the outcome and wall time of every task"""
+        table = Table(title=title)
+        table.add_column("Task")
+        table.add_column("Result")
+        table.add_column("Time", justify="right")
+
+        for name in self.tasks:
+            if name in self.results:
+                result = "[green]ok[/]"
+            elif name in self.failed:
+                result = "[red]" + str(self.failed[name]) + "[/]"
+            else:
+                result = "[yellow]not run[/]"
+            duration = "%.1fs" % self.durations[name] if name in self.durations else "-"
+            table.add_row(name, result, duration)
+
+        console.print(table)
@@ -0,0 +1,489 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import ruamel.yaml
+import validators
+
+from helpers.ports import Ports
+from models.ca import Ca
+from models.database import Database
+from models.domain import Domain
+from models.orderer import Orderer
+from models.organization import Organization
+from models.peer import Peer
+
+yaml = ruamel.yaml.YAML(typ="safe")
+
+
+class Topology:
+    """Builds Domain models, either one entity at a time for the interactive
+    wizard or all at once from a declarative network spec.
+
+    A spec is a YAML or JSON file such as:
+
+        domain: example.com
+        portstep: 1000        # optional, distance between peer port blocks
+        organizations:
+          - name: acme
+            peers: 2          # number of peers, default ports
+          - name: globex
+            peers:
+              - port: 12051   # explicit peer port
+              - {}
+            users: 1000       # optional, client identities registered on its CA
+
+    Ports follow the same layout as the wizard prompts: each peer takes the
+    next block of listen, operations, chaincode and CouchDB ports."""
+
+    PEERPORT = 7051
+    OPERATIONSPORT = 9444
+    CHAINCODEPORT = 7052
+    COUCHDBPORT = 5984
+    PORTSTEP = 1000
+    CAPORTSTEP = 100
+    MAXPORT = Ports.MAXPORT
+
+    def __init__(self) -> None:
+        pass
+
+    def load(self, specfile: str) -> dict:
+        """Reads a YAML or JSON spec file"""
+        with open(specfile, encoding="utf-8") as spec_file:
+            if specfile.endswith(".json"):
+                return json.load(spec_file)
+            return yaml.load(spec_file)
+
+    def validate(self, spec: dict) -> List[str]:
+        """Returns every problem found in the spec, empty when it is valid"""
+        errors = []
+        if not isinstance(spec, dict):
+            return ["spec must be a mapping"]
+
+        if not validators.domain(str(spec.get("domain", ""))):
+            errors.append("domain: '" + str(spec.get("domain")) + "' is not valid")
+
+        portstep = spec.get("portstep", self.PORTSTEP)
+        if not isinstance(portstep, int) or portstep < 10:
+            errors.append("portstep: must be an integer of at least 10")
+
+        cryptogen = spec.get("cryptogen", False)
+        if not isinstance(cryptogen, bool):
+            errors.append("cryptogen: must be true or false")
+
+        organizations = spec.get("organizations")
+        if not isinstance(organizations, list) or not organizations:
+            errors.append("organizations: at least one organization is required")
+            return errors
+
+        names = set()
+        for i, org in enumerate(organizations):
+            where = "organizations[" + str(i) + "]"
+            if not isinstance(org, dict):
+                errors.append(where + ": must be a mapping")
+                continue
+
+            name = str(org.get("name", ""))
+            if not name.isalpha():
+                errors.append(where + ".name: '" + name + "' must be alphabetic")
+            elif name in names:
+                errors.append(where + ".name: '" + name + "' is duplicated")
+            names.add(name)
+
+            peers = org.get("peers", 1)
+            if isinstance(peers, int) and not isinstance(peers, bool):
+                if peers < 1:
+                    errors.append(where + ".peers: at least one peer is required")
+            elif isinstance(peers, list) and peers:
+                for j, peer in enumerate(peers):
+                    # An empty entry, {} or null, takes every default
+                    if peer is None:
+                        peer = {}
+                    if not isinstance(peer, dict):
+                        errors.append(
+                            where + ".peers[" + str(j) + "]: must be a mapping"
+                        )
+                        continue
+
+                    port = peer.get("port")
+                    if port is not None and not (
+                        isinstance(port, int) and 1024 <= port <= self.MAXPORT
+                    ):
+                        errors.append(
+                            where
+                            + ".peers["
+                            + str(j)
+                            + "].port: must be between 1024 and "
+                            + str(self.MAXPORT)
+                        )
+            else:
+                errors.append(where + ".peers: must be a peer count or a list of peers")
+
+            users = org.get("users", 0)
+            if not isinstance(users, int) or isinstance(users, bool) or users < 0:
+                errors.append(where + ".users: must be a non-negative integer")
+            elif users and cryptogen is True:
+                errors.append(
+                    where + ".users: needs the organization CA, not cryptogen"
+                )
+
+        return errors
+
+    def domain(self, spec: dict) -> Domain:
+        """Builds the complete Domain of a valid spec and allocates its ports.
+
+        Ports taken on the host are skipped. Raises ValueError when the ports
+        do not fit or an explicit peer port is taken."""
+        domain = self.new_domain(spec["domain"])
+        domain.cryptogen = spec.get("cryptogen", False)
+        domain.portstep = spec.get("portstep", self.PORTSTEP)
+        portstep = domain.portstep
+
+        ports = Ports()
+        for port in (
+            domain.orderer.generallistenport,
+            domain.orderer.operationslistenport,
+            domain.orderer.adminlistenport,
+            domain.ca.serverport,
+            domain.ca.operationslistenport,
+            domain.caorderer.serverport,
+            domain.caorderer.operationslistenport,
+        ):
+            ports.reserve(port)
+
+        portpeer = self.PEERPORT
+        peeroperationlisten = self.OPERATIONSPORT
+        peerchaincodelistenport = self.CHAINCODEPORT
+        portcouchdb = self.COUCHDBPORT
+        caorgserverport = domain.caorderer.serverport + self.CAPORTSTEP
+        caorgoplstport = domain.caorderer.operationslistenport + self.CAPORTSTEP
+
+        for specorg in spec["organizations"]:
+            caorgserverport = ports.allocate(caorgserverport, self.CAPORTSTEP)
+            caorgoplstport = ports.allocate(caorgoplstport, self.CAPORTSTEP)
+            org = self.new_organization(
+                domain, specorg["name"], caorgserverport, caorgoplstport
+            )
+
+            specpeers = specorg.get("peers", 1)
+            if isinstance(specpeers, int):
+                specpeers = [{}] * specpeers
+
+            for ipeers, specpeer in enumerate(specpeers, start=1):
+                valueport = (specpeer or {}).get("port")
+                if valueport:
+                    if not ports.free(valueport):
+                        raise ValueError(
+                            "port " + str(valueport) + " is already in use"
+                        )
+                    ports.reserve(valueport)
+                else:
+                    valueport = ports.allocate(portpeer, portstep)
+                    portpeer = valueport
+
+                peeroperationlisten = ports.allocate(peeroperationlisten, portstep)
+                peerchaincodelistenport = ports.allocate(
+                    peerchaincodelistenport, portstep
+                )
+                portcouchdb = ports.allocate(portcouchdb, portstep)
+
+                peer = self.new_peer(
+                    domain,
+                    org,
+                    ipeers,
+                    valueport,
+                    peeroperationlisten,
+                    peerchaincodelistenport,
+                    portcouchdb,
+                )
+                org.peers.append(peer)
+
+                portpeer += portstep
+                portcouchdb += portstep
+                peeroperationlisten += portstep
+                peerchaincodelistenport += portstep
+
+            org.qtypeers = len(org.peers)
+            domain.organizations.append(org)
+
+            portpeer += portstep
+            caorgserverport += self.CAPORTSTEP
+            caorgoplstport += self.CAPORTSTEP
+
+        domain.qtyorgs = len(domain.organizations)
+        domain.ports = ports.intervals()
+
+        return domain
+
+    def extend(
+        self, domain: Domain, spec: dict
+    ) -> Tuple[List[Organization], Dict[str, List[Peer]]]:
+        """Adds the organizations and peers of a valid spec that an existing
+        domain lacks, keeping every existing entity and port. Returns the new
+        organizations and the new peers of existing ones. Raises ValueError
+        when the spec removes anything or changes the domain itself."""
+        if spec["domain"] != domain.name:
+            raise ValueError("spec domain is not " + domain.name)
+        if spec.get("cryptogen", False) != domain.cryptogen:
+            raise ValueError("cryptogen cannot change on an existing network")
+        if spec.get("portstep", domain.portstep) != domain.portstep:
+            raise ValueError("portstep cannot change on an existing network")
+
+        ports = Ports(domain.ports)
+        ports.reserve_domain(domain)
+
+        existing = {org.name: org for org in domain.organizations}
+        specnames = [specorg["name"] for specorg in spec["organizations"]]
+        removed = [name for name in existing if name not in specnames]
+        if removed:
+            raise ValueError("organizations cannot be removed: " + ", ".join(removed))
+
+        orgs = []
+        newpeers = {}
+        for specorg in spec["organizations"]:
+            specpeers = specorg.get("peers", 1)
+            qtypeers = specpeers if isinstance(specpeers, int) else len(specpeers)
+
+            org = existing.get(specorg["name"])
+            if org is None:
+                orgs.append((specorg["name"], qtypeers))
+            elif qtypeers < len(org.peers):
+                raise ValueError(org.name + " peers cannot be removed")
+            elif qtypeers > len(org.peers):
+                newpeers[org.name] = self.add_peers(
+                    domain, org, qtypeers - len(org.peers), ports
+                )
+
+        neworgs = self.add_organizations(domain, orgs, ports) if orgs else []
+        return neworgs, newpeers
+
+    def add_organizations(
+        self, domain: Domain, orgs: List[Tuple[str, int]], ports: Ports
+    ) -> List[Organization]:
+        """Appends (name, number of peers) organizations to a running domain,
+        allocating all their ports in one pass"""
+        neworgs = []
+        caserverports = ports.allocate_many(
+            len(orgs), domain.caorderer.serverport + self.CAPORTSTEP, self.CAPORTSTEP
+        )
+        caoperationsports = ports.allocate_many(
+            len(orgs),
+            domain.caorderer.operationslistenport + self.CAPORTSTEP,
+            self.CAPORTSTEP,
+        )
+
+        for (name, qtypeers), caserverport, caoperationsport in zip(
+            orgs, caserverports, caoperationsports
+        ):
+            org = self.new_organization(domain, name, caserverport, caoperationsport)
+            self.add_peers(domain, org, qtypeers, ports)
+            domain.organizations.append(org)
+            neworgs.append(org)
+
+        domain.qtyorgs = len(domain.organizations)
+        domain.ports = ports.intervals()
+        return neworgs
+
+    def add_peers(
+        self, domain: Domain, org: Organization, count: int, ports: Ports
+    ) -> List[Peer]:
+        """Appends count peers to org, allocating all their ports in one pass
+        with the port step the domain was built with"""
+        portstep = domain.portstep
+        peerports = ports.allocate_many(count, self.PEERPORT, portstep)
+        operationsports = ports.allocate_many(count, self.OPERATIONSPORT, portstep)
+        chaincodeports = ports.allocate_many(count, self.CHAINCODEPORT, portstep)
+        couchdbports = ports.allocate_many(count, self.COUCHDBPORT, portstep)
+
+        newpeers = []
+        for i in range(count):
+            peer = self.new_peer(
+                domain,
+                org,
+                len(org.peers) + 1,
+                peerports[i],
+                operationsports[i],
+                chaincodeports[i],
+                couchdbports[i],
+            )
+            org.peers.append(peer)
+            newpeers.append(peer)
+
+        org.qtypeers = len(org.peers)
+        domain.ports = ports.intervals()
+        return newpeers
+
+    def new_domain(self, domainname: str) -> Domain:
+        """Domain with its orderer, TLS CA and orderer CA"""
+        domain = Domain()
+        domain.name = domainname
+        domain.networkname = domainname.split(".")[0]
+
+        ordererdomain = Orderer()
+        ordererdomain.name = "orderer"
+        ordererdomain.generallistenport = 7050
+        ordererdomain.operationslistenport = 9443
+        ordererdomain.adminlistenport = 7053
+        ordererdomain.ORDERER_GENERAL_LISTENPORT = ordererdomain.generallistenport
+        ordererdomain.ORDERER_OPERATIONS_LISTENADDRESS = (
+            ordererdomain.name
+            + "."
+            + domainname
+            + ":"
+            + str(ordererdomain.operationslistenport)
+        )
+        ordererdomain.ORDERER_ADMIN_LISTENADDRESS = "0.0.0.0:" + str(
+            ordererdomain.adminlistenport
+        )
+        ordererdomain.volumes = [
+            str(Path().absolute())
+            + "/domains/"
+            + domain.name
+            + "/ordererOrganizations/"
+            + ordererdomain.name
+            + "/msp:/var/hyperledger/orderer/msp",
+            str(Path().absolute())
+            + "/domains/"
+            + domain.name
+            + "/ordererOrganizations/admin/msp:/var/hyperledger/admin/msp",
+            str(Path().absolute())
+            + "/domains/"
+            + domain.name
+            + "/ordererOrganizations/"
+            + ordererdomain.name
+            + "/tls/:/var/hyperledger/orderer/tls",
+            ordererdomain.name
+            + "."
+            + domainname
+            + ":/var/hyperledger/production/orderer",
+        ]
+        domain.orderer = ordererdomain
+
+        cadomain = Ca()
+        cadomain.name = "ca"
+        cadomain.FABRIC_CA_SERVER_CA_NAME = cadomain.name
+        cadomain.volumes = self.ca_volumes(domain, cadomain)
+        domain.ca = cadomain
+
+        domain.caorderer = self.new_ca(
+            domain,
+            "ca.orderer",
+            cadomain.serverport + self.CAPORTSTEP,
+            cadomain.operationslistenport + self.CAPORTSTEP,
+        )
+
+        return domain
+
+    def new_ca(
+        self, domain: Domain, name: str, serverport: int, operationsport: int
+    ) -> Ca:
+        """_summary_"""
+        ca = Ca()
+        ca.name = name
+        ca.FABRIC_CA_SERVER_CA_NAME = ca.name
+        ca.FABRIC_CA_SERVER_OPERATIONS_LISTENADDRESS = "0.0.0.0:" + str(operationsport)
+        ca.FABRIC_CA_SERVER_PORT = serverport
+        ca.volumes = self.ca_volumes(domain, ca)
+        ca.serverport = serverport
+        ca.operationslistenport = operationsport
+        return ca
+
+    def ca_volumes(self, domain: Domain, ca: Ca) -> str:
+        """_summary_"""
+        return "".join(
+            [
+                str(Path().absolute()),
+                "/domains/",
+                domain.name,
+                "/fabricca/",
+                ca.name,
+                ":/etc/hyperledger/fabric-ca-server",
+            ]
+        )
+
+    def new_organization(
+        self, domain: Domain, name: str, caserverport: int, caoperationsport: int
+    ) -> Organization:
+        """Organization with its CA, without peers"""
+        org = Organization()
+        org.name = name
+        org.ca = self.new_ca(domain, "ca." + name, caserverport, caoperationsport)
+        return org
+
+    def new_peer(
+        self,
+        domain: Domain,
+        org: Organization,
+        ipeers: int,
+        valueport: int,
+        peeroperationlisten: int,
+        peerchaincodelistenport: int,
+        portcouchdb: int,
+    ) -> Peer:
+        """Peer number ipeers of org, with its CouchDB"""
+        peer = Peer()
+        peer.name = "peer" + str(ipeers) + "." + org.name
+
+        peer.volumes = [
+            str(Path().absolute())
+            + "/domains/"
+            + domain.name
+            + "/peerOrganizations/"
+            + org.name
+            + "/"
+            + peer.name
+            + ":/etc/hyperledger/fabric",
+            peer.name + "." + domain.name + ":/var/hyperledger/production",
+            str(Path().absolute())
+            + "/domains/"
+            + domain.name
+            + "/peerOrganizations/"
+            + org.name
+            + "/"
+            + peer.name
+            + "/peercfg"
+            + ":/etc/hyperledger/peercfg",
+            str(Path().absolute())
+            + "/domains/"
+            + domain.name
+            + ":/etc/hyperledger/organizations",
+            "/var/run/docker.sock:/host/var/run/docker.sock",
+        ]
+
+        database = Database()
+        database.port = portcouchdb
+        database.name = "db.peer" + str(ipeers) + "." + org.name
+        database.COUCHDB_USER = "admin"
+        database.COUCHDB_PASSWORD = "adminpw"
+
+        peer.CORE_LEDGER_STATE_COUCHDBCONFIG_USERNAME = database.COUCHDB_USER
+        peer.CORE_LEDGER_STATE_COUCHDBCONFIG_PASSWORD = database.COUCHDB_PASSWORD
+        peer.CORE_LEDGER_STATE_COUCHDBCONFIG_COUCHDBADDRESS = (
+            database.name + "." + domain.name + ":5984"
+        )
+        peer.CORE_VM_DOCKER_HOSTCONFIG_NETWORKMODE = domain.networkname
+        peer.CHAINCODE_AS_A_SERVICE_BUILDER_CONFIG = (
+            '{"peername":"' + "peer" + str(ipeers) + org.name + '"}'
+        )
+        peer.CORE_PEER_LISTENADDRESS = "0.0.0.0:" + str(valueport)
+        peer.CORE_OPERATIONS_LISTENADDRESS = (
+            peer.name + "." + domain.name + ":" + str(peeroperationlisten)
+        )
+        peer.peerlistenport = valueport
+        peer.operationslistenport = peeroperationlisten
+        peer.CORE_PEER_ADDRESS = peer.name + "." + domain.name + ":" + str(valueport)
+        peer.CORE_PEER_CHAINCODEADDRESS = (
+            peer.name + "." + domain.name + ":" + str(peerchaincodelistenport)
+        )
+        peer.chaincodelistenport = peerchaincodelistenport
+        peer.CORE_PEER_CHAINCODELISTENADDRESS = "0.0.0.0:" + str(
+            peerchaincodelistenport
+        )
+        peer.CORE_PEER_GOSSIP_EXTERNALENDPOINT = peer.CORE_PEER_ADDRESS
+        peer.CORE_PEER_GOSSIP_BOOTSTRAP = peer.CORE_PEER_ADDRESS
+        peer.CORE_PEER_LOCALMSPID = org.name + "MSP"
+        peer.CORE_PEER_ID = peer.name + "." + domain.name
+
+        peer.database = database
+
+        return peer
@@ -0,0 +1,134 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+class Tracer:
+    """Nested timing spans exported as Chrome trace / Perfetto JSON.
+
+    Spans nest per thread. When the outermost phase of the main thread closes,
+    the collected spans are written to logs/trace-[RUNID]-[NAME].json and a
+    per-span summary table is printed."""
+
+    RUNID = time.strftime("%Y%m%d-%H%M%S")
+    LOGPATH = str(Path().absolute()) + "/logs/"
+
+    def __init__(self) -> None:
+        self.epoch = time.perf_counter()
+        self.events: List[dict] = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase", args: Dict = None):
+        """_summary_"""
+        stack = self.local.__dict__.setdefault("stack", [])
+        stack.append(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            stack.pop()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((started - self.epoch) * 1e6),
+                "dur": round((finished - started) * 1e6),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            }
+            if args:
+                event["args"] = args
+            with self.lock:
+                self.events.append(event)
+
+            if (
+                not stack
+                and category == "phase"
+                and threading.current_thread() is threading.main_thread()
+            ):
+                self.flush(name)
+
+    def phase(self, name: str = None) -> Callable:
+        """Decorator wrapping a method in a phase span"""
+
+        def decorator(function: Callable) -> Callable:
+            spanname = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(spanname):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def flush(self, name: str):
+        """Exports and summarizes the spans of a finished top-level operation"""
+        with self.lock:
+            events = self.events
+            self.events = []
+
+        try:
+            Path(self.LOGPATH).mkdir(parents=True, exist_ok=True)
+            with open(
+                self.LOGPATH
+                + "trace-"
+                + self.RUNID
+                + "-"
+                + name.replace(".", "-")
+                + ".json",
+                "w",
+                encoding="utf-8",
+            ) as tracefile:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, tracefile)
+        except OSError:
+            pass
+
+        self.summary(name, events)
+
+    def summary(self, name: str, events: List[dict]):
+        """_summary_"""
+        totals: Dict[tuple, List[int]] = {}
+        for event in events:
+            total = totals.setdefault((event["cat"], event["name"]), [0, 0, 0])
+            total[0] += 1
+            total[1] += event["dur"]
+            total[2] = max(total[2], event["dur"])
+
+        table = Table(title="Timing " + name)
+        table.add_column("Span")
+        table.add_column("Kind")
+        table.add_column("Count", justify="right")
+        table.add_column("Total", justify="right")
+        table.add_column("Max", justify="right")
+
+        for (category, spanname), (count, duration, longest) in sorted(
+            totals.items(), key=lambda item: item[1][1], reverse=True
+        ):
+            table.add_row(
+                spanname,
+                category,
+                str(count),
+                "%.2fs" % (duration / 1e6),
+                "%.2fs" % (longest / 1e6),
+            )
+
+        console.print("")
+        console.print(table)
+
+
+tracer = Tracer()
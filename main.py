@@ -1,3 +1,18 @@
+import argparse
+
+parser = argparse.ArgumentParser(description="Docker Fabric Wizard")
+parser.add_argument(
+    "--spec",
+    help="build the network described by a YAML or JSON topology file, without prompts",
+)
+args = parser.parse_args()
+
+if args.spec:
+    from controllers.batch import Batch
+
+    batch = Batch(args.spec)
+    exit(batch.run())
+
 from controllers.console import ConsoleOutput
 
 consoleOutput = ConsoleOutput()
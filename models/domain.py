@@ -17,3 +17,6 @@ class Domain(BaseModel):
     organizations: List[Organization] = []
     networkname: Optional[str] = None
     chaincodes: List[Chaincode] = []
+    ports: List[List[int]] = []
+    cryptogen: bool = False
+    portstep: int = 1000